@@ -15,7 +15,8 @@ from app.models import *  # Import all models
 config = context.config
 
 # Override sqlalchemy.url with environment variable
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# ConfigParser treats % as interpolation, e.g. in URL-encoded passwords
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -0,0 +1,380 @@
+"""Baseline schema
+
+Tables as created by Base.metadata.create_all before migrations were
+introduced. Existing databases created that way should be stamped with
+`alembic stamp 0001` instead of running this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 02:36:19.675178
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('admissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_name', sa.String(length=255), nullable=False),
+    sa.Column('dob', sa.Date(), nullable=False),
+    sa.Column('gender', sa.String(length=10), nullable=True),
+    sa.Column('parent_name', sa.String(length=255), nullable=False),
+    sa.Column('parent_phone', sa.String(length=20), nullable=False),
+    sa.Column('parent_email', sa.String(length=255), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('class_applied', sa.String(length=50), nullable=False),
+    sa.Column('previous_school', sa.String(length=255), nullable=True),
+    sa.Column('previous_class', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'UNDER_REVIEW', 'APPROVED', 'REJECTED', 'WAITLISTED', name='admissionstatus'), nullable=True),
+    sa.Column('remarks', sa.Text(), nullable=True),
+    sa.Column('documents', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_admissions_id'), 'admissions', ['id'], unique=False)
+    op.create_table('exams',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('academic_year', sa.String(length=20), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exams_id'), 'exams', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.Enum('STUDENT', 'PARENT', 'TEACHER', 'ADMIN', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('admins',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('designation', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_admins_id'), 'admins', ['id'], unique=False)
+    op.create_table('notices',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('target_role', sa.Enum('STUDENT', 'PARENT', 'TEACHER', 'ADMIN', name='userrole'), nullable=True),
+    sa.Column('priority', sa.String(length=20), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('attachment_url', sa.String(length=500), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notices_id'), 'notices', ['id'], unique=False)
+    op.create_table('parents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('occupation', sa.String(length=255), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('relation', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_parents_id'), 'parents', ['id'], unique=False)
+    op.create_table('teachers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('employee_id', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('qualification', sa.String(length=255), nullable=True),
+    sa.Column('experience_years', sa.Integer(), nullable=True),
+    sa.Column('join_date', sa.Date(), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('profile_image', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_teachers_employee_id'), 'teachers', ['employee_id'], unique=True)
+    op.create_index(op.f('ix_teachers_id'), 'teachers', ['id'], unique=False)
+    op.create_table('classes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('section', sa.String(length=10), nullable=True),
+    sa.Column('academic_year', sa.String(length=20), nullable=False),
+    sa.Column('class_teacher_id', sa.Integer(), nullable=True),
+    sa.Column('room_number', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['class_teacher_id'], ['teachers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_classes_id'), 'classes', ['id'], unique=False)
+    op.create_table('students',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('admission_no', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=True),
+    sa.Column('section', sa.String(length=10), nullable=True),
+    sa.Column('roll_no', sa.Integer(), nullable=True),
+    sa.Column('dob', sa.Date(), nullable=True),
+    sa.Column('gender', sa.String(length=10), nullable=True),
+    sa.Column('address', sa.String(length=500), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('parent_id', sa.Integer(), nullable=True),
+    sa.Column('blood_group', sa.String(length=10), nullable=True),
+    sa.Column('profile_image', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['parent_id'], ['parents.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_students_admission_no'), 'students', ['admission_no'], unique=True)
+    op.create_index(op.f('ix_students_id'), 'students', ['id'], unique=False)
+    op.create_table('subjects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('code', sa.String(length=20), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    op.create_index(op.f('ix_subjects_id'), 'subjects', ['id'], unique=False)
+    op.create_table('teacher_classes',
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ),
+    sa.PrimaryKeyConstraint('teacher_id', 'class_id')
+    )
+    op.create_table('assignments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=False),
+    sa.Column('attachment_url', sa.String(length=500), nullable=True),
+    sa.Column('max_marks', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assignments_id'), 'assignments', ['id'], unique=False)
+    op.create_table('attendance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('status', sa.Enum('PRESENT', 'ABSENT', 'LATE', 'EXCUSED', name='attendancestatus'), nullable=False),
+    sa.Column('marked_by', sa.Integer(), nullable=True),
+    sa.Column('remarks', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['marked_by'], ['teachers.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_attendance_id'), 'attendance', ['id'], unique=False)
+    op.create_table('exam_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('marks_obtained', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('grade', sa.String(length=5), nullable=True),
+    sa.Column('remarks', sa.String(length=255), nullable=True),
+    sa.Column('entered_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['entered_by'], ['teachers.id'], ),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exam_results_id'), 'exam_results', ['id'], unique=False)
+    op.create_table('exam_schedules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('exam_date', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.String(length=10), nullable=True),
+    sa.Column('end_time', sa.String(length=10), nullable=True),
+    sa.Column('max_marks', sa.Integer(), nullable=False),
+    sa.Column('passing_marks', sa.Integer(), nullable=True),
+    sa.Column('room', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_exam_schedules_id'), 'exam_schedules', ['id'], unique=False)
+    op.create_table('fees',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('fee_type', sa.Enum('TUITION', 'ADMISSION', 'EXAM', 'TRANSPORT', 'LIBRARY', 'LABORATORY', 'SPORTS', 'OTHER', name='feetype'), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('due_date', sa.Date(), nullable=False),
+    sa.Column('paid_date', sa.Date(), nullable=True),
+    sa.Column('paid_amount', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'PAID', 'PARTIAL', 'OVERDUE', 'WAIVED', name='feestatus'), nullable=True),
+    sa.Column('payment_method', sa.String(length=50), nullable=True),
+    sa.Column('transaction_id', sa.String(length=100), nullable=True),
+    sa.Column('receipt_number', sa.String(length=50), nullable=True),
+    sa.Column('academic_year', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_fees_id'), 'fees', ['id'], unique=False)
+    op.create_table('messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('sender_type', sa.Enum('PARENT', 'TEACHER', name='messageparticipanttype'), nullable=False),
+    sa.Column('receiver_id', sa.Integer(), nullable=False),
+    sa.Column('receiver_type', sa.Enum('PARENT', 'TEACHER', name='messageparticipanttype'), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
+    op.create_table('teacher_subjects',
+    sa.Column('teacher_id', sa.Integer(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ),
+    sa.PrimaryKeyConstraint('teacher_id', 'subject_id')
+    )
+    op.create_table('timetable',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('class_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Enum('MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', name='dayofweek'), nullable=False),
+    sa.Column('period', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=True),
+    sa.Column('end_time', sa.Time(), nullable=True),
+    sa.Column('subject_id', sa.Integer(), nullable=True),
+    sa.Column('teacher_id', sa.Integer(), nullable=True),
+    sa.Column('room', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_timetable_id'), 'timetable', ['id'], unique=False)
+    op.create_table('assignment_submissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assignment_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('submission_url', sa.String(length=500), nullable=True),
+    sa.Column('submitted_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('marks_obtained', sa.Integer(), nullable=True),
+    sa.Column('feedback', sa.Text(), nullable=True),
+    sa.Column('graded_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('graded_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['assignment_id'], ['assignments.id'], ),
+    sa.ForeignKeyConstraint(['graded_by'], ['teachers.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_assignment_submissions_id'), 'assignment_submissions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_assignment_submissions_id'), table_name='assignment_submissions')
+    op.drop_table('assignment_submissions')
+    op.drop_index(op.f('ix_timetable_id'), table_name='timetable')
+    op.drop_table('timetable')
+    op.drop_table('teacher_subjects')
+    op.drop_index(op.f('ix_messages_id'), table_name='messages')
+    op.drop_table('messages')
+    op.drop_index(op.f('ix_fees_id'), table_name='fees')
+    op.drop_table('fees')
+    op.drop_index(op.f('ix_exam_schedules_id'), table_name='exam_schedules')
+    op.drop_table('exam_schedules')
+    op.drop_index(op.f('ix_exam_results_id'), table_name='exam_results')
+    op.drop_table('exam_results')
+    op.drop_index(op.f('ix_attendance_id'), table_name='attendance')
+    op.drop_table('attendance')
+    op.drop_index(op.f('ix_assignments_id'), table_name='assignments')
+    op.drop_table('assignments')
+    op.drop_table('teacher_classes')
+    op.drop_index(op.f('ix_subjects_id'), table_name='subjects')
+    op.drop_table('subjects')
+    op.drop_index(op.f('ix_students_id'), table_name='students')
+    op.drop_index(op.f('ix_students_admission_no'), table_name='students')
+    op.drop_table('students')
+    op.drop_index(op.f('ix_classes_id'), table_name='classes')
+    op.drop_table('classes')
+    op.drop_index(op.f('ix_teachers_id'), table_name='teachers')
+    op.drop_index(op.f('ix_teachers_employee_id'), table_name='teachers')
+    op.drop_table('teachers')
+    op.drop_index(op.f('ix_parents_id'), table_name='parents')
+    op.drop_table('parents')
+    op.drop_index(op.f('ix_notices_id'), table_name='notices')
+    op.drop_table('notices')
+    op.drop_index(op.f('ix_admins_id'), table_name='admins')
+    op.drop_table('admins')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_exams_id'), table_name='exams')
+    op.drop_table('exams')
+    op.drop_index(op.f('ix_admissions_id'), table_name='admissions')
+    op.drop_table('admissions')
+
+    bind = op.get_bind()
+    for enum_name in ('admissionstatus', 'userrole', 'attendancestatus', 'feetype',
+                      'feestatus', 'messageparticipanttype', 'dayofweek'):
+        sa.Enum(name=enum_name).drop(bind, checkfirst=True)
@@ -0,0 +1,65 @@
+"""Hot path indexes
+
+Composite and unique indexes for the lookups every portal page makes:
+attendance by student and date, fees by student and status, exam results
+by exam/student/subject, unread messages by receiver, timetable slots,
+students by class and parent, and submissions by assignment and student.
+
+Duplicate rows that would violate the new unique constraints are removed
+first, keeping the most recently inserted row of each group.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 02:36:50.346617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, constraint name, columns)
+UNIQUE_CONSTRAINTS = [
+    ('attendance', 'uq_attendance_student_date', ['student_id', 'date']),
+    ('exam_results', 'uq_exam_results_exam_student_subject', ['exam_id', 'student_id', 'subject_id']),
+    ('timetable', 'uq_timetable_class_day_period', ['class_id', 'day', 'period']),
+    ('assignment_submissions', 'uq_submissions_assignment_student', ['assignment_id', 'student_id']),
+]
+
+
+def delete_duplicates(table: str, columns: list) -> None:
+    cols = ', '.join(columns)
+    op.execute(
+        f"DELETE FROM {table} WHERE id NOT IN "
+        f"(SELECT MAX(id) FROM {table} GROUP BY {cols})"
+    )
+
+
+def upgrade() -> None:
+    for table, name, columns in UNIQUE_CONSTRAINTS:
+        delete_duplicates(table, columns)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_unique_constraint(name, columns)
+
+    op.create_index('ix_fees_student_status', 'fees', ['student_id', 'status'], unique=False)
+    op.create_index('ix_messages_receiver_unread', 'messages', ['receiver_id', 'receiver_type', 'is_read'], unique=False)
+    op.create_index(op.f('ix_students_class_id'), 'students', ['class_id'], unique=False)
+    op.create_index(op.f('ix_students_parent_id'), 'students', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_students_parent_id'), table_name='students')
+    op.drop_index(op.f('ix_students_class_id'), table_name='students')
+    op.drop_index('ix_messages_receiver_unread', table_name='messages')
+    op.drop_index('ix_fees_student_status', table_name='fees')
+
+    for table, name, columns in reversed(UNIQUE_CONSTRAINTS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(name, type_='unique')
@@ -0,0 +1,116 @@
+"""Partition attendance by academic year
+
+PostgreSQL only: rebuilds `attendance` as a table range-partitioned on
+`date`, with one partition per academic year that has data, partitions for
+the current and upcoming years, and a default partition. The primary key
+becomes (id, date) because PostgreSQL requires the partition key in every
+unique constraint. Other databases are left unpartitioned.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 03:05:12.418230
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, student_id, date, status, marked_by, remarks, created_at, updated_at"
+
+
+def attendance_columns():
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('attendance_id_seq'::regclass)"), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='attendancestatus', create_type=False), nullable=False),
+        sa.Column('marked_by', sa.Integer(), nullable=True),
+        sa.Column('remarks', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['marked_by'], ['teachers.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    ]
+
+
+def academic_year_of(day: date) -> int:
+    # As of this revision; the start month must match the running app's partition bounds
+    month = settings.ACADEMIC_YEAR_START_MONTH
+    return day.year if day.month >= month else day.year - 1
+
+
+def create_partitions(from_year: int, to_year: int) -> None:
+    """One partition per academic year (attendance_y2024 holds 2024-25), plus the default one."""
+    month = settings.ACADEMIC_YEAR_START_MONTH
+    for year in range(from_year, to_year + 1):
+        start, end = date(year, month, 1), date(year + 1, month, 1)
+        op.execute(
+            f"CREATE TABLE attendance_y{year} PARTITION OF attendance "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.execute("CREATE TABLE attendance_default PARTITION OF attendance DEFAULT")
+
+
+def rename_old_table(new_name: str) -> None:
+    op.execute(f"ALTER TABLE attendance RENAME TO {new_name}")
+    op.execute(f"ALTER TABLE {new_name} RENAME CONSTRAINT attendance_pkey TO {new_name}_pkey")
+    op.execute(f"ALTER TABLE {new_name} RENAME CONSTRAINT uq_attendance_student_date TO uq_{new_name}_student_date")
+    op.execute(f"ALTER INDEX ix_attendance_id RENAME TO ix_{new_name}_id")
+
+
+def replace_old_table(old_name: str) -> None:
+    op.execute(f"INSERT INTO attendance ({COLUMNS}) SELECT {COLUMNS} FROM {old_name}")
+    op.execute("ALTER SEQUENCE attendance_id_seq OWNED BY attendance.id")
+    op.execute(f"DROP TABLE {old_name} CASCADE")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    rename_old_table('attendance_unpartitioned')
+    op.create_table(
+        'attendance',
+        *attendance_columns(),
+        sa.PrimaryKeyConstraint('id', 'date', name='attendance_pkey'),
+        sa.UniqueConstraint('student_id', 'date', name='uq_attendance_student_date'),
+        postgresql_partition_by='RANGE (date)',
+    )
+    op.create_index(op.f('ix_attendance_id'), 'attendance', ['id'], unique=False)
+
+    # Years with data through next year; app startup keeps later ones coming
+    current = academic_year_of(date.today())
+    oldest = bind.scalar(sa.text("SELECT min(date) FROM attendance_unpartitioned"))
+    create_partitions(min(academic_year_of(oldest), current) if oldest else current, current + 1)
+
+    replace_old_table('attendance_unpartitioned')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    rename_old_table('attendance_partitioned')
+    op.create_table(
+        'attendance',
+        *attendance_columns(),
+        sa.PrimaryKeyConstraint('id', name='attendance_pkey'),
+        sa.UniqueConstraint('student_id', 'date', name='uq_attendance_student_date'),
+    )
+    op.create_index(op.f('ix_attendance_id'), 'attendance', ['id'], unique=False)
+
+    replace_old_table('attendance_partitioned')
@@ -0,0 +1,30 @@
+"""Attendance date index
+
+Index on attendance (date, id), the sort key the admin attendance list
+pages through with keyset pagination. On the partitioned PostgreSQL table
+this creates a partitioned index, cascading to every partition.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 04:12:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_attendance_date_id', 'attendance', ['date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_date_id', table_name='attendance')
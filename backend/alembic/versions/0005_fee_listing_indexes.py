@@ -0,0 +1,32 @@
+"""Fee listing indexes
+
+Indexes behind the paginated fee listing: (due_date, id) is its sort key and
+serves the due-date range filter, (academic_year, status) serves the
+academic year and status filters.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 04:41:09.163528
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_fees_due_date_id', 'fees', ['due_date', 'id'], unique=False)
+    op.create_index('ix_fees_academic_year_status', 'fees', ['academic_year', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fees_academic_year_status', table_name='fees')
+    op.drop_index('ix_fees_due_date_id', table_name='fees')
@@ -0,0 +1,48 @@
+"""Attendance summary counters
+
+Per-student, per-academic-year attendance counters read by the dashboards,
+filled from the existing attendance records.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 05:20:44.871305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.attendance_summary import backfill
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'attendance_summary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('academic_year', sa.String(length=20), nullable=False),
+        sa.Column('present', sa.Integer(), nullable=False),
+        sa.Column('absent', sa.Integer(), nullable=False),
+        sa.Column('late', sa.Integer(), nullable=False),
+        sa.Column('excused', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_id', 'academic_year', name='uq_attendance_summary_student_year')
+    )
+    op.create_index(op.f('ix_attendance_summary_id'), 'attendance_summary', ['id'], unique=False)
+
+    backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attendance_summary_id'), table_name='attendance_summary')
+    op.drop_table('attendance_summary')
@@ -0,0 +1,50 @@
+"""Attendance flags
+
+Students flagged by the daily absence streak / absence rate job.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 07:42:18.305127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'attendance_flags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=True),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        sa.Column('absence_streak', sa.Integer(), nullable=False),
+        sa.Column('window_days', sa.Integer(), nullable=False),
+        sa.Column('window_marked', sa.Integer(), nullable=False),
+        sa.Column('window_absent', sa.Integer(), nullable=False),
+        sa.Column('absence_rate', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column('streak_flagged', sa.Boolean(), nullable=False),
+        sa.Column('rate_flagged', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_id', 'as_of', name='uq_attendance_flags_student_as_of')
+    )
+    op.create_index('ix_attendance_flags_as_of_class', 'attendance_flags', ['as_of', 'class_id'], unique=False)
+    op.create_index(op.f('ix_attendance_flags_id'), 'attendance_flags', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attendance_flags_id'), table_name='attendance_flags')
+    op.drop_index('ix_attendance_flags_as_of_class', table_name='attendance_flags')
+    op.drop_table('attendance_flags')
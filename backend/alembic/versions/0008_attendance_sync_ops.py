@@ -0,0 +1,45 @@
+"""Attendance sync idempotency keys
+
+Keys and outcomes of attendance changes sent through the teachers'
+offline sync endpoint.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 08:31:05.517342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'attendance_sync_ops',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=64), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('outcome', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('teacher_id', 'idempotency_key', name='uq_attendance_sync_ops_teacher_key')
+    )
+    op.create_index(op.f('ix_attendance_sync_ops_created_at'), 'attendance_sync_ops', ['created_at'], unique=False)
+    op.create_index(op.f('ix_attendance_sync_ops_id'), 'attendance_sync_ops', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attendance_sync_ops_id'), table_name='attendance_sync_ops')
+    op.drop_index(op.f('ix_attendance_sync_ops_created_at'), table_name='attendance_sync_ops')
+    op.drop_table('attendance_sync_ops')
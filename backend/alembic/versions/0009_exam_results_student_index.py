@@ -0,0 +1,28 @@
+"""Exam results student index
+
+Index for the parent and student result views, which read a student's
+results across exams.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 09:12:40.226719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_exam_results_student_exam', 'exam_results', ['student_id', 'exam_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_exam_results_student_exam', table_name='exam_results')
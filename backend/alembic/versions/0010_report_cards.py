@@ -0,0 +1,84 @@
+"""Report card snapshots
+
+Report cards per exam and student, with their subject lines, computed by
+app.services.report_cards.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 09:42:18.204716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'report_cards',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=False),
+        sa.Column('subjects', sa.Integer(), nullable=False),
+        sa.Column('obtained_marks', sa.Numeric(precision=7, scale=2), nullable=False),
+        sa.Column('total_marks', sa.Numeric(precision=7, scale=2), nullable=False),
+        sa.Column('percentage', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column('grade', sa.String(length=5), nullable=False),
+        sa.Column('passed', sa.Boolean(), nullable=False),
+        sa.Column('class_rank', sa.Integer(), nullable=False),
+        sa.Column('class_size', sa.Integer(), nullable=False),
+        sa.Column('section_rank', sa.Integer(), nullable=False),
+        sa.Column('section_size', sa.Integer(), nullable=False),
+        sa.Column('percentile', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column('generated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id', 'student_id', name='uq_report_cards_exam_student')
+    )
+    op.create_index('ix_report_cards_exam_class', 'report_cards', ['exam_id', 'class_id'], unique=False)
+    op.create_index(op.f('ix_report_cards_id'), 'report_cards', ['id'], unique=False)
+
+    op.create_table(
+        'report_card_subjects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('marks_obtained', sa.Numeric(precision=5, scale=2), nullable=True),
+        sa.Column('max_marks', sa.Integer(), nullable=False),
+        sa.Column('passing_marks', sa.Integer(), nullable=False),
+        sa.Column('percentage', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column('grade', sa.String(length=5), nullable=False),
+        sa.Column('passed', sa.Boolean(), nullable=False),
+        sa.Column('is_section_topper', sa.Boolean(), nullable=False),
+        sa.Column('is_class_topper', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id', 'student_id', 'subject_id', name='uq_report_card_subjects_exam_student_subject')
+    )
+    op.create_index('ix_report_card_subjects_exam_class', 'report_card_subjects', ['exam_id', 'class_id'], unique=False)
+    op.create_index(op.f('ix_report_card_subjects_id'), 'report_card_subjects', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_report_card_subjects_id'), table_name='report_card_subjects')
+    op.drop_index('ix_report_card_subjects_exam_class', table_name='report_card_subjects')
+    op.drop_table('report_card_subjects')
+    op.drop_index(op.f('ix_report_cards_id'), table_name='report_cards')
+    op.drop_index('ix_report_cards_exam_class', table_name='report_cards')
+    op.drop_table('report_cards')
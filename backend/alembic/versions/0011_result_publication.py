@@ -0,0 +1,92 @@
+"""Result publication
+
+Publish state per exam, the frozen published results parents and students
+read, and the queue of result notifications to parents.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 11:06:52.381940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'exam_publications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('students', sa.Integer(), nullable=False),
+        sa.Column('published_by', sa.Integer(), nullable=True),
+        sa.Column('published_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.ForeignKeyConstraint(['published_by'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id')
+    )
+    op.create_index(op.f('ix_exam_publications_id'), 'exam_publications', ['id'], unique=False)
+
+    op.create_table(
+        'published_results',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('obtained_marks', sa.Numeric(precision=7, scale=2), nullable=False),
+        sa.Column('total_marks', sa.Numeric(precision=7, scale=2), nullable=False),
+        sa.Column('percentage', sa.Numeric(precision=5, scale=2), nullable=False),
+        sa.Column('grade', sa.String(length=5), nullable=False),
+        sa.Column('passed', sa.Boolean(), nullable=False),
+        sa.Column('class_rank', sa.Integer(), nullable=False),
+        sa.Column('report', sa.JSON(), nullable=False),
+        sa.Column('published_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id', 'student_id', name='uq_published_results_exam_student')
+    )
+    op.create_index('ix_published_results_student_exam', 'published_results', ['student_id', 'exam_id'], unique=False)
+    op.create_index(op.f('ix_published_results_id'), 'published_results', ['id'], unique=False)
+
+    op.create_table(
+        'result_notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('parent_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.ForeignKeyConstraint(['parent_id'], ['parents.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id', 'student_id', name='uq_result_notifications_exam_student')
+    )
+    op.create_index('ix_result_notifications_status_id', 'result_notifications', ['status', 'id'], unique=False)
+    op.create_index(op.f('ix_result_notifications_id'), 'result_notifications', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_result_notifications_id'), table_name='result_notifications')
+    op.drop_index('ix_result_notifications_status_id', table_name='result_notifications')
+    op.drop_table('result_notifications')
+    op.drop_index(op.f('ix_published_results_id'), table_name='published_results')
+    op.drop_index('ix_published_results_student_exam', table_name='published_results')
+    op.drop_table('published_results')
+    op.drop_index(op.f('ix_exam_publications_id'), table_name='exam_publications')
+    op.drop_table('exam_publications')
@@ -0,0 +1,63 @@
+"""Exam seating plans
+
+Stored seating plans per exam sitting and their seat assignments.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17 12:41:08.517263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'seating_plans',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('exam_date', sa.Date(), nullable=False),
+        sa.Column('start_time', sa.String(length=10), nullable=True),
+        sa.Column('fingerprint', sa.String(length=40), nullable=False),
+        sa.Column('rooms', sa.JSON(), nullable=False),
+        sa.Column('students', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id', 'exam_date', 'start_time', name='uq_seating_plans_sitting')
+    )
+    op.create_index(op.f('ix_seating_plans_id'), 'seating_plans', ['id'], unique=False)
+
+    op.create_table(
+        'seat_assignments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('plan_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=True),
+        sa.Column('room', sa.String(length=50), nullable=False),
+        sa.Column('row', sa.Integer(), nullable=False),
+        sa.Column('column', sa.Integer(), nullable=False),
+        sa.Column('seat_no', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+        sa.ForeignKeyConstraint(['plan_id'], ['seating_plans.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('plan_id', 'student_id', name='uq_seat_assignments_plan_student')
+    )
+    op.create_index(op.f('ix_seat_assignments_id'), 'seat_assignments', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_seat_assignments_id'), table_name='seat_assignments')
+    op.drop_table('seat_assignments')
+    op.drop_index(op.f('ix_seating_plans_id'), table_name='seating_plans')
+    op.drop_table('seating_plans')
@@ -0,0 +1,30 @@
+"""Withdrawn exam publications
+
+Unpublishing keeps the exam_publications row and sets withdrawn_at, so
+publication versions keep increasing across an unpublish and republish.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17 14:02:37.906114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('exam_publications', sa.Column('withdrawn_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM exam_publications WHERE withdrawn_at IS NOT NULL")
+    op.drop_column('exam_publications', 'withdrawn_at')
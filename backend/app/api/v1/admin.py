@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import date, time
-from app.core.database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Tuple
+from datetime import date, time, timedelta
+from app.core.academic_year import academic_year_range
+from app.core.database import get_async_db, get_read_db, get_pool_stats
+from app.core.pagination import PageParams, page_params, paginate
 from app.core.security import get_current_user, require_role, get_password_hash
+from app.services.absence_flags import list_flags, run_absence_check
+from app.services.attendance_analytics import class_attendance_analytics
+from app.services.attendance_marking import upsert_attendance
+from app.services.attendance_sheet import class_attendance_for_date, class_attendance_register
+from app.services.exam_results import exam_results, exam_totals
+from app.services.exam_schedule_conflicts import Paper, describe_conflicts, exam_schedule_index
+from app.services.marks_entry import MarksEntryError, upsert_marks
+from app.services.report_cards import generate_report_cards_async, report_cards
+from app.services.result_publication import dispatch_queued_notifications, publish_results_async, unpublish_results
+from app.services.scan_ingest import scan_buffer
+from app.services.seating_plans import generate_seating_plan, seating_plan, seating_plan_file
+from app.services.timetable_generator import generate_timetable_async
 from app.models import (
     User, UserRole, Student, Parent, Teacher, Admin, Class, Subject,
     Fee, FeeStatus, FeeType, Notice, Admission, AdmissionStatus,
     Attendance, AttendanceStatus, Timetable, DayOfWeek,
-    Exam, ExamSchedule, ExamResult
+    Exam, ExamSchedule
 )
 from app.schemas import (
     StudentCreate, StudentUpdate, StudentResponse,
@@ -19,12 +35,15 @@ from app.schemas import (
     AdmissionUpdate, AdmissionResponse,
     ClassCreate, ClassUpdate, ClassResponse,
     SubjectCreate, SubjectUpdate, SubjectResponse,
-    AttendanceCreate, AttendanceBulkCreate, AttendanceResponse,
-    StudentAttendanceRecord, ClassAttendanceResponse, AttendanceSummary,
-    TimetableCreate, TimetableEntry, TimetableResponse,
+    AttendanceCreate, AttendanceBulkCreate, AttendanceBulkResult, AttendanceResponse,
+    StudentAttendanceRecord, ClassAttendanceResponse, ClassAttendanceRegister, AttendanceSummary,
+    AttendanceAnalytics, AttendanceFlagResponse, AbsenceCheckResult,
+    TimetableCreate, TimetableEntry, TimetableResponse, TimetableGenerate, TimetableGenerationResult,
     ExamCreate, ExamUpdate, ExamResponse,
-    ExamScheduleCreate, ExamScheduleResponse,
-    ExamResultCreate, ExamResultBulkCreate, ExamResultResponse
+    ExamScheduleCreate, ExamScheduleResponse, ExamScheduleUpdate, ExamScheduleValidation,
+    ExamResultCreate, ExamResultBulkCreate, ExamResultResponse, StudentExamTotal,
+    MarksEntryResult, ReportCardResponse, ReportCardRun, ExamPublicationResponse,
+    SeatingPlanCreate, SeatingPlanResponse
 )
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -33,28 +52,28 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 @router.get("/dashboard")
 async def get_admin_dashboard(
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    total_students = db.query(Student).count()
-    total_teachers = db.query(Teacher).count()
-    total_parents = db.query(Parent).count()
-    total_classes = db.query(Class).count()
+    total_students = await db.scalar(select(func.count()).select_from(Student))
+    total_teachers = await db.scalar(select(func.count()).select_from(Teacher))
+    total_parents = await db.scalar(select(func.count()).select_from(Parent))
+    total_classes = await db.scalar(select(func.count()).select_from(Class))
 
-    pending_admissions = db.query(Admission).filter(
+    pending_admissions = await db.scalar(select(func.count()).select_from(Admission).where(
         Admission.status == AdmissionStatus.PENDING
-    ).count()
+    ))
 
-    total_fee_collected = db.query(func.sum(Fee.paid_amount)).filter(
+    total_fee_collected = await db.scalar(select(func.sum(Fee.paid_amount)).where(
         Fee.status == FeeStatus.PAID
-    ).scalar() or 0
+    )) or 0
 
-    total_fee_pending = db.query(func.sum(Fee.amount)).filter(
+    total_fee_pending = await db.scalar(select(func.sum(Fee.amount)).where(
         Fee.status.in_([FeeStatus.PENDING, FeeStatus.OVERDUE])
-    ).scalar() or 0
+    )) or 0
 
-    recent_admissions = db.query(Admission).order_by(
+    recent_admissions = (await db.scalars(select(Admission).order_by(
         Admission.created_at.desc()
-    ).limit(5).all()
+    ).limit(5))).all()
 
     return {
         "total_students": total_students,
@@ -71,24 +90,23 @@ async def get_admin_dashboard(
 # Student Management
 @router.get("/students", response_model=List[StudentResponse])
 async def list_students(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
     class_id: Optional[int] = None,
+    page: PageParams = Depends(page_params),
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Student)
+    query = select(Student)
     if class_id:
-        query = query.filter(Student.class_id == class_id)
-    students = query.offset(skip).limit(limit).all()
-    return students
+        query = query.where(Student.class_id == class_id)
+    return await paginate(db, query, [(Student.id, False)], page, response)
 
 
 @router.post("/students", response_model=StudentResponse)
 async def create_student(
     student_data: StudentCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Create user first
     user = User(
@@ -97,8 +115,8 @@ async def create_student(
         role=UserRole.STUDENT
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     student = Student(
         user_id=user.id,
@@ -115,8 +133,8 @@ async def create_student(
         blood_group=student_data.blood_group
     )
     db.add(student)
-    db.commit()
-    db.refresh(student)
+    await db.commit()
+    await db.refresh(student)
     return student
 
 
@@ -124,9 +142,9 @@ async def create_student(
 async def get_student(
     student_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
@@ -137,17 +155,17 @@ async def update_student(
     student_id: int,
     student_data: StudentUpdate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     for field, value in student_data.model_dump(exclude_unset=True).items():
         setattr(student, field, value)
 
-    db.commit()
-    db.refresh(student)
+    await db.commit()
+    await db.refresh(student)
     return student
 
 
@@ -155,18 +173,18 @@ async def update_student(
 async def delete_student(
     student_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    user = db.query(User).filter(User.id == student.user_id).first()
+    user = await db.scalar(select(User).where(User.id == student.user_id))
 
-    db.delete(student)
+    await db.delete(student)
     if user:
-        db.delete(user)
-    db.commit()
+        await db.delete(user)
+    await db.commit()
     return {"message": "Student deleted successfully"}
 
 
@@ -176,9 +194,9 @@ async def list_teachers(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    teachers = db.query(Teacher).offset(skip).limit(limit).all()
+    teachers = (await db.scalars(select(Teacher).offset(skip).limit(limit))).all()
     return teachers
 
 
@@ -186,7 +204,7 @@ async def list_teachers(
 async def create_teacher(
     teacher_data: TeacherCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     user = User(
         email=teacher_data.email,
@@ -194,8 +212,17 @@ async def create_teacher(
         role=UserRole.TEACHER
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+
+    # Assign subjects and classes up front; collections can't lazy-load on an async session
+    subjects = []
+    if teacher_data.subject_ids:
+        subjects = (await db.scalars(select(Subject).where(Subject.id.in_(teacher_data.subject_ids)))).all()
+
+    classes = []
+    if teacher_data.class_ids:
+        classes = (await db.scalars(select(Class).where(Class.id.in_(teacher_data.class_ids)))).all()
 
     teacher = Teacher(
         user_id=user.id,
@@ -205,23 +232,13 @@ async def create_teacher(
         qualification=teacher_data.qualification,
         experience_years=teacher_data.experience_years,
         join_date=teacher_data.join_date,
-        address=teacher_data.address
+        address=teacher_data.address,
+        subjects=list(subjects),
+        classes=list(classes)
     )
     db.add(teacher)
-    db.commit()
-    db.refresh(teacher)
-
-    # Assign subjects and classes
-    if teacher_data.subject_ids:
-        subjects = db.query(Subject).filter(Subject.id.in_(teacher_data.subject_ids)).all()
-        teacher.subjects = subjects
-
-    if teacher_data.class_ids:
-        classes = db.query(Class).filter(Class.id.in_(teacher_data.class_ids)).all()
-        teacher.classes = classes
-
-    db.commit()
-    db.refresh(teacher)
+    await db.commit()
+    await db.refresh(teacher)
     return teacher
 
 
@@ -230,17 +247,17 @@ async def update_teacher(
     teacher_id: int,
     teacher_data: TeacherUpdate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    teacher = db.query(Teacher).filter(Teacher.id == teacher_id).first()
+    teacher = await db.get(Teacher, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
     for field, value in teacher_data.model_dump(exclude_unset=True).items():
         setattr(teacher, field, value)
 
-    db.commit()
-    db.refresh(teacher)
+    await db.commit()
+    await db.refresh(teacher)
     return teacher
 
 
@@ -248,38 +265,38 @@ async def update_teacher(
 async def delete_teacher(
     teacher_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    teacher = db.query(Teacher).filter(Teacher.id == teacher_id).first()
+    teacher = await db.get(Teacher, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
-    user = db.query(User).filter(User.id == teacher.user_id).first()
+    user = await db.scalar(select(User).where(User.id == teacher.user_id))
 
-    db.delete(teacher)
+    await db.delete(teacher)
     if user:
-        db.delete(user)
-    db.commit()
+        await db.delete(user)
+    await db.commit()
     return {"message": "Teacher deleted successfully"}
 
 
 # Fee Management
 @router.get("/fees", response_model=List[FeeResponse])
 async def list_fees(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
     status: Optional[FeeStatus] = None,
+    page: PageParams = Depends(page_params),
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Fee)
+    query = select(Fee)
     if status:
-        query = query.filter(Fee.status == status)
-    fees = query.offset(skip).limit(limit).all()
+        query = query.where(Fee.status == status)
+    fees = await paginate(db, query, [(Fee.id, False)], page, response)
 
     result = []
     for f in fees:
-        student = db.query(Student).filter(Student.id == f.student_id).first()
+        student = await db.get(Student, f.student_id)
         result.append(FeeResponse(
             id=f.id,
             student_id=f.student_id,
@@ -304,7 +321,7 @@ async def list_fees(
 async def create_fee(
     fee_data: FeeCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     fee = Fee(
         student_id=fee_data.student_id,
@@ -315,10 +332,10 @@ async def create_fee(
         academic_year=fee_data.academic_year
     )
     db.add(fee)
-    db.commit()
-    db.refresh(fee)
+    await db.commit()
+    await db.refresh(fee)
 
-    student = db.query(Student).filter(Student.id == fee.student_id).first()
+    student = await db.get(Student, fee.student_id)
     return FeeResponse(
         id=fee.id,
         student_id=fee.student_id,
@@ -342,9 +359,9 @@ async def create_fee(
 async def create_fees_bulk(
     fee_data: FeeBulkCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    students = db.query(Student).filter(Student.class_id == fee_data.class_id).all()
+    students = (await db.scalars(select(Student).where(Student.class_id == fee_data.class_id))).all()
 
     for student in students:
         fee = Fee(
@@ -357,24 +374,24 @@ async def create_fees_bulk(
         )
         db.add(fee)
 
-    db.commit()
+    await db.commit()
     return {"message": f"Fees created for {len(students)} students"}
 
 
 # Admission Management
 @router.get("/admissions", response_model=List[AdmissionResponse])
 async def list_admissions(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
     status: Optional[AdmissionStatus] = None,
+    page: PageParams = Depends(page_params),
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Admission)
+    query = select(Admission)
     if status:
-        query = query.filter(Admission.status == status)
-    admissions = query.order_by(Admission.created_at.desc()).offset(skip).limit(limit).all()
-    return admissions
+        query = query.where(Admission.status == status)
+    # Newest first; ids follow insertion order, so the primary key stands in for created_at
+    return await paginate(db, query, [(Admission.id, True)], page, response)
 
 
 @router.put("/admissions/{admission_id}", response_model=AdmissionResponse)
@@ -382,17 +399,17 @@ async def update_admission(
     admission_id: int,
     admission_data: AdmissionUpdate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    admission = db.query(Admission).filter(Admission.id == admission_id).first()
+    admission = await db.get(Admission, admission_id)
     if not admission:
         raise HTTPException(status_code=404, detail="Admission not found")
 
     for field, value in admission_data.model_dump(exclude_unset=True).items():
         setattr(admission, field, value)
 
-    db.commit()
-    db.refresh(admission)
+    await db.commit()
+    await db.refresh(admission)
     return admission
 
 
@@ -402,9 +419,9 @@ async def list_notices(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    notices = db.query(Notice).order_by(Notice.created_at.desc()).offset(skip).limit(limit).all()
+    notices = (await db.scalars(select(Notice).order_by(Notice.created_at.desc()).offset(skip).limit(limit))).all()
     return notices
 
 
@@ -412,7 +429,7 @@ async def list_notices(
 async def create_notice(
     notice_data: NoticeCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     notice = Notice(
         title=notice_data.title,
@@ -424,8 +441,8 @@ async def create_notice(
         created_by=current_user.id
     )
     db.add(notice)
-    db.commit()
-    db.refresh(notice)
+    await db.commit()
+    await db.refresh(notice)
     return notice
 
 
@@ -434,17 +451,17 @@ async def update_notice(
     notice_id: int,
     notice_data: NoticeUpdate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
+    notice = await db.get(Notice, notice_id)
     if not notice:
         raise HTTPException(status_code=404, detail="Notice not found")
 
     for field, value in notice_data.model_dump(exclude_unset=True).items():
         setattr(notice, field, value)
 
-    db.commit()
-    db.refresh(notice)
+    await db.commit()
+    await db.refresh(notice)
     return notice
 
 
@@ -452,14 +469,14 @@ async def update_notice(
 async def delete_notice(
     notice_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    notice = db.query(Notice).filter(Notice.id == notice_id).first()
+    notice = await db.get(Notice, notice_id)
     if not notice:
         raise HTTPException(status_code=404, detail="Notice not found")
 
-    db.delete(notice)
-    db.commit()
+    await db.delete(notice)
+    await db.commit()
     return {"message": "Notice deleted successfully"}
 
 
@@ -467,18 +484,18 @@ async def delete_notice(
 @router.get("/classes")
 async def list_classes(
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all classes with student count and class teacher info"""
-    classes = db.query(Class).all()
+    classes = (await db.scalars(select(Class))).all()
 
     result = []
     for c in classes:
-        student_count = db.query(Student).filter(Student.class_id == c.id).count()
+        student_count = await db.scalar(select(func.count()).select_from(Student).where(Student.class_id == c.id))
         class_teacher_name = None
 
         if c.class_teacher_id:
-            teacher = db.query(Teacher).filter(Teacher.id == c.class_teacher_id).first()
+            teacher = await db.get(Teacher, c.class_teacher_id)
             if teacher:
                 class_teacher_name = teacher.name
 
@@ -500,7 +517,7 @@ async def list_classes(
 async def create_class(
     class_data: ClassCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_class = Class(
         name=class_data.name,
@@ -510,8 +527,8 @@ async def create_class(
         room_number=class_data.room_number
     )
     db.add(new_class)
-    db.commit()
-    db.refresh(new_class)
+    await db.commit()
+    await db.refresh(new_class)
     return new_class
 
 
@@ -520,17 +537,17 @@ async def update_class(
     class_id: int,
     class_data: ClassUpdate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    class_obj = db.query(Class).filter(Class.id == class_id).first()
+    class_obj = await db.get(Class, class_id)
     if not class_obj:
         raise HTTPException(status_code=404, detail="Class not found")
 
     for field, value in class_data.model_dump(exclude_unset=True).items():
         setattr(class_obj, field, value)
 
-    db.commit()
-    db.refresh(class_obj)
+    await db.commit()
+    await db.refresh(class_obj)
     return class_obj
 
 
@@ -538,14 +555,14 @@ async def update_class(
 async def delete_class(
     class_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    class_obj = db.query(Class).filter(Class.id == class_id).first()
+    class_obj = await db.get(Class, class_id)
     if not class_obj:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    db.delete(class_obj)
-    db.commit()
+    await db.delete(class_obj)
+    await db.commit()
     return {"message": "Class deleted successfully"}
 
 
@@ -553,9 +570,9 @@ async def delete_class(
 @router.get("/subjects", response_model=List[SubjectResponse])
 async def list_subjects(
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    subjects = db.query(Subject).all()
+    subjects = (await db.scalars(select(Subject))).all()
     return subjects
 
 
@@ -563,7 +580,7 @@ async def list_subjects(
 async def create_subject(
     subject_data: SubjectCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     subject = Subject(
         name=subject_data.name,
@@ -572,32 +589,32 @@ async def create_subject(
         description=subject_data.description
     )
     db.add(subject)
-    db.commit()
-    db.refresh(subject)
+    await db.commit()
+    await db.refresh(subject)
     return subject
 
 
 # Attendance Management
 @router.get("/attendance", response_model=List[AttendanceResponse])
 async def list_attendance(
+    response: Response,
     class_id: Optional[int] = None,
     attendance_date: Optional[date] = None,
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(page_params),
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List attendance records with optional filters"""
-    query = db.query(Attendance)
+    query = select(Attendance)
 
     if attendance_date:
-        query = query.filter(Attendance.date == attendance_date)
+        query = query.where(Attendance.date == attendance_date)
 
     if class_id:
-        student_ids = db.query(Student.id).filter(Student.class_id == class_id).subquery()
-        query = query.filter(Attendance.student_id.in_(student_ids))
+        student_ids = select(Student.id).where(Student.class_id == class_id)
+        query = query.where(Attendance.student_id.in_(student_ids))
 
-    return query.order_by(Attendance.date.desc()).offset(skip).limit(limit).all()
+    return await paginate(db, query, [(Attendance.date, True), (Attendance.id, True)], page, response)
 
 
 @router.get("/attendance/class/{class_id}/date/{attendance_date}")
@@ -605,87 +622,97 @@ async def get_class_attendance(
     class_id: int,
     attendance_date: date,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get attendance for a specific class on a specific date"""
-    class_info = db.query(Class).filter(Class.id == class_id).first()
+    class_info = await db.get(Class, class_id)
     if not class_info:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    students = db.query(Student).filter(Student.class_id == class_id).all()
+    class_name = f"{class_info.name} {class_info.section or ''}".strip()
+    return await class_attendance_for_date(db, class_id, class_name, attendance_date)
 
-    records = []
-    present = absent = late = 0
 
-    for student in students:
-        attendance = db.query(Attendance).filter(
-            Attendance.student_id == student.id,
-            Attendance.date == attendance_date
-        ).first()
-
-        status = attendance.status if attendance else None
-        remarks = attendance.remarks if attendance else None
-
-        if status == AttendanceStatus.PRESENT:
-            present += 1
-        elif status == AttendanceStatus.ABSENT:
-            absent += 1
-        elif status == AttendanceStatus.LATE:
-            late += 1
-
-        records.append(StudentAttendanceRecord(
-            student_id=student.id,
-            student_name=student.name,
-            roll_no=student.roll_no,
-            status=status or AttendanceStatus.ABSENT,
-            remarks=remarks
-        ))
+@router.get("/attendance/class/{class_id}/register", response_model=ClassAttendanceRegister)
+async def get_class_attendance_register(
+    class_id: int,
+    start_date: date,
+    end_date: date,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a class's attendance for every day in a date range"""
+    class_info = await db.get(Class, class_id)
+    if not class_info:
+        raise HTTPException(status_code=404, detail="Class not found")
 
-    return ClassAttendanceResponse(
-        date=attendance_date,
-        class_id=class_id,
-        class_name=f"{class_info.name} {class_info.section or ''}".strip(),
-        total_students=len(students),
-        present=present,
-        absent=absent,
-        late=late,
-        records=records
-    )
+    class_name = f"{class_info.name} {class_info.section or ''}".strip()
+    try:
+        return await class_attendance_register(db, class_id, class_name, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/attendance/bulk")
+@router.post("/attendance/bulk", response_model=AttendanceBulkResult)
 async def mark_bulk_attendance(
     data: AttendanceBulkCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark attendance for multiple students at once"""
-    # Get admin's associated teacher if any, or use None
-    admin = db.query(Admin).filter(Admin.user_id == current_user.id).first()
-
-    for record in data.records:
-        existing = db.query(Attendance).filter(
-            Attendance.student_id == record["student_id"],
-            Attendance.date == data.date
-        ).first()
-
-        status = AttendanceStatus(record["status"])
-        remarks = record.get("remarks")
-
-        if existing:
-            existing.status = status
-            existing.remarks = remarks
-        else:
-            new_attendance = Attendance(
-                student_id=record["student_id"],
-                date=data.date,
-                status=status,
-                remarks=remarks
-            )
-            db.add(new_attendance)
-
-    db.commit()
-    return {"message": f"Attendance marked for {len(data.records)} students"}
+    try:
+        inserted, updated = await upsert_attendance(db, data.date, data.records)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Attendance records reference an unknown student")
+
+    return AttendanceBulkResult(
+        message=f"Attendance marked for {inserted + updated} students",
+        inserted=inserted,
+        updated=updated
+    )
+
+
+@router.get("/attendance/analytics", response_model=AttendanceAnalytics)
+async def get_attendance_analytics(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    class_id: Optional[int] = None,
+    lowest: int = Query(10, ge=1, le=100, description="Number of lowest-attendance students to rank"),
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Attendance rates by class, day, month and weekday, plus the lowest-attendance students (default: last 30 days)"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+    try:
+        return await class_attendance_analytics(db, start_date, end_date, class_id=class_id, lowest=lowest)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/attendance/flags/run", response_model=AbsenceCheckResult)
+async def run_attendance_flags(
+    as_of: Optional[date] = None,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Run the absence streak and rate check for a day (default: today), replacing its flags"""
+    summary = await db.run_sync(lambda session: run_absence_check(session.connection(), as_of))
+    await db.commit()
+    return summary
+
+
+@router.get("/attendance/flags", response_model=List[AttendanceFlagResponse])
+async def get_attendance_flags(
+    as_of: Optional[date] = None,
+    class_id: Optional[int] = None,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Students flagged for absence streaks or low attendance (default: latest run)"""
+    return await list_flags(db, as_of, [class_id] if class_id else None)
 
 
 @router.get("/attendance/summary/{student_id}")
@@ -693,27 +720,32 @@ async def get_student_attendance_summary(
     student_id: int,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    year_range: Tuple[date, date] = Depends(academic_year_range),
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get attendance summary for a student"""
-    student = db.query(Student).filter(Student.id == student_id).first()
+    """Get attendance summary for a student (current academic year unless dates are given)"""
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    query = db.query(Attendance).filter(Attendance.student_id == student_id)
+    query = select(Attendance.status, func.count()).where(Attendance.student_id == student_id)
 
-    if start_date:
-        query = query.filter(Attendance.date >= start_date)
-    if end_date:
-        query = query.filter(Attendance.date <= end_date)
+    if start_date or end_date:
+        if start_date:
+            query = query.where(Attendance.date >= start_date)
+        if end_date:
+            query = query.where(Attendance.date <= end_date)
+    else:
+        year_start, year_end = year_range
+        query = query.where(Attendance.date >= year_start, Attendance.date < year_end)
 
-    records = query.all()
-    total = len(records)
-    present = sum(1 for r in records if r.status == AttendanceStatus.PRESENT)
-    absent = sum(1 for r in records if r.status == AttendanceStatus.ABSENT)
-    late = sum(1 for r in records if r.status == AttendanceStatus.LATE)
-    excused = sum(1 for r in records if r.status == AttendanceStatus.EXCUSED)
+    counts = dict((await db.execute(query.group_by(Attendance.status))).all())
+    total = sum(counts.values())
+    present = counts.get(AttendanceStatus.PRESENT, 0)
+    absent = counts.get(AttendanceStatus.ABSENT, 0)
+    late = counts.get(AttendanceStatus.LATE, 0)
+    excused = counts.get(AttendanceStatus.EXCUSED, 0)
 
     percentage = (present / total * 100) if total > 0 else 0
 
@@ -732,19 +764,19 @@ async def get_student_attendance_summary(
 async def get_class_timetable(
     class_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get complete timetable for a class"""
-    class_info = db.query(Class).filter(Class.id == class_id).first()
+    class_info = await db.get(Class, class_id)
     if not class_info:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    entries = db.query(Timetable).filter(Timetable.class_id == class_id).all()
+    entries = (await db.scalars(select(Timetable).where(Timetable.class_id == class_id))).all()
 
     result = []
     for entry in entries:
-        subject = db.query(Subject).filter(Subject.id == entry.subject_id).first()
-        teacher = db.query(Teacher).filter(Teacher.id == entry.teacher_id).first()
+        subject = await db.scalar(select(Subject).where(Subject.id == entry.subject_id))
+        teacher = await db.scalar(select(Teacher).where(Teacher.id == entry.teacher_id))
 
         result.append(TimetableEntry(
             id=entry.id,
@@ -768,19 +800,19 @@ async def get_class_timetable(
 async def create_timetable_entry(
     data: TimetableCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new timetable entry"""
     # Check if slot already exists
-    existing = db.query(Timetable).filter(
+    existing = await db.scalar(select(Timetable).where(
         Timetable.class_id == data.class_id,
         Timetable.day == data.day,
         Timetable.period == data.period
-    ).first()
+    ).limit(1))
 
     if existing:
         raise HTTPException(
-            status_code=400,
+            status_code=409,
             detail="Timetable slot already exists for this class/day/period"
         )
 
@@ -795,24 +827,61 @@ async def create_timetable_entry(
         room=data.room
     )
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another request took the slot since the check
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Timetable slot already exists for this class/day/period"
+        )
+    await db.refresh(entry)
 
     return {"message": "Timetable entry created", "id": entry.id}
 
 
+@router.post("/timetable/generate", response_model=TimetableGenerationResult)
+async def generate_timetable_entries(
+    data: TimetableGenerate,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Generate a clash-free weekly timetable and replace the classes' entries with it"""
+    try:
+        result = await generate_timetable_async(db, data)
+        await db.commit()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return result
+
+
 @router.put("/timetable/{entry_id}")
 async def update_timetable_entry(
     entry_id: int,
     data: TimetableCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a timetable entry"""
-    entry = db.query(Timetable).filter(Timetable.id == entry_id).first()
+    entry = await db.get(Timetable, entry_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Timetable entry not found")
 
+    # Check the new slot is not taken by another entry of the class
+    existing = await db.scalar(select(Timetable.id).where(
+        Timetable.class_id == entry.class_id,
+        Timetable.day == data.day,
+        Timetable.period == data.period,
+        Timetable.id != entry.id
+    ).limit(1))
+
+    if existing:
+        raise HTTPException(
+            status_code=409,
+            detail="Timetable slot already exists for this class/day/period"
+        )
+
     entry.day = data.day
     entry.period = data.period
     entry.start_time = data.start_time
@@ -821,7 +890,15 @@ async def update_timetable_entry(
     entry.teacher_id = data.teacher_id
     entry.room = data.room
 
-    db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another request took the slot since the check
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Timetable slot already exists for this class/day/period"
+        )
     return {"message": "Timetable entry updated"}
 
 
@@ -829,35 +906,37 @@ async def update_timetable_entry(
 async def delete_timetable_entry(
     entry_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a timetable entry"""
-    entry = db.query(Timetable).filter(Timetable.id == entry_id).first()
+    entry = await db.get(Timetable, entry_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Timetable entry not found")
 
-    db.delete(entry)
-    db.commit()
+    await db.delete(entry)
+    await db.commit()
     return {"message": "Timetable entry deleted"}
 
 
 # Exam Management
 @router.get("/exams", response_model=List[ExamResponse])
 async def list_exams(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    page: PageParams = Depends(page_params),
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List all exams"""
-    return db.query(Exam).order_by(Exam.start_date.desc()).offset(skip).limit(limit).all()
+    # Exams without a start date sort last
+    start_date = func.coalesce(Exam.start_date, literal(date.min))
+    return await paginate(db, select(Exam), [(start_date, True), (Exam.id, True)], page, response)
 
 
 @router.post("/exams", response_model=ExamResponse)
 async def create_exam(
     data: ExamCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new exam"""
     exam = Exam(
@@ -868,8 +947,8 @@ async def create_exam(
         description=data.description
     )
     db.add(exam)
-    db.commit()
-    db.refresh(exam)
+    await db.commit()
+    await db.refresh(exam)
     return exam
 
 
@@ -877,10 +956,10 @@ async def create_exam(
 async def get_exam(
     exam_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get exam details"""
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
+    exam = await db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
     return exam
@@ -891,18 +970,18 @@ async def update_exam(
     exam_id: int,
     data: ExamUpdate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an exam"""
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
+    exam = await db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(exam, field, value)
 
-    db.commit()
-    db.refresh(exam)
+    await db.commit()
+    await db.refresh(exam)
     return exam
 
 
@@ -910,15 +989,15 @@ async def update_exam(
 async def delete_exam(
     exam_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an exam"""
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
+    exam = await db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
-    db.delete(exam)
-    db.commit()
+    await db.delete(exam)
+    await db.commit()
     return {"message": "Exam deleted"}
 
 
@@ -927,19 +1006,19 @@ async def delete_exam(
 async def get_exam_schedules(
     exam_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all schedules for an exam"""
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
+    exam = await db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
-    schedules = db.query(ExamSchedule).filter(ExamSchedule.exam_id == exam_id).all()
+    schedules = (await db.scalars(select(ExamSchedule).where(ExamSchedule.exam_id == exam_id))).all()
 
     result = []
     for s in schedules:
-        class_info = db.query(Class).filter(Class.id == s.class_id).first()
-        subject = db.query(Subject).filter(Subject.id == s.subject_id).first()
+        class_info = await db.get(Class, s.class_id)
+        subject = await db.get(Subject, s.subject_id)
 
         result.append(ExamScheduleResponse(
             id=s.id,
@@ -961,18 +1040,40 @@ async def get_exam_schedules(
     return result
 
 
+@router.get("/exams/{exam_id}/schedules/conflicts", response_model=ExamScheduleValidation)
+async def validate_exam_schedules(
+    exam_id: int,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Every class and room clash in an exam's schedule"""
+    if not await db.get(Exam, exam_id):
+        raise HTTPException(status_code=404, detail="Exam not found")
+
+    index = await exam_schedule_index(db, exam_id)
+    return ExamScheduleValidation(exam_id=exam_id, schedules=index.size, conflicts=index.all_conflicts())
+
+
 @router.post("/exams/{exam_id}/schedules")
 async def create_exam_schedule(
     exam_id: int,
     data: ExamScheduleCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create an exam schedule"""
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
+    exam = await db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
+    try:
+        paper = Paper.of(None, data.class_id, data.room, data.exam_date, data.start_time, data.end_time)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    conflicts = (await exam_schedule_index(db, exam_id, lock=True)).conflicts_with(paper)
+    if conflicts:
+        raise HTTPException(status_code=409, detail=f"Schedule conflicts: {describe_conflicts(conflicts)}")
+
     schedule = ExamSchedule(
         exam_id=exam_id,
         class_id=data.class_id,
@@ -985,128 +1086,255 @@ async def create_exam_schedule(
         room=data.room
     )
     db.add(schedule)
-    db.commit()
-    db.refresh(schedule)
+    await db.commit()
+    await db.refresh(schedule)
 
     return {"message": "Exam schedule created", "id": schedule.id}
 
 
+@router.put("/exams/schedules/{schedule_id}")
+async def update_exam_schedule(
+    schedule_id: int,
+    data: ExamScheduleUpdate,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update an exam schedule"""
+    schedule = await db.get(ExamSchedule, schedule_id)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    changes = data.model_dump(exclude_unset=True)
+    placement = {field: getattr(schedule, field) for field in ("class_id", "room", "exam_date", "start_time", "end_time")}
+    moved = {**placement, **changes}
+    try:
+        paper = Paper.of(
+            schedule.id, moved["class_id"], moved["room"], moved["exam_date"], moved["start_time"], moved["end_time"]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    conflicts = (await exam_schedule_index(db, schedule.exam_id, lock=True)).conflicts_with(paper)
+    if conflicts:
+        raise HTTPException(status_code=409, detail=f"Schedule conflicts: {describe_conflicts(conflicts)}")
+
+    for field, value in changes.items():
+        setattr(schedule, field, value)
+    await db.commit()
+    return {"message": "Schedule updated"}
+
+
 @router.delete("/exams/schedules/{schedule_id}")
 async def delete_exam_schedule(
     schedule_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an exam schedule"""
-    schedule = db.query(ExamSchedule).filter(ExamSchedule.id == schedule_id).first()
+    schedule = await db.get(ExamSchedule, schedule_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
 
-    db.delete(schedule)
-    db.commit()
+    await db.delete(schedule)
+    await db.commit()
     return {"message": "Schedule deleted"}
 
 
+# Exam Seating Plans
+@router.post("/exams/{exam_id}/seating-plans", response_model=SeatingPlanResponse)
+async def create_seating_plan(
+    exam_id: int,
+    data: SeatingPlanCreate,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Seat a sitting's students across rooms with no classmates adjacent, reusing an unchanged plan"""
+    if not await db.get(Exam, exam_id):
+        raise HTTPException(status_code=404, detail="Exam not found")
+
+    try:
+        plan_id, cached = await generate_seating_plan(db, exam_id, data)
+        await db.commit()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await seating_plan(db, exam_id, plan_id=plan_id, cached=cached)
+
+
+@router.get("/exams/{exam_id}/seating-plans", response_model=SeatingPlanResponse)
+async def get_seating_plan(
+    exam_id: int,
+    exam_date: date,
+    start_time: Optional[str] = None,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the stored seating plan of a sitting"""
+    plan = await seating_plan(db, exam_id, exam_date, start_time)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Seating plan not found")
+    return plan
+
+
+@router.get("/exams/{exam_id}/seating-plans/export")
+async def export_seating_plan(
+    exam_id: int,
+    exam_date: date,
+    start_time: Optional[str] = None,
+    format: str = Query("csv", enum=["csv", "xlsx"]),
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Export the stored seating plan of a sitting to CSV or Excel"""
+    plan = await seating_plan(db, exam_id, exam_date, start_time)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Seating plan not found")
+
+    output, media_type, filename = seating_plan_file(plan, format)
+    return StreamingResponse(
+        output,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 # Exam Results
-@router.get("/exams/{exam_id}/results")
+@router.get("/exams/{exam_id}/results", response_model=List[ExamResultResponse])
 async def get_exam_results(
     exam_id: int,
     class_id: Optional[int] = None,
     subject_id: Optional[int] = None,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get exam results with optional filters"""
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
+    exam = await db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
-    query = db.query(ExamResult).filter(ExamResult.exam_id == exam_id)
+    return await exam_results(db, exam_id, class_id=class_id, subject_id=subject_id)
 
-    if class_id:
-        student_ids = db.query(Student.id).filter(Student.class_id == class_id).subquery()
-        query = query.filter(ExamResult.student_id.in_(student_ids))
-
-    if subject_id:
-        query = query.filter(ExamResult.subject_id == subject_id)
-
-    results = query.all()
-
-    response = []
-    for r in results:
-        student = db.query(Student).filter(Student.id == r.student_id).first()
-        subject = db.query(Subject).filter(Subject.id == r.subject_id).first()
-        schedule = db.query(ExamSchedule).filter(
-            ExamSchedule.exam_id == exam_id,
-            ExamSchedule.subject_id == r.subject_id
-        ).first()
-
-        response.append(ExamResultResponse(
-            id=r.id,
-            exam_id=r.exam_id,
-            student_id=r.student_id,
-            subject_id=r.subject_id,
-            marks_obtained=r.marks_obtained,
-            grade=r.grade,
-            remarks=r.remarks,
-            student_name=student.name if student else None,
-            subject_name=subject.name if subject else None,
-            max_marks=schedule.max_marks if schedule else None,
-            created_at=r.created_at
-        ))
 
-    return response
+@router.get("/exams/{exam_id}/results/totals", response_model=List[StudentExamTotal])
+async def get_exam_totals(
+    exam_id: int,
+    class_id: Optional[int] = None,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Total marks and percentage per student for an exam"""
+    exam = await db.get(Exam, exam_id)
+    if not exam:
+        raise HTTPException(status_code=404, detail="Exam not found")
+
+    return await exam_totals(db, exam_id, class_id=class_id)
+
+
+@router.post("/exams/{exam_id}/report-cards", response_model=ReportCardRun)
+async def generate_exam_report_cards(
+    exam_id: int,
+    class_id: int,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Compute report cards with ranks for every section of a class, replacing earlier ones"""
+    if not await db.get(Exam, exam_id):
+        raise HTTPException(status_code=404, detail="Exam not found")
+    if not await db.get(Class, class_id):
+        raise HTTPException(status_code=404, detail="Class not found")
+
+    try:
+        summary = await generate_report_cards_async(db, exam_id, class_id)
+        await db.commit()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return summary
 
 
-@router.post("/exams/results/bulk")
+@router.get("/exams/{exam_id}/report-cards", response_model=List[ReportCardResponse])
+async def get_exam_report_cards(
+    exam_id: int,
+    class_id: Optional[int] = None,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stored report cards of an exam, by class rank"""
+    return await report_cards(db, exam_id=exam_id, class_ids=[class_id] if class_id else None)
+
+
+@router.post("/exams/{exam_id}/publish", response_model=ExamPublicationResponse)
+async def publish_exam_results(
+    exam_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Freeze an exam's results for parents and students and notify parents"""
+    if not await db.get(Exam, exam_id):
+        raise HTTPException(status_code=404, detail="Exam not found")
+
+    try:
+        summary = await publish_results_async(db, exam_id, current_user.id)
+        await db.commit()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if summary["notifications_queued"]:
+        background_tasks.add_task(dispatch_queued_notifications)
+    return summary
+
+
+@router.delete("/exams/{exam_id}/publish")
+async def unpublish_exam_results(
+    exam_id: int,
+    current_user: User = Depends(require_role([UserRole.ADMIN])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Withdraw an exam's published results"""
+    withdrawn = await db.run_sync(lambda session: unpublish_results(session.connection(), exam_id))
+    if not withdrawn:
+        raise HTTPException(status_code=404, detail="Exam results are not published")
+    await db.commit()
+    return {"message": "Exam results unpublished"}
+
+
+@router.post("/exams/results/bulk", response_model=MarksEntryResult)
 async def add_bulk_results(
     data: ExamResultBulkCreate,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add results for multiple students at once"""
-    exam = db.query(Exam).filter(Exam.id == data.exam_id).first()
+    exam = await db.get(Exam, data.exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
-    for result_data in data.results:
-        existing = db.query(ExamResult).filter(
-            ExamResult.exam_id == data.exam_id,
-            ExamResult.student_id == result_data["student_id"],
-            ExamResult.subject_id == data.subject_id
-        ).first()
-
-        if existing:
-            existing.marks_obtained = result_data["marks_obtained"]
-            existing.grade = result_data.get("grade")
-            existing.remarks = result_data.get("remarks")
-        else:
-            new_result = ExamResult(
-                exam_id=data.exam_id,
-                student_id=result_data["student_id"],
-                subject_id=data.subject_id,
-                marks_obtained=result_data["marks_obtained"],
-                grade=result_data.get("grade"),
-                remarks=result_data.get("remarks")
-            )
-            db.add(new_result)
-
-    db.commit()
-    return {"message": f"Results added for {len(data.results)} students"}
+    try:
+        inserted, updated = await upsert_marks(db, data.exam_id, data.subject_id, data.results)
+        await db.commit()
+    except MarksEntryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Results reference an unknown subject")
+
+    return MarksEntryResult(
+        message=f"Results added for {inserted + updated} students",
+        inserted=inserted,
+        updated=updated
+    )
 
 
 # Admin User Management
 @router.get("/admins")
 async def list_admins(
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List all admin users"""
-    admins = db.query(Admin).all()
+    admins = (await db.scalars(select(Admin))).all()
 
     result = []
     for admin in admins:
-        user = db.query(User).filter(User.id == admin.user_id).first()
+        user = await db.scalar(select(User).where(User.id == admin.user_id))
         result.append({
             "id": admin.id,
             "user_id": admin.user_id,
@@ -1129,10 +1357,10 @@ async def create_admin(
     phone: Optional[str] = None,
     designation: Optional[str] = None,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new admin user"""
-    existing = db.query(User).filter(User.email == email).first()
+    existing = await db.scalar(select(User).where(User.email == email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -1142,8 +1370,8 @@ async def create_admin(
         role=UserRole.ADMIN
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     admin = Admin(
         user_id=user.id,
@@ -1152,8 +1380,8 @@ async def create_admin(
         designation=designation
     )
     db.add(admin)
-    db.commit()
-    db.refresh(admin)
+    await db.commit()
+    await db.refresh(admin)
 
     return {"message": "Admin created", "id": admin.id}
 
@@ -1162,10 +1390,10 @@ async def create_admin(
 async def delete_admin(
     admin_id: int,
     current_user: User = Depends(require_role([UserRole.ADMIN])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an admin user"""
-    admin = db.query(Admin).filter(Admin.id == admin_id).first()
+    admin = await db.get(Admin, admin_id)
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
 
@@ -1173,11 +1401,29 @@ async def delete_admin(
     if admin.user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
-    user = db.query(User).filter(User.id == admin.user_id).first()
+    user = await db.scalar(select(User).where(User.id == admin.user_id))
 
-    db.delete(admin)
+    await db.delete(admin)
     if user:
-        db.delete(user)
-    db.commit()
+        await db.delete(user)
+    await db.commit()
 
     return {"message": "Admin deleted"}
+
+
+# ============ SYSTEM ============
+
+@router.get("/system/db-pool")
+async def get_db_pool_stats(
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Connection pool occupancy and checkout wait times for this worker"""
+    return get_pool_stats()
+
+
+@router.get("/system/scan-buffer")
+async def get_scan_buffer_stats(
+    current_user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Gate scanner check-ins buffered and written by this worker"""
+    return scan_buffer.stats()
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models import Admission, AdmissionStatus
 from app.schemas import AdmissionCreate, AdmissionResponse, AdmissionInquiry
 
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/admissions", tags=["Admissions"])
 @router.post("/inquiry", response_model=AdmissionResponse)
 async def submit_inquiry(
     inquiry: AdmissionInquiry,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Public endpoint for admission inquiry"""
     admission = Admission(
@@ -24,15 +24,15 @@ async def submit_inquiry(
         status=AdmissionStatus.PENDING
     )
     db.add(admission)
-    db.commit()
-    db.refresh(admission)
+    await db.commit()
+    await db.refresh(admission)
     return admission
 
 
 @router.post("/apply", response_model=AdmissionResponse)
 async def submit_application(
     application: AdmissionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Public endpoint for full admission application"""
     admission = Admission(
@@ -49,18 +49,18 @@ async def submit_application(
         status=AdmissionStatus.PENDING
     )
     db.add(admission)
-    db.commit()
-    db.refresh(admission)
+    await db.commit()
+    await db.refresh(admission)
     return admission
 
 
 @router.get("/status/{admission_id}", response_model=AdmissionResponse)
 async def check_status(
     admission_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check admission application status"""
-    admission = db.query(Admission).filter(Admission.id == admission_id).first()
+    admission = await db.get(Admission, admission_id)
     if not admission:
         raise HTTPException(status_code=404, detail="Admission application not found")
     return admission
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user
 from app.core.config import settings
 from app.models import User
@@ -80,7 +80,7 @@ def get_faq_response(message: str) -> Optional[str]:
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """AI-powered chatbot for school FAQs"""
 
@@ -138,7 +138,7 @@ async def chat(
 async def generate_questions(
     request: QuestionGenerationRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate questions using AI (for teachers)"""
 
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.database import get_async_db
 from app.core.security import (
     verify_password, get_password_hash, create_access_token,
     create_refresh_token, decode_token, get_current_user
@@ -15,8 +16,8 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     if not user or not verify_password(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,8 +37,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
 
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,14 +51,14 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         role=user_data.role
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return user
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(token_data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
     payload = decode_token(token_data.refresh_token)
     if payload.get("type") != "refresh":
         raise HTTPException(
@@ -66,7 +67,7 @@ async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(g
         )
 
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,23 +86,23 @@ async def get_me(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/profile")
-async def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_profile(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     profile_data = {"user": UserResponse.model_validate(current_user)}
 
     if current_user.role == UserRole.STUDENT:
-        student = db.query(Student).filter(Student.user_id == current_user.id).first()
+        student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
         if student:
             profile_data["profile"] = student
     elif current_user.role == UserRole.PARENT:
-        parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
+        parent = await db.scalar(select(Parent).where(Parent.user_id == current_user.id))
         if parent:
             profile_data["profile"] = parent
     elif current_user.role == UserRole.TEACHER:
-        teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+        teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
         if teacher:
             profile_data["profile"] = teacher
     elif current_user.role == UserRole.ADMIN:
-        admin = db.query(Admin).filter(Admin.user_id == current_user.id).first()
+        admin = await db.scalar(select(Admin).where(Admin.user_id == current_user.id))
         if admin:
             profile_data["profile"] = admin
 
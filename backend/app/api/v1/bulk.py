@@ -5,13 +5,14 @@ Supports CSV and Excel formats for Students, Teachers, Fees, etc.
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Optional
 import pandas as pd
 import io
 from datetime import datetime, date
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_read_db
 from app.core.security import get_current_user, require_role
 from app.models.user import User, UserRole
 from app.models.student import Student
@@ -31,21 +32,21 @@ router = APIRouter(prefix="/bulk", tags=["Bulk Import/Export"])
 async def export_students(
     format: str = Query("csv", enum=["csv", "xlsx"]),
     class_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Export all students to CSV or Excel."""
-    query = db.query(Student)
+    query = select(Student)
     if class_id:
-        query = query.filter(Student.class_id == class_id)
+        query = query.where(Student.class_id == class_id)
 
-    students = query.all()
+    students = (await db.scalars(query)).all()
 
     data = []
     for s in students:
-        class_info = db.query(Class).filter(Class.id == s.class_id).first()
-        parent_info = db.query(Parent).filter(Parent.id == s.parent_id).first()
-        user_info = db.query(User).filter(User.id == s.user_id).first()
+        class_info = await db.scalar(select(Class).where(Class.id == s.class_id))
+        parent_info = await db.scalar(select(Parent).where(Parent.id == s.parent_id))
+        user_info = await db.scalar(select(User).where(User.id == s.user_id))
 
         data.append({
             "admission_no": s.admission_no,
@@ -89,15 +90,15 @@ async def export_students(
 @router.get("/export/teachers")
 async def export_teachers(
     format: str = Query("csv", enum=["csv", "xlsx"]),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Export all teachers to CSV or Excel."""
-    teachers = db.query(Teacher).all()
+    teachers = (await db.scalars(select(Teacher))).all()
 
     data = []
     for t in teachers:
-        user_info = db.query(User).filter(User.id == t.user_id).first()
+        user_info = await db.scalar(select(User).where(User.id == t.user_id))
         data.append({
             "employee_id": t.employee_id,
             "name": t.name,
@@ -136,19 +137,19 @@ async def export_teachers(
 async def export_fees(
     format: str = Query("csv", enum=["csv", "xlsx"]),
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Export fees to CSV or Excel."""
-    query = db.query(Fee)
+    query = select(Fee)
     if status:
-        query = query.filter(Fee.status == status)
+        query = query.where(Fee.status == status)
 
-    fees = query.all()
+    fees = (await db.scalars(query)).all()
 
     data = []
     for f in fees:
-        student = db.query(Student).filter(Student.id == f.student_id).first()
+        student = await db.get(Student, f.student_id)
         data.append({
             "student_admission_no": student.admission_no if student else "",
             "student_name": student.name if student else "",
@@ -190,22 +191,22 @@ async def export_attendance(
     class_id: Optional[int] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.TEACHER]))
 ):
     """Export attendance records to CSV or Excel."""
-    query = db.query(Attendance)
+    query = select(Attendance)
 
     if start_date:
-        query = query.filter(Attendance.date >= datetime.strptime(start_date, "%Y-%m-%d").date())
+        query = query.where(Attendance.date >= datetime.strptime(start_date, "%Y-%m-%d").date())
     if end_date:
-        query = query.filter(Attendance.date <= datetime.strptime(end_date, "%Y-%m-%d").date())
+        query = query.where(Attendance.date <= datetime.strptime(end_date, "%Y-%m-%d").date())
 
-    attendance_records = query.all()
+    attendance_records = (await db.scalars(query)).all()
 
     data = []
     for a in attendance_records:
-        student = db.query(Student).filter(Student.id == a.student_id).first()
+        student = await db.get(Student, a.student_id)
         if class_id and student and student.class_id != class_id:
             continue
         data.append({
@@ -369,7 +370,7 @@ async def get_fee_template(
 @router.post("/import/students")
 async def import_students(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """
@@ -400,24 +401,24 @@ async def import_students(
         for idx, row in df.iterrows():
             try:
                 # Check if student already exists
-                existing = db.query(Student).filter(Student.admission_no == str(row['admission_no'])).first()
+                existing = await db.scalar(select(Student).where(Student.admission_no == str(row['admission_no'])))
                 if existing:
                     results["errors"].append(f"Row {idx+2}: Admission no {row['admission_no']} already exists")
                     results["failed"] += 1
                     continue
 
                 # Check if email already exists
-                existing_user = db.query(User).filter(User.email == row['email']).first()
+                existing_user = await db.scalar(select(User).where(User.email == row['email']))
                 if existing_user:
                     results["errors"].append(f"Row {idx+2}: Email {row['email']} already exists")
                     results["failed"] += 1
                     continue
 
                 # Find or create class
-                class_obj = db.query(Class).filter(
+                class_obj = await db.scalar(select(Class).where(
                     Class.name == row['class_name'],
                     Class.section == row.get('section', 'A')
-                ).first()
+                ).limit(1))
 
                 if not class_obj:
                     class_obj = Class(
@@ -426,7 +427,7 @@ async def import_students(
                         academic_year="2024-25"
                     )
                     db.add(class_obj)
-                    db.flush()
+                    await db.flush()
 
                 # Create parent if provided
                 parent_id = None
@@ -434,7 +435,7 @@ async def import_students(
                     parent_email = row.get('parent_email', f"parent_{row['admission_no']}@slnsvm.com")
 
                     # Check if parent user exists
-                    parent_user = db.query(User).filter(User.email == parent_email).first()
+                    parent_user = await db.scalar(select(User).where(User.email == parent_email))
                     if not parent_user:
                         parent_user = User(
                             email=parent_email,
@@ -443,7 +444,7 @@ async def import_students(
                             is_active=True
                         )
                         db.add(parent_user)
-                        db.flush()
+                        await db.flush()
 
                     parent = Parent(
                         user_id=parent_user.id,
@@ -453,7 +454,7 @@ async def import_students(
                         relation=row.get('parent_relation', 'Father')
                     )
                     db.add(parent)
-                    db.flush()
+                    await db.flush()
                     parent_id = parent.id
 
                 # Create student user
@@ -464,7 +465,7 @@ async def import_students(
                     is_active=True
                 )
                 db.add(student_user)
-                db.flush()
+                await db.flush()
 
                 # Parse date
                 dob = None
@@ -496,18 +497,18 @@ async def import_students(
                 results["errors"].append(f"Row {idx+2}: {str(e)}")
                 results["failed"] += 1
 
-        db.commit()
+        await db.commit()
         return results
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
 @router.post("/import/teachers")
 async def import_teachers(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Bulk import teachers from CSV or Excel file."""
@@ -535,14 +536,14 @@ async def import_teachers(
         for idx, row in df.iterrows():
             try:
                 # Check if teacher already exists
-                existing = db.query(Teacher).filter(Teacher.employee_id == str(row['employee_id'])).first()
+                existing = await db.scalar(select(Teacher).where(Teacher.employee_id == str(row['employee_id'])))
                 if existing:
                     results["errors"].append(f"Row {idx+2}: Employee ID {row['employee_id']} already exists")
                     results["failed"] += 1
                     continue
 
                 # Check if email already exists
-                existing_user = db.query(User).filter(User.email == row['email']).first()
+                existing_user = await db.scalar(select(User).where(User.email == row['email']))
                 if existing_user:
                     results["errors"].append(f"Row {idx+2}: Email {row['email']} already exists")
                     results["failed"] += 1
@@ -556,7 +557,7 @@ async def import_teachers(
                     is_active=True
                 )
                 db.add(teacher_user)
-                db.flush()
+                await db.flush()
 
                 # Parse join date
                 join_date = None
@@ -584,18 +585,18 @@ async def import_teachers(
                 results["errors"].append(f"Row {idx+2}: {str(e)}")
                 results["failed"] += 1
 
-        db.commit()
+        await db.commit()
         return results
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
 @router.post("/import/fees")
 async def import_fees(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role([UserRole.ADMIN]))
 ):
     """Bulk import fees from CSV or Excel file."""
@@ -623,9 +624,9 @@ async def import_fees(
         for idx, row in df.iterrows():
             try:
                 # Find student
-                student = db.query(Student).filter(
+                student = await db.scalar(select(Student).where(
                     Student.admission_no == str(row['student_admission_no'])
-                ).first()
+                ))
 
                 if not student:
                     results["errors"].append(f"Row {idx+2}: Student with admission no {row['student_admission_no']} not found")
@@ -656,9 +657,9 @@ async def import_fees(
                 results["errors"].append(f"Row {idx+2}: {str(e)}")
                 results["failed"] += 1
 
-        db.commit()
+        await db.commit()
         return results
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
@@ -1,63 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
-from app.core.database import get_db
+from datetime import date
+from app.core.database import get_read_db
+from app.core.pagination import PageParams, page_params, paginate
 from app.core.security import get_current_user
-from app.models import User, Fee, FeeStatus, Student
+from app.models import User, UserRole, Fee, FeeStatus, Student, Parent
 from app.schemas import FeeResponse
 
 router = APIRouter(prefix="/fees", tags=["Fees"])
 
 
-@router.get("/", response_model=List[FeeResponse])
-async def get_fees(
-    status: Optional[FeeStatus] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    query = db.query(Fee)
-    if status:
-        query = query.filter(Fee.status == status)
-    fees = query.all()
-
-    result = []
-    for f in fees:
-        student = db.query(Student).filter(Student.id == f.student_id).first()
-        result.append(FeeResponse(
-            id=f.id,
-            student_id=f.student_id,
-            student_name=student.name if student else None,
-            amount=f.amount,
-            fee_type=f.fee_type,
-            description=f.description,
-            due_date=f.due_date,
-            paid_date=f.paid_date,
-            paid_amount=f.paid_amount,
-            status=f.status,
-            payment_method=f.payment_method,
-            transaction_id=f.transaction_id,
-            receipt_number=f.receipt_number,
-            academic_year=f.academic_year,
-            created_at=f.created_at
-        ))
-    return result
-
-
-@router.get("/{fee_id}", response_model=FeeResponse)
-async def get_fee(
-    fee_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    fee = db.query(Fee).filter(Fee.id == fee_id).first()
-    if not fee:
-        raise HTTPException(status_code=404, detail="Fee not found")
-
-    student = db.query(Student).filter(Student.id == fee.student_id).first()
+def fee_response(fee: Fee, student_name: Optional[str]) -> FeeResponse:
     return FeeResponse(
         id=fee.id,
         student_id=fee.student_id,
-        student_name=student.name if student else None,
+        student_name=student_name,
         amount=fee.amount,
         fee_type=fee.fee_type,
         description=fee.description,
@@ -71,3 +30,60 @@ async def get_fee(
         academic_year=fee.academic_year,
         created_at=fee.created_at
     )
+
+
+def visible_fees(current_user: User):
+    """Fees joined to their student, limited to what the user may see.
+
+    Admins see every fee, students their own and parents their children's.
+    """
+    query = select(Fee, Student.name).join(Student, Student.id == Fee.student_id)
+    if current_user.role == UserRole.ADMIN:
+        return query
+    if current_user.role == UserRole.STUDENT:
+        return query.where(Student.user_id == current_user.id)
+    if current_user.role == UserRole.PARENT:
+        parent_id = select(Parent.id).where(Parent.user_id == current_user.id).scalar_subquery()
+        return query.where(Student.parent_id == parent_id)
+    raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+@router.get("/", response_model=List[FeeResponse])
+async def get_fees(
+    response: Response,
+    status: Optional[FeeStatus] = None,
+    class_id: Optional[int] = None,
+    academic_year: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    page: PageParams = Depends(page_params),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List fees visible to the current user, newest due date first"""
+    query = visible_fees(current_user)
+    if status:
+        query = query.where(Fee.status == status)
+    if class_id:
+        query = query.where(Student.class_id == class_id)
+    if academic_year:
+        query = query.where(Fee.academic_year == academic_year)
+    if due_from:
+        query = query.where(Fee.due_date >= due_from)
+    if due_to:
+        query = query.where(Fee.due_date <= due_to)
+
+    rows = await paginate(db, query, [(Fee.due_date, True), (Fee.id, True)], page, response)
+    return [fee_response(fee, student_name) for fee, student_name in rows]
+
+
+@router.get("/{fee_id}", response_model=FeeResponse)
+async def get_fee(
+    fee_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    row = (await db.execute(visible_fees(current_user).where(Fee.id == fee_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Fee not found")
+    return fee_response(*row)
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import get_current_user, require_role
 from app.models.user import User
 from app.services.notifications import notification_service
@@ -36,7 +37,7 @@ class NotificationResponse(BaseModel):
 async def send_notification(
     request: SendNotificationRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Send notifications to recipients (Admin only)."""
@@ -79,7 +80,7 @@ async def send_notification(
 async def send_fee_reminder(
     request: FeeReminderRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Send fee payment reminder to parent (Admin only)."""
@@ -88,11 +89,11 @@ async def send_fee_reminder(
     from app.models.parent import Parent
 
     # Get student and parent info
-    student = db.query(Student).filter(Student.id == request.student_id).first()
+    student = await db.get(Student, request.student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    parent = db.query(Parent).filter(Parent.id == student.parent_id).first()
+    parent = await db.scalar(select(Parent).where(Parent.id == student.parent_id))
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
 
@@ -121,7 +122,7 @@ async def send_attendance_alert(
     date: str,
     status: str,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_role(["admin", "teacher"]))
 ):
     """Send attendance alert to parent."""
@@ -129,11 +130,11 @@ async def send_attendance_alert(
     from app.models.student import Student
     from app.models.parent import Parent
 
-    student = db.query(Student).filter(Student.id == student_id).first()
+    student = await db.get(Student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    parent = db.query(Parent).filter(Parent.id == student.parent_id).first()
+    parent = await db.scalar(select(Parent).where(Parent.id == student.parent_id))
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
 
@@ -1,78 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, func, or_, and_
+from typing import List, Optional, Tuple
 from datetime import date, datetime
-from app.core.database import get_db
+from app.core.academic_year import academic_year_label, academic_year_range, current_academic_year
+from app.core.config import settings
+from app.core.database import get_async_db, get_read_db
+from app.core.http_cache import not_modified
 from app.core.security import get_current_user, require_role
+from app.services.attendance_calendar import attendance_calendars, calendar_summary
+from app.services.attendance_summary import attendance_percentage
+from app.services.result_publication import children_published_results, published_report_cards
 from app.models import (
-    User, UserRole, Parent, Student, Class, Attendance, AttendanceStatus,
+    User, UserRole, Parent, Student, Class, Attendance, AttendanceStatus, StudentAttendanceSummary,
     Fee, FeeStatus, Notice, Teacher, Subject, Message, MessageParticipantType,
     Exam, ExamSchedule, ExamResult, Assignment, AssignmentSubmission, Timetable, DayOfWeek
 )
 from app.schemas import (
-    ParentResponse, ParentDashboard, ChildInfo, FeeResponse, FeeSummary,
+    AttendanceCalendar,
+    ParentResponse, ParentDashboard, ChildInfo, FeeResponse, FeeSummary, ReportCardResponse,
     ConversationTeacher, MessageResponse, SendMessageRequest
 )
 
 router = APIRouter(prefix="/parents", tags=["Parents"])
 
 
-@router.get("/dashboard")
-async def get_parent_dashboard(
-    current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
-):
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
+async def get_parent(db: AsyncSession, current_user: User) -> Parent:
+    parent = await db.scalar(select(Parent).where(Parent.user_id == current_user.id))
     if not parent:
         raise HTTPException(status_code=404, detail="Parent profile not found")
+    return parent
+
+
+async def children_overview(db: AsyncSession, parent_id: int) -> List[Tuple[ChildInfo, float]]:
+    """Each child with class, current-year attendance and pending fee total,
+    from one grouped query whatever the number of children."""
+    summary = StudentAttendanceSummary
+    rows = (await db.execute(
+        select(
+            Student.id, Student.name, Student.admission_no, Student.section, Student.roll_no,
+            Class.name.label("class_name"),
+            summary.present, summary.absent, summary.late, summary.excused,
+            func.coalesce(func.sum(Fee.amount), 0).label("fee_pending")
+        )
+        .outerjoin(Class, Class.id == Student.class_id)
+        .outerjoin(summary, and_(
+            summary.student_id == Student.id,
+            summary.academic_year == academic_year_label(current_academic_year())
+        ))
+        .outerjoin(Fee, and_(
+            Fee.student_id == Student.id,
+            Fee.status.in_([FeeStatus.PENDING, FeeStatus.OVERDUE])
+        ))
+        .where(Student.parent_id == parent_id)
+        .group_by(
+            Student.id, Student.name, Student.admission_no, Student.section, Student.roll_no, Class.name,
+            summary.present, summary.absent, summary.late, summary.excused
+        )
+        .order_by(Student.id)
+    )).all()
 
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
-
-    children_info = []
-    total_pending = 0
-
-    for child in children:
-        class_info = db.query(Class).filter(Class.id == child.class_id).first()
+    return [
+        (
+            ChildInfo(
+                id=row.id,
+                name=row.name,
+                admission_no=row.admission_no,
+                class_name=row.class_name,
+                section=row.section,
+                roll_no=row.roll_no,
+                attendance_percentage=round(attendance_percentage(
+                    row.present or 0, row.absent or 0, row.late or 0, row.excused or 0
+                ), 2),
+                fee_status="paid" if row.fee_pending == 0 else "pending"
+            ),
+            float(row.fee_pending)
+        )
+        for row in rows
+    ]
 
-        # Attendance
-        total_attendance = db.query(Attendance).filter(Attendance.student_id == child.id).count()
-        present_count = db.query(Attendance).filter(
-            Attendance.student_id == child.id,
-            Attendance.status == AttendanceStatus.PRESENT
-        ).count()
-        attendance_pct = (present_count / total_attendance * 100) if total_attendance > 0 else 0
 
-        # Fees
-        pending = db.query(func.sum(Fee.amount)).filter(
-            Fee.student_id == child.id,
-            Fee.status.in_([FeeStatus.PENDING, FeeStatus.OVERDUE])
-        ).scalar() or 0
-        total_pending += float(pending)
-
-        fee_status = "paid" if pending == 0 else "pending"
-
-        children_info.append(ChildInfo(
-            id=child.id,
-            name=child.name,
-            admission_no=child.admission_no,
-            class_name=class_info.name if class_info else None,
-            section=child.section,
-            roll_no=child.roll_no,
-            attendance_percentage=round(attendance_pct, 2),
-            fee_status=fee_status
-        ))
+@router.get("/dashboard")
+async def get_parent_dashboard(
+    current_user: User = Depends(require_role([UserRole.PARENT])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    parent = await get_parent(db, current_user)
+    children = await children_overview(db, parent.id)
 
     # Notices
-    notices = db.query(Notice).filter(
+    notices = (await db.scalars(select(Notice).where(
         Notice.is_active == True,
         (Notice.target_role == None) | (Notice.target_role == UserRole.PARENT)
-    ).order_by(Notice.created_at.desc()).limit(5).all()
+    ).order_by(Notice.created_at.desc()).limit(5))).all()
 
     return {
         "parent": ParentResponse.model_validate(parent),
-        "children": children_info,
-        "total_fee_pending": total_pending,
+        "children": [child for child, _ in children],
+        "total_fee_pending": sum(pending for _, pending in children),
         "recent_notices": [{"id": n.id, "title": n.title, "priority": n.priority} for n in notices]
     }
 
@@ -80,57 +106,23 @@ async def get_parent_dashboard(
 @router.get("/children", response_model=List[ChildInfo])
 async def get_children(
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
-
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
-
-    children_info = []
-    for child in children:
-        class_info = db.query(Class).filter(Class.id == child.class_id).first()
-
-        total_attendance = db.query(Attendance).filter(Attendance.student_id == child.id).count()
-        present_count = db.query(Attendance).filter(
-            Attendance.student_id == child.id,
-            Attendance.status == AttendanceStatus.PRESENT
-        ).count()
-        attendance_pct = (present_count / total_attendance * 100) if total_attendance > 0 else 0
-
-        pending = db.query(func.sum(Fee.amount)).filter(
-            Fee.student_id == child.id,
-            Fee.status.in_([FeeStatus.PENDING, FeeStatus.OVERDUE])
-        ).scalar() or 0
-
-        children_info.append(ChildInfo(
-            id=child.id,
-            name=child.name,
-            admission_no=child.admission_no,
-            class_name=class_info.name if class_info else None,
-            section=child.section,
-            roll_no=child.roll_no,
-            attendance_percentage=round(attendance_pct, 2),
-            fee_status="paid" if pending == 0 else "pending"
-        ))
-
-    return children_info
+    parent = await get_parent(db, current_user)
+    return [child for child, _ in await children_overview(db, parent.id)]
 
 
 @router.get("/fees", response_model=FeeSummary)
 async def get_fees(
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
+    children = (await db.scalars(select(Student).where(Student.parent_id == parent.id))).all()
     child_ids = [c.id for c in children]
 
-    fees = db.query(Fee).filter(Fee.student_id.in_(child_ids)).all()
+    fees = (await db.scalars(select(Fee).where(Fee.student_id.in_(child_ids)))).all()
 
     total_fees = sum(float(f.amount) for f in fees)
     total_paid = sum(float(f.paid_amount or 0) for f in fees if f.status == FeeStatus.PAID)
@@ -139,7 +131,7 @@ async def get_fees(
 
     fee_responses = []
     for f in fees:
-        student = db.query(Student).filter(Student.id == f.student_id).first()
+        student = await db.get(Student, f.student_id)
         fee_responses.append(FeeResponse(
             id=f.id,
             student_id=f.student_id,
@@ -173,18 +165,16 @@ async def pay_fee(
     amount: float,
     payment_method: str,
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
-    fee = db.query(Fee).filter(Fee.id == fee_id).first()
+    fee = await db.get(Fee, fee_id)
     if not fee:
         raise HTTPException(status_code=404, detail="Fee not found")
 
     # Verify the fee belongs to parent's child
-    student = db.query(Student).filter(Student.id == fee.student_id).first()
+    student = await db.get(Student, fee.student_id)
     if not student or student.parent_id != parent.id:
         raise HTTPException(status_code=403, detail="Not authorized to pay this fee")
 
@@ -194,32 +184,56 @@ async def pay_fee(
     fee.status = FeeStatus.PAID if amount >= float(fee.amount) else FeeStatus.PARTIAL
     fee.receipt_number = f"RCP-{fee.id}-{date.today().strftime('%Y%m%d')}"
 
-    db.commit()
-    db.refresh(fee)
+    await db.commit()
+    await db.refresh(fee)
 
     return {"message": "Payment successful", "receipt_number": fee.receipt_number}
 
 
 @router.get("/attendance")
 async def get_children_attendance(
+    format: str = Query("full", enum=["full", "compact"]),
+    year_range: Tuple[date, date] = Depends(academic_year_range),
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get attendance records for all children of the parent"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
-
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
+    """Get attendance for all children of the parent within one academic year.
+
+    `format=compact` returns each child's whole year as a packed calendar string.
+    """
+    parent = await get_parent(db, current_user)
+
+    children = (await db.scalars(
+        select(Student).options(selectinload(Student.class_info)).where(Student.parent_id == parent.id)
+    )).all()
+
+    year_start, year_end = year_range
+    if format == "compact":
+        calendars = await attendance_calendars(db, [child.id for child in children], year_start.year)
+        return [
+            AttendanceCalendar(
+                student_id=child.id,
+                student_name=child.name,
+                class_name=child.class_info.name if child.class_info else None,
+                section=child.section,
+                academic_year=academic_year_label(year_start.year),
+                start_date=year_start,
+                days=calendars[child.id],
+                summary=calendar_summary(calendars[child.id])
+            )
+            for child in children
+        ]
 
     result = []
     for child in children:
-        class_info = db.query(Class).filter(Class.id == child.class_id).first()
+        class_info = child.class_info
 
-        # Get attendance records
-        attendance_records = db.query(Attendance).filter(
-            Attendance.student_id == child.id
-        ).order_by(Attendance.date.desc()).limit(30).all()
+        # Get attendance records (date bounds keep the scan to one partition)
+        attendance_records = (await db.scalars(select(Attendance).where(
+            Attendance.student_id == child.id,
+            Attendance.date >= year_start,
+            Attendance.date < year_end
+        ).order_by(Attendance.date.desc()).limit(30))).all()
 
         # Calculate summary
         total = len(attendance_records)
@@ -257,13 +271,13 @@ async def get_children_attendance(
 @router.get("/notices")
 async def get_parent_notices(
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get notices targeted to parents or general notices"""
-    notices = db.query(Notice).filter(
+    notices = (await db.scalars(select(Notice).where(
         Notice.is_active == True,
         (Notice.target_role == None) | (Notice.target_role == UserRole.PARENT)
-    ).order_by(Notice.created_at.desc()).all()
+    ).order_by(Notice.created_at.desc()))).all()
 
     return [
         {
@@ -284,19 +298,19 @@ async def get_parent_notices(
 @router.get("/messages/teachers", response_model=List[ConversationTeacher])
 async def get_teachers_for_messaging(
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get list of teachers the parent can message (teachers of their children)"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
     # Get all children
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
+    children = (await db.scalars(select(Student).where(Student.parent_id == parent.id))).all()
     child_class_ids = [c.class_id for c in children]
 
     # Get subjects for those classes
-    subjects = db.query(Subject).filter(Subject.class_id.in_(child_class_ids)).all()
+    subjects = (await db.scalars(
+        select(Subject).options(selectinload(Subject.teachers)).where(Subject.class_id.in_(child_class_ids))
+    )).all()
 
     # Get unique teachers from those subjects
     teacher_ids = set()
@@ -308,12 +322,12 @@ async def get_teachers_for_messaging(
                 teacher_subject_map[teacher.id] = []
             teacher_subject_map[teacher.id].append(subject.name)
 
-    teachers = db.query(Teacher).filter(Teacher.id.in_(teacher_ids)).all()
+    teachers = (await db.scalars(select(Teacher).where(Teacher.id.in_(teacher_ids)))).all()
 
     result = []
     for teacher in teachers:
         # Get last message and unread count
-        last_msg = db.query(Message).filter(
+        last_msg = await db.scalar(select(Message).where(
             or_(
                 and_(
                     Message.sender_id == parent.id,
@@ -328,15 +342,15 @@ async def get_teachers_for_messaging(
                     Message.receiver_type == MessageParticipantType.PARENT
                 )
             )
-        ).order_by(Message.created_at.desc()).first()
+        ).order_by(Message.created_at.desc()).limit(1))
 
-        unread_count = db.query(Message).filter(
+        unread_count = await db.scalar(select(func.count()).select_from(Message).where(
             Message.sender_id == teacher.id,
             Message.sender_type == MessageParticipantType.TEACHER,
             Message.receiver_id == parent.id,
             Message.receiver_type == MessageParticipantType.PARENT,
             Message.is_read == False
-        ).count()
+        ))
 
         subjects_str = ", ".join(teacher_subject_map.get(teacher.id, []))
 
@@ -359,18 +373,16 @@ async def get_teachers_for_messaging(
 async def get_conversation_with_teacher(
     teacher_id: int,
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all messages between the parent and a specific teacher"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
-    teacher = db.query(Teacher).filter(Teacher.id == teacher_id).first()
+    teacher = await db.get(Teacher, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
-    messages = db.query(Message).filter(
+    messages = (await db.scalars(select(Message).where(
         or_(
             and_(
                 Message.sender_id == parent.id,
@@ -385,17 +397,17 @@ async def get_conversation_with_teacher(
                 Message.receiver_type == MessageParticipantType.PARENT
             )
         )
-    ).order_by(Message.created_at.asc()).all()
+    ).order_by(Message.created_at.asc()))).all()
 
     # Mark unread messages from teacher as read
-    db.query(Message).filter(
+    await db.execute(update(Message).where(
         Message.sender_id == teacher.id,
         Message.sender_type == MessageParticipantType.TEACHER,
         Message.receiver_id == parent.id,
         Message.receiver_type == MessageParticipantType.PARENT,
         Message.is_read == False
-    ).update({"is_read": True, "read_at": datetime.now()})
-    db.commit()
+    ).values({"is_read": True, "read_at": datetime.now()}))
+    await db.commit()
 
     return messages
 
@@ -404,14 +416,12 @@ async def get_conversation_with_teacher(
 async def send_message_to_teacher(
     request: SendMessageRequest,
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message to a teacher"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
-    teacher = db.query(Teacher).filter(Teacher.id == request.teacher_id).first()
+    teacher = await db.get(Teacher, request.teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
@@ -427,8 +437,8 @@ async def send_message_to_teacher(
     )
 
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
 
     return message
 
@@ -437,25 +447,23 @@ async def send_message_to_teacher(
 async def mark_message_as_read(
     message_id: int,
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a message as read"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
-    message = db.query(Message).filter(
+    message = await db.scalar(select(Message).where(
         Message.id == message_id,
         Message.receiver_id == parent.id,
         Message.receiver_type == MessageParticipantType.PARENT
-    ).first()
+    ).limit(1))
 
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
     message.is_read = True
     message.read_at = datetime.now()
-    db.commit()
+    await db.commit()
 
     return {"message": "Message marked as read"}
 
@@ -464,76 +472,30 @@ async def mark_message_as_read(
 
 @router.get("/results")
 async def get_children_exam_results(
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get exam results for all children"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
-
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
-
-    result = []
-    for child in children:
-        class_info = db.query(Class).filter(Class.id == child.class_id).first()
-
-        # Get all exam results for this student
-        exam_results = db.query(ExamResult).filter(
-            ExamResult.student_id == child.id
-        ).all()
-
-        # Group results by exam
-        exams_data = {}
-        for er in exam_results:
-            exam = db.query(Exam).filter(Exam.id == er.exam_id).first()
-            subject = db.query(Subject).filter(Subject.id == er.subject_id).first()
-
-            # Get max marks from schedule
-            schedule = db.query(ExamSchedule).filter(
-                ExamSchedule.exam_id == er.exam_id,
-                ExamSchedule.subject_id == er.subject_id,
-                ExamSchedule.class_id == child.class_id
-            ).first()
-
-            if exam:
-                if exam.id not in exams_data:
-                    exams_data[exam.id] = {
-                        "exam_id": exam.id,
-                        "exam_name": exam.name,
-                        "academic_year": exam.academic_year,
-                        "subjects": [],
-                        "total_marks": 0,
-                        "obtained_marks": 0
-                    }
-
-                max_marks = schedule.max_marks if schedule else 100
-                exams_data[exam.id]["subjects"].append({
-                    "subject_name": subject.name if subject else "Unknown",
-                    "marks_obtained": float(er.marks_obtained) if er.marks_obtained else 0,
-                    "max_marks": max_marks,
-                    "grade": er.grade,
-                    "remarks": er.remarks
-                })
-                exams_data[exam.id]["total_marks"] += max_marks
-                exams_data[exam.id]["obtained_marks"] += float(er.marks_obtained) if er.marks_obtained else 0
-
-        # Calculate percentage for each exam
-        for exam_id in exams_data:
-            total = exams_data[exam_id]["total_marks"]
-            obtained = exams_data[exam_id]["obtained_marks"]
-            exams_data[exam_id]["percentage"] = round((obtained / total * 100) if total > 0 else 0, 2)
-
-        result.append({
-            "student_id": child.id,
-            "student_name": child.name,
-            "class_name": class_info.name if class_info else None,
-            "section": child.section,
-            "roll_no": child.roll_no,
-            "exams": list(exams_data.values())
-        })
-
-    return result
+    """Get published exam results for all children"""
+    parent = await get_parent(db, current_user)
+    children, etag = await children_published_results(db, parent.id)
+    cached = not_modified(request, response, etag, settings.RESULTS_CACHE_MAX_AGE)
+    if cached is not None:
+        return cached
+    return children
+
+
+@router.get("/report-cards", response_model=List[ReportCardResponse])
+async def get_children_report_cards(
+    exam_id: Optional[int] = None,
+    current_user: User = Depends(require_role([UserRole.PARENT])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the published report cards of all children"""
+    parent = await get_parent(db, current_user)
+    child_ids = (await db.scalars(select(Student.id).where(Student.parent_id == parent.id))).all()
+    return await published_report_cards(db, list(child_ids), exam_id=exam_id)
 
 
 # ============ ASSIGNMENTS ============
@@ -541,34 +503,32 @@ async def get_children_exam_results(
 @router.get("/assignments")
 async def get_children_assignments(
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get assignments for all children"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
+    children = (await db.scalars(select(Student).where(Student.parent_id == parent.id))).all()
 
     result = []
     for child in children:
-        class_info = db.query(Class).filter(Class.id == child.class_id).first()
+        class_info = await db.scalar(select(Class).where(Class.id == child.class_id))
 
         # Get all assignments for this child's class
-        assignments = db.query(Assignment).filter(
+        assignments = (await db.scalars(select(Assignment).where(
             Assignment.class_id == child.class_id
-        ).order_by(Assignment.due_date.desc()).all()
+        ).order_by(Assignment.due_date.desc()))).all()
 
         assignments_data = []
         for assignment in assignments:
-            subject = db.query(Subject).filter(Subject.id == assignment.subject_id).first()
-            teacher = db.query(Teacher).filter(Teacher.id == assignment.teacher_id).first()
+            subject = await db.get(Subject, assignment.subject_id)
+            teacher = await db.get(Teacher, assignment.teacher_id)
 
             # Check if child has submitted
-            submission = db.query(AssignmentSubmission).filter(
+            submission = await db.scalar(select(AssignmentSubmission).where(
                 AssignmentSubmission.assignment_id == assignment.id,
                 AssignmentSubmission.student_id == child.id
-            ).first()
+            ).limit(1))
 
             # Determine status
             today = date.today()
@@ -614,29 +574,27 @@ async def get_children_assignments(
 @router.get("/timetable")
 async def get_children_timetable(
     current_user: User = Depends(require_role([UserRole.PARENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get timetable for all children"""
-    parent = db.query(Parent).filter(Parent.user_id == current_user.id).first()
-    if not parent:
-        raise HTTPException(status_code=404, detail="Parent profile not found")
+    parent = await get_parent(db, current_user)
 
-    children = db.query(Student).filter(Student.parent_id == parent.id).all()
+    children = (await db.scalars(select(Student).where(Student.parent_id == parent.id))).all()
 
     result = []
     for child in children:
-        class_info = db.query(Class).filter(Class.id == child.class_id).first()
+        class_info = await db.scalar(select(Class).where(Class.id == child.class_id))
 
         # Get timetable entries for this child's class
-        entries = db.query(Timetable).filter(
+        entries = (await db.scalars(select(Timetable).where(
             Timetable.class_id == child.class_id
-        ).order_by(Timetable.day, Timetable.period).all()
+        ).order_by(Timetable.day, Timetable.period))).all()
 
         # Group by day
         timetable_by_day = {}
         for entry in entries:
-            subject = db.query(Subject).filter(Subject.id == entry.subject_id).first()
-            teacher = db.query(Teacher).filter(Teacher.id == entry.teacher_id).first()
+            subject = await db.scalar(select(Subject).where(Subject.id == entry.subject_id))
+            teacher = await db.scalar(select(Teacher).where(Teacher.id == entry.teacher_id))
 
             day_name = entry.day.value if entry.day else "unknown"
             if day_name not in timetable_by_day:
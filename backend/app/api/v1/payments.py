@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import razorpay
 import hmac
 import hashlib
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.config import settings
 from app.core.security import get_current_user
 from app.models.user import User
@@ -57,7 +57,7 @@ class PaymentResponse(BaseModel):
 @router.post("/create-order", response_model=CreateOrderResponse)
 async def create_payment_order(
     request: CreateOrderRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a Razorpay order for fee payment."""
@@ -70,7 +70,7 @@ async def create_payment_order(
         )
 
     # Get the fee record
-    fee = db.query(Fee).filter(Fee.id == request.fee_id).first()
+    fee = await db.get(Fee, request.fee_id)
     if not fee:
         raise HTTPException(status_code=404, detail="Fee record not found")
 
@@ -119,7 +119,7 @@ async def create_payment_order(
 @router.post("/verify", response_model=PaymentResponse)
 async def verify_payment(
     request: VerifyPaymentRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Verify Razorpay payment and update fee status."""
@@ -142,7 +142,7 @@ async def verify_payment(
         raise HTTPException(status_code=400, detail="Payment verification failed")
 
     # Update fee record
-    fee = db.query(Fee).filter(Fee.id == request.fee_id).first()
+    fee = await db.get(Fee, request.fee_id)
     if not fee:
         raise HTTPException(status_code=404, detail="Fee record not found")
 
@@ -155,7 +155,7 @@ async def verify_payment(
     fee.transaction_id = request.razorpay_payment_id
     fee.receipt_number = receipt_number
 
-    db.commit()
+    await db.commit()
 
     return PaymentResponse(
         success=True,
@@ -168,12 +168,12 @@ async def verify_payment(
 @router.get("/status/{fee_id}")
 async def get_payment_status(
     fee_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get payment status for a fee."""
 
-    fee = db.query(Fee).filter(Fee.id == fee_id).first()
+    fee = await db.get(Fee, fee_id)
     if not fee:
         raise HTTPException(status_code=404, detail="Fee record not found")
 
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.core.security import require_scanner_key
+from app.schemas import ScanBatch, ScanBatchResult
+from app.services.scan_ingest import scan_buffer
+
+router = APIRouter(prefix="/scanners", tags=["Scanners"])
+
+
+@router.post("/events", response_model=ScanBatchResult, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_scan_events(
+    batch: ScanBatch,
+    scanner_key: str = Depends(require_scanner_key)
+):
+    """Queue a batch of gate check-ins; they reach attendance within a few seconds"""
+    if scan_buffer.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many check-ins waiting to be written, retry shortly",
+            headers={"Retry-After": "5"}
+        )
+
+    accepted, duplicates, rejected = scan_buffer.add(batch.events)
+    return ScanBatchResult(
+        accepted=accepted, duplicates=duplicates, rejected=rejected, pending=scan_buffer.pending
+    )
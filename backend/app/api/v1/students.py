@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, func, or_, and_
+from typing import List, Optional, Tuple
 from datetime import date, datetime, timedelta
 from pydantic import BaseModel
-from app.core.database import get_db
+from app.core.academic_year import academic_year_label, academic_year_range
+from app.core.config import settings
+from app.core.database import get_async_db, get_read_db
+from app.core.http_cache import not_modified
 from app.core.security import get_current_user, require_role
+from app.services.attendance_calendar import attendance_calendars, calendar_summary
+from app.services.attendance_summary import attendance_percentages
+from app.services.result_publication import published_report_cards, student_published_results
 from app.models import (
     User, UserRole, Student, Class, Subject, Timetable,
     Assignment, AssignmentSubmission, Attendance, AttendanceStatus,
@@ -14,7 +21,7 @@ from app.models import (
 )
 from app.schemas import (
     StudentResponse, StudentDashboard, TimetableResponse, TimetableEntry,
-    AssignmentResponse, AttendanceResponse, AttendanceSummary
+    AssignmentResponse, AttendanceResponse, AttendanceSummary, AttendanceCalendar, ReportCardResponse
 )
 
 
@@ -33,43 +40,38 @@ router = APIRouter(prefix="/students", tags=["Students"])
 @router.get("/dashboard")
 async def get_student_dashboard(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    # Calculate attendance percentage
-    total_attendance = db.query(Attendance).filter(Attendance.student_id == student.id).count()
-    present_count = db.query(Attendance).filter(
-        Attendance.student_id == student.id,
-        Attendance.status == AttendanceStatus.PRESENT
-    ).count()
-    attendance_percentage = (present_count / total_attendance * 100) if total_attendance > 0 else 0
+    # Attendance percentage for the current academic year, from the summary counters
+    attendance_percentage = (await attendance_percentages(db, [student.id]))[student.id]
 
     # Pending assignments
-    pending_assignments = db.query(Assignment).filter(
+    pending_assignments = await db.scalar(select(func.count()).select_from(Assignment).where(
         Assignment.class_id == student.class_id,
         Assignment.due_date >= date.today()
-    ).count()
+    ))
 
     # Pending fees
-    pending_fees = db.query(func.sum(Fee.amount)).filter(
+    pending_fees = await db.scalar(select(func.sum(Fee.amount)).where(
         Fee.student_id == student.id,
         Fee.status.in_([FeeStatus.PENDING, FeeStatus.OVERDUE])
-    ).scalar() or 0
+    )) or 0
 
     # Recent notices
-    notices = db.query(Notice).filter(
+    notices = (await db.scalars(select(Notice).where(
         Notice.is_active == True,
         (Notice.target_role == None) | (Notice.target_role == UserRole.STUDENT)
-    ).order_by(Notice.created_at.desc()).limit(5).all()
+    ).order_by(Notice.created_at.desc()).limit(5))).all()
 
     # Upcoming exams count
-    upcoming_exams = db.query(ExamSchedule).filter(
+    upcoming_exams = await db.scalar(select(func.count()).select_from(ExamSchedule).where(
         ExamSchedule.class_id == student.class_id,
         ExamSchedule.exam_date >= date.today()
-    ).count()
+    ))
 
     return {
         "student": StudentResponse.model_validate(student),
@@ -84,23 +86,23 @@ async def get_student_dashboard(
 @router.get("/timetable", response_model=TimetableResponse)
 async def get_student_timetable(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    class_info = db.query(Class).filter(Class.id == student.class_id).first()
+    class_info = await db.scalar(select(Class).where(Class.id == student.class_id))
     if not class_info:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    timetable = db.query(Timetable).filter(Timetable.class_id == student.class_id).all()
+    timetable = (await db.scalars(select(Timetable).where(Timetable.class_id == student.class_id))).all()
 
     entries = []
     for entry in timetable:
-        subject = db.query(Subject).filter(Subject.id == entry.subject_id).first()
+        subject = await db.scalar(select(Subject).where(Subject.id == entry.subject_id))
         from app.models import Teacher
-        teacher = db.query(Teacher).filter(Teacher.id == entry.teacher_id).first()
+        teacher = await db.scalar(select(Teacher).where(Teacher.id == entry.teacher_id))
         entries.append(TimetableEntry(
             id=entry.id,
             day=entry.day,
@@ -122,22 +124,22 @@ async def get_student_timetable(
 @router.get("/assignments", response_model=List[AssignmentResponse])
 async def get_student_assignments(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    assignments = db.query(Assignment).filter(
+    assignments = (await db.scalars(select(Assignment).where(
         Assignment.class_id == student.class_id
-    ).order_by(Assignment.due_date.desc()).all()
+    ).order_by(Assignment.due_date.desc()))).all()
 
     result = []
     for a in assignments:
-        class_info = db.query(Class).filter(Class.id == a.class_id).first()
-        subject = db.query(Subject).filter(Subject.id == a.subject_id).first()
+        class_info = await db.get(Class, a.class_id)
+        subject = await db.get(Subject, a.subject_id)
         from app.models import Teacher
-        teacher = db.query(Teacher).filter(Teacher.id == a.teacher_id).first()
+        teacher = await db.get(Teacher, a.teacher_id)
         result.append(AssignmentResponse(
             id=a.id,
             title=a.title,
@@ -159,22 +161,27 @@ async def get_student_assignments(
 
 @router.get("/attendance", response_model=AttendanceSummary)
 async def get_student_attendance(
+    year_range: Tuple[date, date] = Depends(academic_year_range),
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    """Attendance summary for one academic year (the current one by default)"""
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    attendance_records = db.query(Attendance).filter(
-        Attendance.student_id == student.id
-    ).all()
+    year_start, year_end = year_range
+    counts = dict((await db.execute(select(Attendance.status, func.count()).where(
+        Attendance.student_id == student.id,
+        Attendance.date >= year_start,
+        Attendance.date < year_end
+    ).group_by(Attendance.status))).all())
 
-    total = len(attendance_records)
-    present = len([a for a in attendance_records if a.status == AttendanceStatus.PRESENT])
-    absent = len([a for a in attendance_records if a.status == AttendanceStatus.ABSENT])
-    late = len([a for a in attendance_records if a.status == AttendanceStatus.LATE])
-    excused = len([a for a in attendance_records if a.status == AttendanceStatus.EXCUSED])
+    total = sum(counts.values())
+    present = counts.get(AttendanceStatus.PRESENT, 0)
+    absent = counts.get(AttendanceStatus.ABSENT, 0)
+    late = counts.get(AttendanceStatus.LATE, 0)
+    excused = counts.get(AttendanceStatus.EXCUSED, 0)
 
     percentage = (present / total * 100) if total > 0 else 0
 
@@ -188,44 +195,72 @@ async def get_student_attendance(
     )
 
 
+@router.get("/attendance/calendar", response_model=AttendanceCalendar)
+async def get_student_attendance_calendar(
+    year_range: Tuple[date, date] = Depends(academic_year_range),
+    current_user: User = Depends(require_role([UserRole.STUDENT])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Whole academic year as a packed calendar string, one character per day"""
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
+    if not student:
+        raise HTTPException(status_code=404, detail="Student profile not found")
+
+    year_start, _ = year_range
+    days = (await attendance_calendars(db, [student.id], year_start.year))[student.id]
+    return AttendanceCalendar(
+        student_id=student.id,
+        student_name=student.name,
+        academic_year=academic_year_label(year_start.year),
+        start_date=year_start,
+        days=days,
+        summary=calendar_summary(days)
+    )
+
+
 @router.get("/results")
 async def get_student_results(
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    """Get the student's published exam results"""
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    from app.models import ExamResult, Exam, Subject
-    results = db.query(ExamResult).filter(ExamResult.student_id == student.id).all()
+    results, etag = await student_published_results(db, student.id)
+    cached = not_modified(request, response, etag, settings.RESULTS_CACHE_MAX_AGE)
+    if cached is not None:
+        return cached
+    return results
 
-    result_data = []
-    for r in results:
-        exam = db.query(Exam).filter(Exam.id == r.exam_id).first()
-        subject = db.query(Subject).filter(Subject.id == r.subject_id).first()
-        result_data.append({
-            "id": r.id,
-            "exam_name": exam.name if exam else None,
-            "subject_name": subject.name if subject else None,
-            "marks_obtained": float(r.marks_obtained) if r.marks_obtained else None,
-            "grade": r.grade,
-            "remarks": r.remarks
-        })
 
-    return result_data
+@router.get("/report-cards", response_model=List[ReportCardResponse])
+async def get_student_report_cards(
+    exam_id: Optional[int] = None,
+    current_user: User = Depends(require_role([UserRole.STUDENT])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the student's published report cards"""
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
+    if not student:
+        raise HTTPException(status_code=404, detail="Student profile not found")
+
+    return await published_report_cards(db, [student.id], exam_id=exam_id)
 
 
 @router.get("/notices")
 async def get_student_notices(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get notices targeted to students or general notices"""
-    notices = db.query(Notice).filter(
+    notices = (await db.scalars(select(Notice).where(
         Notice.is_active == True,
         (Notice.target_role == None) | (Notice.target_role == UserRole.STUDENT)
-    ).order_by(Notice.created_at.desc()).all()
+    ).order_by(Notice.created_at.desc()))).all()
 
     return [
         {
@@ -246,28 +281,28 @@ async def get_student_notices(
 @router.get("/assignments/with-submissions")
 async def get_student_assignments_with_submissions(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all assignments with submission status"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    assignments = db.query(Assignment).filter(
+    assignments = (await db.scalars(select(Assignment).where(
         Assignment.class_id == student.class_id
-    ).order_by(Assignment.due_date.desc()).all()
+    ).order_by(Assignment.due_date.desc()))).all()
 
     result = []
     for a in assignments:
-        class_info = db.query(Class).filter(Class.id == a.class_id).first()
-        subject = db.query(Subject).filter(Subject.id == a.subject_id).first()
-        teacher = db.query(Teacher).filter(Teacher.id == a.teacher_id).first()
+        class_info = await db.get(Class, a.class_id)
+        subject = await db.get(Subject, a.subject_id)
+        teacher = await db.get(Teacher, a.teacher_id)
 
         # Get submission for this student
-        submission = db.query(AssignmentSubmission).filter(
+        submission = await db.scalar(select(AssignmentSubmission).where(
             AssignmentSubmission.assignment_id == a.id,
             AssignmentSubmission.student_id == student.id
-        ).first()
+        ).limit(1))
 
         # Determine status
         today = date.today()
@@ -311,27 +346,27 @@ async def submit_assignment(
     assignment_id: int,
     request: SubmitAssignmentRequest,
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit an assignment"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
     # Check if assignment exists and is for this student's class
-    assignment = db.query(Assignment).filter(
+    assignment = await db.scalar(select(Assignment).where(
         Assignment.id == assignment_id,
         Assignment.class_id == student.class_id
-    ).first()
+    ).limit(1))
 
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
     # Check if already submitted
-    existing = db.query(AssignmentSubmission).filter(
+    existing = await db.scalar(select(AssignmentSubmission).where(
         AssignmentSubmission.assignment_id == assignment_id,
         AssignmentSubmission.student_id == student.id
-    ).first()
+    ).limit(1))
 
     if existing:
         raise HTTPException(status_code=400, detail="Assignment already submitted")
@@ -353,8 +388,8 @@ async def submit_assignment(
         submitted_at=datetime.now()
     )
     db.add(submission)
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
 
     return {
         "message": "Assignment submitted successfully",
@@ -367,14 +402,14 @@ async def submit_assignment(
 @router.get("/fees")
 async def get_student_fees(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get student's fee details"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    fees = db.query(Fee).filter(Fee.student_id == student.id).order_by(Fee.due_date.desc()).all()
+    fees = (await db.scalars(select(Fee).where(Fee.student_id == student.id).order_by(Fee.due_date.desc()))).all()
 
     # Calculate summary
     total_amount = sum(float(f.amount) for f in fees)
@@ -411,24 +446,24 @@ async def get_student_fees(
 @router.get("/exam-schedule")
 async def get_student_exam_schedule(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get upcoming exam schedule for the student"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
     # Get upcoming exams (schedules for this class with future dates)
-    schedules = db.query(ExamSchedule).filter(
+    schedules = (await db.scalars(select(ExamSchedule).where(
         ExamSchedule.class_id == student.class_id,
         ExamSchedule.exam_date >= date.today()
-    ).order_by(ExamSchedule.exam_date, ExamSchedule.start_time).all()
+    ).order_by(ExamSchedule.exam_date, ExamSchedule.start_time))).all()
 
     # Group by exam
     exams_data = {}
     for schedule in schedules:
-        exam = db.query(Exam).filter(Exam.id == schedule.exam_id).first()
-        subject = db.query(Subject).filter(Subject.id == schedule.subject_id).first()
+        exam = await db.get(Exam, schedule.exam_id)
+        subject = await db.get(Subject, schedule.subject_id)
 
         if exam:
             if exam.id not in exams_data:
@@ -457,14 +492,14 @@ async def get_student_exam_schedule(
 @router.get("/profile")
 async def get_student_profile(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get student profile details"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    class_info = db.query(Class).filter(Class.id == student.class_id).first()
+    class_info = await db.scalar(select(Class).where(Class.id == student.class_id))
 
     return {
         "id": student.id,
@@ -489,36 +524,36 @@ async def get_student_profile(
 @router.get("/messages/teachers")
 async def get_teachers_for_messaging(
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get list of teachers the student can message (teachers of their class)"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
     # Get teachers who teach this student's class
     from app.models.academic import teacher_classes
-    teacher_ids = db.query(teacher_classes.c.teacher_id).filter(
+    teacher_ids = (await db.execute(select(teacher_classes.c.teacher_id).where(
         teacher_classes.c.class_id == student.class_id
-    ).all()
+    ))).all()
 
-    teachers = db.query(Teacher).filter(
+    teachers = (await db.scalars(select(Teacher).options(selectinload(Teacher.user)).where(
         Teacher.id.in_([t[0] for t in teacher_ids])
-    ).all()
+    ))).all()
 
     result = []
     for teacher in teachers:
         # Get unread message count
-        unread_count = db.query(Message).filter(
+        unread_count = await db.scalar(select(func.count()).select_from(Message).where(
             Message.sender_id == teacher.id,
             Message.sender_type == MessageParticipantType.TEACHER,
             Message.receiver_id == student.id,
             Message.receiver_type == MessageParticipantType.STUDENT,
             Message.is_read == False
-        ).count()
+        ))
 
         # Get last message
-        last_message = db.query(Message).filter(
+        last_message = await db.scalar(select(Message).where(
             or_(
                 and_(
                     Message.sender_id == teacher.id,
@@ -533,7 +568,7 @@ async def get_teachers_for_messaging(
                     Message.receiver_type == MessageParticipantType.TEACHER
                 )
             )
-        ).order_by(Message.created_at.desc()).first()
+        ).order_by(Message.created_at.desc()).limit(1))
 
         result.append({
             "id": teacher.id,
@@ -554,19 +589,19 @@ async def get_teachers_for_messaging(
 async def get_conversation_with_teacher(
     teacher_id: int,
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get conversation with a specific teacher"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    teacher = db.query(Teacher).filter(Teacher.id == teacher_id).first()
+    teacher = await db.get(Teacher, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
     # Get all messages between student and teacher
-    messages = db.query(Message).filter(
+    messages = (await db.scalars(select(Message).where(
         or_(
             and_(
                 Message.sender_id == teacher.id,
@@ -581,14 +616,14 @@ async def get_conversation_with_teacher(
                 Message.receiver_type == MessageParticipantType.TEACHER
             )
         )
-    ).order_by(Message.created_at.asc()).all()
+    ).order_by(Message.created_at.asc()))).all()
 
     # Mark received messages as read
     for msg in messages:
         if msg.receiver_type == MessageParticipantType.STUDENT and msg.receiver_id == student.id and not msg.is_read:
             msg.is_read = True
             msg.read_at = datetime.now()
-    db.commit()
+    await db.commit()
 
     return {
         "teacher": {
@@ -612,14 +647,14 @@ async def get_conversation_with_teacher(
 async def send_message_to_teacher(
     request: SendMessageRequest,
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message to a teacher"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    teacher = db.query(Teacher).filter(Teacher.id == request.teacher_id).first()
+    teacher = await db.get(Teacher, request.teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
 
@@ -634,8 +669,8 @@ async def send_message_to_teacher(
         created_at=datetime.now()
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
 
     return {
         "message": "Message sent successfully",
@@ -647,24 +682,24 @@ async def send_message_to_teacher(
 async def mark_message_as_read(
     message_id: int,
     current_user: User = Depends(require_role([UserRole.STUDENT])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a message as read"""
-    student = db.query(Student).filter(Student.user_id == current_user.id).first()
+    student = await db.scalar(select(Student).where(Student.user_id == current_user.id))
     if not student:
         raise HTTPException(status_code=404, detail="Student profile not found")
 
-    message = db.query(Message).filter(
+    message = await db.scalar(select(Message).where(
         Message.id == message_id,
         Message.receiver_id == student.id,
         Message.receiver_type == MessageParticipantType.STUDENT
-    ).first()
+    ).limit(1))
 
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
     message.is_read = True
     message.read_at = datetime.now()
-    db.commit()
+    await db.commit()
 
     return {"message": "Message marked as read"}
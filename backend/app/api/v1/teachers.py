@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 from datetime import date, datetime
-from app.core.database import get_db
+from app.core.database import get_async_db, get_read_db
 from app.core.security import get_current_user, require_role
+from app.services.absence_flags import list_flags
+from app.services.attendance_marking import upsert_attendance
+from app.services.attendance_sync import sync_attendance
+from app.services.attendance_sheet import class_attendance_for_date, class_attendance_register
+from app.services.marks_entry import MarksEntryError, upsert_marks
 from app.models import (
     User, UserRole, Teacher, Class, Student, Subject, Timetable, DayOfWeek,
     Assignment, AssignmentSubmission, Attendance, AttendanceStatus, Notice,
@@ -13,8 +20,9 @@ from app.models import (
 from app.schemas import (
     TeacherResponse, TeacherDashboard, ClassInfo,
     AssignmentCreate, AssignmentResponse, AssignmentUpdate,
-    AttendanceBulkCreate, ClassAttendanceResponse, StudentAttendanceRecord,
-    TeacherMarksEntry, ConversationParent, MessageResponse
+    AttendanceBulkCreate, AttendanceBulkResult, ClassAttendanceResponse, ClassAttendanceRegister, StudentAttendanceRecord,
+    AttendanceFlagResponse, AttendanceSyncRequest, AttendanceSyncResponse,
+    TeacherMarksEntry, MarksEntryResult, ConversationParent, MessageResponse
 )
 
 router = APIRouter(prefix="/teachers", tags=["Teachers"])
@@ -23,9 +31,11 @@ router = APIRouter(prefix="/teachers", tags=["Teachers"])
 @router.get("/dashboard")
 async def get_teacher_dashboard(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(
+        select(Teacher).options(selectinload(Teacher.classes), selectinload(Teacher.subjects)).where(Teacher.user_id == current_user.id)
+    )
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
@@ -34,7 +44,7 @@ async def get_teacher_dashboard(
     total_students = 0
 
     for c in classes:
-        students_count = db.query(Student).filter(Student.class_id == c.id).count()
+        students_count = await db.scalar(select(func.count()).select_from(Student).where(Student.class_id == c.id))
         total_students += students_count
         class_info_list.append(ClassInfo(
             id=c.id,
@@ -44,10 +54,10 @@ async def get_teacher_dashboard(
         ))
 
     # Pending assignments to grade
-    pending_submissions = db.query(AssignmentSubmission).join(Assignment).filter(
+    pending_submissions = await db.scalar(select(func.count()).select_from(AssignmentSubmission).join(Assignment).where(
         Assignment.teacher_id == teacher.id,
         AssignmentSubmission.marks_obtained == None
-    ).count()
+    ))
 
     # Today's schedule
     day_map = {
@@ -57,13 +67,13 @@ async def get_teacher_dashboard(
     today_day = day_map.get(date.today().weekday())
     today_schedule = []
     if today_day:
-        schedule = db.query(Timetable).filter(
+        schedule = (await db.scalars(select(Timetable).where(
             Timetable.teacher_id == teacher.id,
             Timetable.day == today_day
-        ).order_by(Timetable.period).all()
+        ).order_by(Timetable.period))).all()
         for s in schedule:
-            class_info = db.query(Class).filter(Class.id == s.class_id).first()
-            subject = db.query(Subject).filter(Subject.id == s.subject_id).first()
+            class_info = await db.get(Class, s.class_id)
+            subject = await db.get(Subject, s.subject_id)
             today_schedule.append({
                 "period": s.period,
                 "class": f"{class_info.name} - {class_info.section}" if class_info else None,
@@ -72,10 +82,10 @@ async def get_teacher_dashboard(
             })
 
     # Notices
-    notices = db.query(Notice).filter(
+    notices = (await db.scalars(select(Notice).where(
         Notice.is_active == True,
         (Notice.target_role == None) | (Notice.target_role == UserRole.TEACHER)
-    ).order_by(Notice.created_at.desc()).limit(5).all()
+    ).order_by(Notice.created_at.desc()).limit(5))).all()
 
     return {
         "teacher": TeacherResponse.model_validate(teacher),
@@ -90,16 +100,18 @@ async def get_teacher_dashboard(
 @router.get("/classes")
 async def get_teacher_classes(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all classes assigned to the teacher with subjects they teach"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(
+        select(Teacher).options(selectinload(Teacher.classes), selectinload(Teacher.subjects)).where(Teacher.user_id == current_user.id)
+    )
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
     result = []
     for c in teacher.classes:
-        students_count = db.query(Student).filter(Student.class_id == c.id).count()
+        students_count = await db.scalar(select(func.count()).select_from(Student).where(Student.class_id == c.id))
 
         # Get subjects the teacher teaches in this class
         subject_names = []
@@ -128,29 +140,29 @@ async def get_teacher_classes(
 @router.get("/assignments")
 async def get_teacher_assignments(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all assignments created by the teacher"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    assignments = db.query(Assignment).filter(
+    assignments = (await db.scalars(select(Assignment).where(
         Assignment.teacher_id == teacher.id
-    ).order_by(Assignment.created_at.desc()).all()
+    ).order_by(Assignment.created_at.desc()))).all()
 
     result = []
     for a in assignments:
-        class_info = db.query(Class).filter(Class.id == a.class_id).first()
-        subject = db.query(Subject).filter(Subject.id == a.subject_id).first()
+        class_info = await db.get(Class, a.class_id)
+        subject = await db.get(Subject, a.subject_id)
 
         # Count submissions
-        submission_count = db.query(AssignmentSubmission).filter(
+        submission_count = await db.scalar(select(func.count()).select_from(AssignmentSubmission).where(
             AssignmentSubmission.assignment_id == a.id
-        ).count()
+        ))
 
         # Total students in class
-        total_students = db.query(Student).filter(Student.class_id == a.class_id).count()
+        total_students = await db.scalar(select(func.count()).select_from(Student).where(Student.class_id == a.class_id))
 
         result.append({
             "id": a.id,
@@ -172,23 +184,23 @@ async def get_teacher_assignments(
 async def delete_assignment(
     assignment_id: int,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an assignment"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    assignment = db.query(Assignment).filter(
+    assignment = await db.scalar(select(Assignment).where(
         Assignment.id == assignment_id,
         Assignment.teacher_id == teacher.id
-    ).first()
+    ).limit(1))
 
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
-    db.delete(assignment)
-    db.commit()
+    await db.delete(assignment)
+    await db.commit()
     return {"message": "Assignment deleted successfully"}
 
 
@@ -196,9 +208,9 @@ async def delete_assignment(
 async def create_assignment(
     assignment_data: AssignmentCreate,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
@@ -213,11 +225,11 @@ async def create_assignment(
         max_marks=assignment_data.max_marks
     )
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
 
-    class_info = db.query(Class).filter(Class.id == assignment.class_id).first()
-    subject = db.query(Subject).filter(Subject.id == assignment.subject_id).first()
+    class_info = await db.get(Class, assignment.class_id)
+    subject = await db.get(Subject, assignment.subject_id)
 
     return AssignmentResponse(
         id=assignment.id,
@@ -236,98 +248,115 @@ async def create_assignment(
     )
 
 
-@router.post("/attendance")
+@router.post("/attendance", response_model=AttendanceBulkResult)
 async def mark_attendance(
     attendance_data: AttendanceBulkCreate,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    for record in attendance_data.records:
-        existing = db.query(Attendance).filter(
-            Attendance.student_id == record["student_id"],
-            Attendance.date == attendance_data.date
-        ).first()
-
-        if existing:
-            existing.status = AttendanceStatus(record["status"])
-            existing.remarks = record.get("remarks")
-        else:
-            attendance = Attendance(
-                student_id=record["student_id"],
-                date=attendance_data.date,
-                status=AttendanceStatus(record["status"]),
-                marked_by=teacher.id,
-                remarks=record.get("remarks")
-            )
-            db.add(attendance)
+    try:
+        inserted, updated = await upsert_attendance(
+            db, attendance_data.date, attendance_data.records, marked_by=teacher.id
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Attendance records reference an unknown student")
 
-    db.commit()
-    return {"message": "Attendance marked successfully"}
+    return AttendanceBulkResult(message="Attendance marked successfully", inserted=inserted, updated=updated)
 
 
-@router.get("/attendance/{class_id}/{date}", response_model=ClassAttendanceResponse)
-async def get_class_attendance(
+@router.post("/attendance/sync", response_model=AttendanceSyncResponse)
+async def sync_offline_attendance(
+    data: AttendanceSyncRequest,
+    current_user: User = Depends(require_role([UserRole.TEACHER])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply attendance changes queued offline and return what changed on the server since the last sync"""
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
+    if not teacher:
+        raise HTTPException(status_code=404, detail="Teacher profile not found")
+
+    try:
+        result = await sync_attendance(
+            db, teacher.id, data.changes, sync_token=data.sync_token, policy=data.conflict_policy
+        )
+        await db.commit()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Attendance changed concurrently, retry the sync")
+    return result
+
+
+@router.get("/attendance/flags", response_model=List[AttendanceFlagResponse])
+async def get_attendance_flags(
+    as_of: Optional[date] = None,
+    current_user: User = Depends(require_role([UserRole.TEACHER])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Students of the teacher's own classes flagged for absence streaks or low attendance (default: latest run)"""
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
+    if not teacher:
+        raise HTTPException(status_code=404, detail="Teacher profile not found")
+
+    class_ids = (await db.scalars(select(Class.id).where(Class.class_teacher_id == teacher.id))).all()
+    return await list_flags(db, as_of, list(class_ids))
+
+
+@router.get("/attendance/{class_id}/register", response_model=ClassAttendanceRegister)
+async def get_class_attendance_register(
     class_id: int,
-    date: date,
+    start_date: date,
+    end_date: date,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    class_info = db.query(Class).filter(Class.id == class_id).first()
+    """Get a class's attendance for every day in a date range, e.g. the weekly register"""
+    class_info = await db.get(Class, class_id)
     if not class_info:
         raise HTTPException(status_code=404, detail="Class not found")
 
-    students = db.query(Student).filter(Student.class_id == class_id).all()
-
-    records = []
-    present = absent = late = 0
-
-    for student in students:
-        attendance = db.query(Attendance).filter(
-            Attendance.student_id == student.id,
-            Attendance.date == date
-        ).first()
+    try:
+        return await class_attendance_register(
+            db, class_id, f"{class_info.name} - {class_info.section}", start_date, end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        status = attendance.status if attendance else AttendanceStatus.ABSENT
-        if status == AttendanceStatus.PRESENT:
-            present += 1
-        elif status == AttendanceStatus.ABSENT:
-            absent += 1
-        elif status == AttendanceStatus.LATE:
-            late += 1
 
-        records.append(StudentAttendanceRecord(
-            student_id=student.id,
-            student_name=student.name,
-            roll_no=student.roll_no,
-            status=status,
-            remarks=attendance.remarks if attendance else None
-        ))
+@router.get("/attendance/{class_id}/{date}", response_model=ClassAttendanceResponse)
+async def get_class_attendance(
+    class_id: int,
+    date: date,
+    current_user: User = Depends(require_role([UserRole.TEACHER])),
+    db: AsyncSession = Depends(get_read_db)
+):
+    class_info = await db.get(Class, class_id)
+    if not class_info:
+        raise HTTPException(status_code=404, detail="Class not found")
 
-    return ClassAttendanceResponse(
-        date=date,
-        class_id=class_id,
-        class_name=f"{class_info.name} - {class_info.section}",
-        total_students=len(students),
-        present=present,
-        absent=absent,
-        late=late,
-        records=records
+    return await class_attendance_for_date(
+        db, class_id, f"{class_info.name} - {class_info.section}", date, count_unmarked_as_absent=True
     )
 
 
 @router.get("/exams")
 async def get_teacher_exams(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all exams for classes that the teacher teaches"""
     from app.models import Exam, ExamSchedule
 
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(
+        select(Teacher).options(selectinload(Teacher.classes), selectinload(Teacher.subjects)).where(Teacher.user_id == current_user.id)
+    )
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
@@ -339,16 +368,16 @@ async def get_teacher_exams(
         return []
 
     # Get exam schedules for teacher's classes and subjects
-    schedules = db.query(ExamSchedule).filter(
+    schedules = (await db.scalars(select(ExamSchedule).where(
         ExamSchedule.class_id.in_(class_ids),
         ExamSchedule.subject_id.in_(subject_ids)
-    ).all()
+    ))).all()
 
     result = []
     for schedule in schedules:
-        exam = db.query(Exam).filter(Exam.id == schedule.exam_id).first()
-        class_info = db.query(Class).filter(Class.id == schedule.class_id).first()
-        subject = db.query(Subject).filter(Subject.id == schedule.subject_id).first()
+        exam = await db.get(Exam, schedule.exam_id)
+        class_info = await db.get(Class, schedule.class_id)
+        subject = await db.get(Subject, schedule.subject_id)
 
         result.append({
             "id": schedule.exam_id,
@@ -369,22 +398,22 @@ async def get_exam_students(
     exam_id: int,
     class_id: int = None,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get students and existing marks for an exam"""
     from app.models import Exam, ExamResult, ExamSchedule
 
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
+    exam = await db.get(Exam, exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
     # Get class_id from ExamSchedule if not provided
     if not class_id:
-        schedule = db.query(ExamSchedule).filter(ExamSchedule.exam_id == exam_id).first()
+        schedule = await db.scalar(select(ExamSchedule).where(ExamSchedule.exam_id == exam_id).limit(1))
         if schedule:
             class_id = schedule.class_id
 
@@ -392,10 +421,10 @@ async def get_exam_students(
         return {"students": [], "marks": []}
 
     # Get students in the class
-    students = db.query(Student).filter(Student.class_id == class_id).order_by(Student.roll_no).all()
+    students = (await db.scalars(select(Student).where(Student.class_id == class_id).order_by(Student.roll_no))).all()
 
     # Get existing marks
-    marks = db.query(ExamResult).filter(ExamResult.exam_id == exam_id).all()
+    marks = (await db.scalars(select(ExamResult).where(ExamResult.exam_id == exam_id))).all()
 
     return {
         "students": [
@@ -418,80 +447,50 @@ async def get_exam_students(
     }
 
 
-@router.post("/marks")
+@router.post("/marks", response_model=MarksEntryResult)
 async def enter_marks(
     data: TeacherMarksEntry,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enter marks for students with proper validation"""
-    from app.models import ExamResult, Exam, ExamSchedule
+    from app.models import Exam
 
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
     # Verify exam exists
-    exam = db.query(Exam).filter(Exam.id == data.exam_id).first()
+    exam = await db.get(Exam, data.exam_id)
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
 
-    # Get max marks from schedule for validation
-    schedule = db.query(ExamSchedule).filter(
-        ExamSchedule.exam_id == data.exam_id,
-        ExamSchedule.subject_id == data.subject_id
-    ).first()
-
-    max_marks = schedule.max_marks if schedule else None
-
-    for result in data.results:
-        # Validate marks against max_marks if available
-        if max_marks and result.marks_obtained > max_marks:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Marks ({result.marks_obtained}) cannot exceed max marks ({max_marks}) for student {result.student_id}"
-            )
-
-        if result.marks_obtained < 0:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Marks cannot be negative for student {result.student_id}"
-            )
-
-        existing = db.query(ExamResult).filter(
-            ExamResult.exam_id == data.exam_id,
-            ExamResult.student_id == result.student_id,
-            ExamResult.subject_id == data.subject_id
-        ).first()
-
-        if existing:
-            existing.marks_obtained = result.marks_obtained
-            existing.grade = result.grade
-            existing.remarks = result.remarks
-        else:
-            exam_result = ExamResult(
-                exam_id=data.exam_id,
-                student_id=result.student_id,
-                subject_id=data.subject_id,
-                marks_obtained=result.marks_obtained,
-                grade=result.grade,
-                remarks=result.remarks,
-                entered_by=teacher.id
-            )
-            db.add(exam_result)
-
-    db.commit()
-    return {"message": f"Marks entered successfully for {len(data.results)} students"}
+    try:
+        inserted, updated = await upsert_marks(db, data.exam_id, data.subject_id, data.results, entered_by=teacher.id)
+        await db.commit()
+    except MarksEntryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Marks reference an unknown subject")
+
+    return MarksEntryResult(
+        message=f"Marks entered successfully for {inserted + updated} students",
+        inserted=inserted,
+        updated=updated
+    )
 
 
 # Teacher Profile
 @router.get("/profile")
 async def get_teacher_profile(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get current teacher's profile"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(
+        select(Teacher).options(selectinload(Teacher.classes), selectinload(Teacher.subjects)).where(Teacher.user_id == current_user.id)
+    )
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
@@ -517,10 +516,10 @@ async def update_teacher_profile(
     phone: str = None,
     address: str = None,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update teacher's own profile (limited fields)"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
@@ -529,8 +528,8 @@ async def update_teacher_profile(
     if address is not None:
         teacher.address = address
 
-    db.commit()
-    db.refresh(teacher)
+    await db.commit()
+    await db.refresh(teacher)
     return {"message": "Profile updated successfully"}
 
 
@@ -538,19 +537,19 @@ async def update_teacher_profile(
 @router.get("/timetable")
 async def get_teacher_timetable(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get teacher's complete weekly timetable"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    entries = db.query(Timetable).filter(Timetable.teacher_id == teacher.id).all()
+    entries = (await db.scalars(select(Timetable).where(Timetable.teacher_id == teacher.id))).all()
 
     result = []
     for entry in entries:
-        class_info = db.query(Class).filter(Class.id == entry.class_id).first()
-        subject = db.query(Subject).filter(Subject.id == entry.subject_id).first()
+        class_info = await db.get(Class, entry.class_id)
+        subject = await db.scalar(select(Subject).where(Subject.id == entry.subject_id))
 
         result.append({
             "id": entry.id,
@@ -572,28 +571,28 @@ async def get_teacher_timetable(
 async def get_assignment_submissions(
     assignment_id: int,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all submissions for an assignment"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    assignment = db.query(Assignment).filter(
+    assignment = await db.scalar(select(Assignment).where(
         Assignment.id == assignment_id,
         Assignment.teacher_id == teacher.id
-    ).first()
+    ).limit(1))
 
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
-    submissions = db.query(AssignmentSubmission).filter(
+    submissions = (await db.scalars(select(AssignmentSubmission).where(
         AssignmentSubmission.assignment_id == assignment_id
-    ).all()
+    ))).all()
 
     result = []
     for sub in submissions:
-        student = db.query(Student).filter(Student.id == sub.student_id).first()
+        student = await db.get(Student, sub.student_id)
         result.append({
             "id": sub.id,
             "student_id": sub.student_id,
@@ -623,27 +622,27 @@ async def grade_submission(
     marks_obtained: float,
     feedback: str = None,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Grade a student submission"""
     from datetime import datetime
 
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    submission = db.query(AssignmentSubmission).filter(
+    submission = await db.scalar(select(AssignmentSubmission).where(
         AssignmentSubmission.id == submission_id
-    ).first()
+    ).limit(1))
 
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
 
     # Verify teacher owns this assignment
-    assignment = db.query(Assignment).filter(
+    assignment = await db.scalar(select(Assignment).where(
         Assignment.id == submission.assignment_id,
         Assignment.teacher_id == teacher.id
-    ).first()
+    ).limit(1))
 
     if not assignment:
         raise HTTPException(status_code=403, detail="Not authorized to grade this submission")
@@ -652,7 +651,7 @@ async def grade_submission(
     submission.feedback = feedback
     submission.graded_at = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
     return {"message": "Submission graded successfully"}
 
 
@@ -660,13 +659,13 @@ async def grade_submission(
 @router.get("/notices")
 async def get_teacher_notices(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get notices for teachers"""
-    notices = db.query(Notice).filter(
+    notices = (await db.scalars(select(Notice).where(
         Notice.is_active == True,
         (Notice.target_role == None) | (Notice.target_role == UserRole.TEACHER)
-    ).order_by(Notice.created_at.desc()).all()
+    ).order_by(Notice.created_at.desc()))).all()
 
     return [
         {
@@ -686,10 +685,12 @@ async def get_teacher_notices(
 @router.get("/my-subjects")
 async def get_teacher_subjects(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all subjects assigned to the teacher"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(
+        select(Teacher).options(selectinload(Teacher.subjects)).where(Teacher.user_id == current_user.id)
+    )
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
@@ -708,10 +709,12 @@ async def get_teacher_subjects(
 @router.get("/my-classes")
 async def get_teacher_classes_simple(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all classes assigned to the teacher (simplified)"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(
+        select(Teacher).options(selectinload(Teacher.classes)).where(Teacher.user_id == current_user.id)
+    )
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
@@ -731,20 +734,22 @@ async def get_teacher_classes_simple(
 @router.get("/messages/parents", response_model=List[ConversationParent])
 async def get_parents_for_messaging(
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get list of parents the teacher can message (parents of students in teacher's classes)"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(
+        select(Teacher).options(selectinload(Teacher.classes)).where(Teacher.user_id == current_user.id)
+    )
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
     # Get all students in teacher's classes
     class_ids = [c.id for c in teacher.classes]
-    students = db.query(Student).filter(Student.class_id.in_(class_ids)).all()
+    students = (await db.scalars(select(Student).where(Student.class_id.in_(class_ids)))).all()
 
     # Get unique parents
     parent_ids = set(s.parent_id for s in students if s.parent_id)
-    parents = db.query(Parent).filter(Parent.id.in_(parent_ids)).all()
+    parents = (await db.scalars(select(Parent).where(Parent.id.in_(parent_ids)))).all()
 
     result = []
     for parent in parents:
@@ -754,10 +759,10 @@ async def get_parents_for_messaging(
             continue
 
         student = parent_students[0]  # Primary student for display
-        class_info = db.query(Class).filter(Class.id == student.class_id).first()
+        class_info = await db.scalar(select(Class).where(Class.id == student.class_id))
 
         # Get last message and unread count
-        last_msg = db.query(Message).filter(
+        last_msg = await db.scalar(select(Message).where(
             or_(
                 and_(
                     Message.sender_id == teacher.id,
@@ -772,15 +777,15 @@ async def get_parents_for_messaging(
                     Message.receiver_type == MessageParticipantType.TEACHER
                 )
             )
-        ).order_by(Message.created_at.desc()).first()
+        ).order_by(Message.created_at.desc()).limit(1))
 
-        unread_count = db.query(Message).filter(
+        unread_count = await db.scalar(select(func.count()).select_from(Message).where(
             Message.sender_id == parent.id,
             Message.sender_type == MessageParticipantType.PARENT,
             Message.receiver_id == teacher.id,
             Message.receiver_type == MessageParticipantType.TEACHER,
             Message.is_read == False
-        ).count()
+        ))
 
         result.append(ConversationParent(
             id=parent.id,
@@ -802,18 +807,18 @@ async def get_parents_for_messaging(
 async def get_conversation_with_parent(
     parent_id: int,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all messages between the teacher and a specific parent"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    parent = db.query(Parent).filter(Parent.id == parent_id).first()
+    parent = await db.get(Parent, parent_id)
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
 
-    messages = db.query(Message).filter(
+    messages = (await db.scalars(select(Message).where(
         or_(
             and_(
                 Message.sender_id == teacher.id,
@@ -828,17 +833,17 @@ async def get_conversation_with_parent(
                 Message.receiver_type == MessageParticipantType.TEACHER
             )
         )
-    ).order_by(Message.created_at.asc()).all()
+    ).order_by(Message.created_at.asc()))).all()
 
     # Mark unread messages from parent as read
-    db.query(Message).filter(
+    await db.execute(update(Message).where(
         Message.sender_id == parent.id,
         Message.sender_type == MessageParticipantType.PARENT,
         Message.receiver_id == teacher.id,
         Message.receiver_type == MessageParticipantType.TEACHER,
         Message.is_read == False
-    ).update({"is_read": True, "read_at": datetime.now()})
-    db.commit()
+    ).values({"is_read": True, "read_at": datetime.now()}))
+    await db.commit()
 
     return messages
 
@@ -849,14 +854,14 @@ async def send_message_to_parent(
     content: str,
     student_id: int = None,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Send a message to a parent"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    parent = db.query(Parent).filter(Parent.id == parent_id).first()
+    parent = await db.get(Parent, parent_id)
     if not parent:
         raise HTTPException(status_code=404, detail="Parent not found")
 
@@ -872,8 +877,8 @@ async def send_message_to_parent(
     )
 
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
 
     return message
 
@@ -882,24 +887,24 @@ async def send_message_to_parent(
 async def mark_message_as_read(
     message_id: int,
     current_user: User = Depends(require_role([UserRole.TEACHER])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a message as read"""
-    teacher = db.query(Teacher).filter(Teacher.user_id == current_user.id).first()
+    teacher = await db.scalar(select(Teacher).where(Teacher.user_id == current_user.id))
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher profile not found")
 
-    message = db.query(Message).filter(
+    message = await db.scalar(select(Message).where(
         Message.id == message_id,
         Message.receiver_id == teacher.id,
         Message.receiver_type == MessageParticipantType.TEACHER
-    ).first()
+    ).limit(1))
 
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
 
     message.is_read = True
     message.read_at = datetime.now()
-    db.commit()
+    await db.commit()
 
     return {"message": "Message marked as read"}
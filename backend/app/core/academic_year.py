@@ -0,0 +1,58 @@
+"""
+Academic year helpers.
+
+Academic years are labelled like "2024-25" and start on the first day of
+ACADEMIC_YEAR_START_MONTH. Date ranges are half-open: [start, end).
+"""
+from datetime import date
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+from app.core.config import settings
+
+
+def academic_year_of(day: date) -> int:
+    """Calendar year in which the academic year containing `day` starts."""
+    return day.year if day.month >= settings.ACADEMIC_YEAR_START_MONTH else day.year - 1
+
+
+def current_academic_year() -> int:
+    return academic_year_of(date.today())
+
+
+def academic_year_label(start_year: int) -> str:
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
+
+def parse_academic_year(label: str) -> int:
+    """Start year of a label such as "2024-25" (a bare "2024" is accepted too)."""
+    try:
+        start = int(label.split("-")[0])
+    except ValueError:
+        raise ValueError(f"Invalid academic year '{label}', expected e.g. '2024-25'")
+    if not 1900 < start < 3000:
+        raise ValueError(f"Invalid academic year '{label}', expected e.g. '2024-25'")
+    return start
+
+
+def academic_year_bounds(start_year: int) -> Tuple[date, date]:
+    """First day of the academic year and first day of the next one."""
+    month = settings.ACADEMIC_YEAR_START_MONTH
+    return date(start_year, month, 1), date(start_year + 1, month, 1)
+
+
+def resolve_academic_year(label: Optional[str]) -> Tuple[date, date]:
+    """Bounds for an optional academic year label, defaulting to the current year."""
+    start_year = parse_academic_year(label) if label else current_academic_year()
+    return academic_year_bounds(start_year)
+
+
+def academic_year_range(
+    academic_year: Optional[str] = Query(None, description="Academic year such as 2024-25; defaults to the current one")
+) -> Tuple[date, date]:
+    """Query-parameter dependency resolving to the academic year's date bounds."""
+    try:
+        return resolve_academic_year(academic_year)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,17 +1,165 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core.pool import PoolMetrics, timed_pool_class
+from app.core.replica import replica_router, request_user_key, write_marker
+from app.core.slow_query import slow_query_log
 
-engine = create_engine(settings.DATABASE_URL)
+# Async driver to use for each sync backend found in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+# INSERT constructs supporting ON CONFLICT, per dialect
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_insert(dialect_name: str, table):
+    """INSERT for `table` with on_conflict_do_update / on_conflict_do_nothing."""
+    if dialect_name not in UPSERT_INSERTS:
+        raise RuntimeError(f"No ON CONFLICT insert available for database backend '{dialect_name}'")
+    return UPSERT_INSERTS[dialect_name](table)
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver in a database URL for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def pool_options(url: str, metrics: Optional[PoolMetrics] = None) -> dict:
+    """Pool keyword arguments for create_engine, taken from settings.
+
+    Passing `metrics` makes an async engine time its checkouts.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        # SQLite is only used for local runs and picks its own pool class
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if metrics is not None:
+        options["poolclass"] = timed_pool_class(metrics)
+    return options
+
+
+class PrimarySession(Session):
+    """Session class for the primary engine; commits with writes pin the user to it."""
+
+
+# Checkout wait statistics for the request pools (see app.core.pool)
+pool_metrics = PoolMetrics("primary")
+read_pool_metrics = PoolMetrics("replica")
+
+# Sync engine: migrations, seed script and maintenance commands
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: used by the API request handlers
+async_engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL), **pool_options(settings.DATABASE_URL, pool_metrics)
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False,
+    class_=AsyncSession, sync_session_class=PrimarySession
+)
+
+# Read-only engine: replica when DATABASE_READ_URL is set, otherwise the primary
+if settings.DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        to_async_url(settings.DATABASE_READ_URL),
+        **pool_options(settings.DATABASE_READ_URL, read_pool_metrics)
+    )
+else:
+    read_engine = async_engine
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+
+# Statements slower than SLOW_QUERY_MS go to the slow-query log; plans are
+# captured on the sync engine so the request's connection is never reused
+for _engine in {engine, async_engine.sync_engine, read_engine.sync_engine}:
+    slow_query_log.install(_engine, explain_engine=engine)
+
 Base = declarative_base()
 
 
+@event.listens_for(PrimarySession, "after_flush")
+def _flag_flush_write(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _flag_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _pin_writer_to_primary(session):
+    if session.info.pop("has_writes", False) and session.info.get("user_key"):
+        session.info["request_state"].db_write_marker = write_marker(session.info["user_key"])
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _clear_write_flag(session):
+    session.info.pop("has_writes", None)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        db.info["user_key"] = request_user_key(request)
+        db.info["request_state"] = request.state
+        yield db
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Session for read-only endpoints.
+
+    Uses the replica unless none is configured, the user wrote recently or the
+    replica lags too far behind; then it reuses the request's primary session.
+    The primary session connects lazily, so it costs nothing when unused.
+    """
+    if read_engine is async_engine or not await replica_router.use_replica(request, read_engine):
+        yield db
+        return
+
+    async with ReadSessionLocal() as read_db:
+        yield read_db
+
+
+def get_pool_stats() -> dict:
+    """Pool occupancy and checkout wait statistics for this worker process."""
+    stats = {
+        "async": pool_metrics.snapshot(async_engine.pool),
+        "sync": {"pool_class": type(engine.pool).__name__, "status": engine.pool.status()},
+    }
+    if read_engine is not async_engine:
+        stats["replica"] = read_pool_metrics.snapshot(read_engine.pool)
+    return stats
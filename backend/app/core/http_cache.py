@@ -0,0 +1,28 @@
+"""
+Conditional GET for read-mostly endpoints.
+
+An endpoint derives an ETag from whatever versions its response (e.g. a
+publication version per exam), sends it with a private Cache-Control
+max-age, and answers 304 Not Modified when the client's If-None-Match
+still matches - without building the response body.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def etag_of(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request: Request, response: Response, etag: str, max_age: int) -> Optional[Response]:
+    """Set caching headers on `response`; returns a 304 response to send instead
+    when the client already holds this version."""
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    response.headers.update(headers)
+    candidates = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    return None
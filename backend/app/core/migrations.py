@@ -0,0 +1,53 @@
+"""
+Schema revision check run at startup.
+
+The schema is owned by the Alembic migrations in backend/alembic. Startup
+refuses to serve against a database that is not at the latest revision,
+unless DB_AUTO_MIGRATE is set (single-process local runs), in which case
+it upgrades the database first.
+"""
+import logging
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+def alembic_config() -> Config:
+    # No ini file, so env.py leaves the application's logging setup alone
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    # ConfigParser treats % as interpolation, e.g. in URL-encoded passwords
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+    return config
+
+
+def ensure_schema_revision() -> None:
+    config = alembic_config()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    with engine.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+
+    if current == heads:
+        logger.info(f"Database schema at revision {', '.join(sorted(current))}")
+        return
+
+    if settings.DB_AUTO_MIGRATE:
+        logger.info(f"Upgrading database schema from {sorted(current) or 'empty'} to {sorted(heads)}")
+        command.upgrade(config, "head")
+        return
+
+    raise RuntimeError(
+        f"Database schema is at revision {sorted(current) or 'none'}, expected {sorted(heads)}. "
+        "Run `alembic upgrade head` from backend/ (databases created before migrations "
+        "existed need `alembic stamp 0001` first), or set DB_AUTO_MIGRATE=true."
+    )
@@ -0,0 +1,123 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is ordered on a fixed set of indexed sort keys ending with a unique
+column. The sort-key values of the last row are packed into an opaque
+`next_cursor` token, and the next page continues strictly after them. Pages
+cost the same however deep the client goes, and rows inserted or deleted
+meanwhile never make a page skip or repeat a row.
+
+List endpoints keep returning a plain JSON array; the cursor for the next
+page is sent in the X-Next-Cursor header, which is absent on the last page.
+`skip` is still accepted for legacy offset pagination.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# (sort expression, descending); the last key must be unique, e.g. the primary key
+SortKey = Tuple[ColumnElement, bool]
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str]
+    limit: int
+    skip: Optional[int]
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Token from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    skip: Optional[int] = Query(None, ge=0, description="Legacy offset pagination; ignored when cursor is given"),
+) -> PageParams:
+    return PageParams(cursor=cursor, limit=limit, skip=skip)
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(value: Any, expression: ColumnElement) -> Any:
+    if value is None:
+        return None
+    python_type = expression.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, keys: Sequence[SortKey]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong number of sort keys")
+        return [_from_json(value, expression) for value, (expression, _) in zip(values, keys)]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_filter(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """Rows strictly after `values` in the order given by `keys`.
+
+    Expanded as (a > x) OR (a = x AND b > y) ... rather than a row-value
+    comparison, so keys may mix ascending and descending directions.
+    """
+    clauses = []
+    for i, (expression, descending) in enumerate(keys):
+        ties = [keys[j][0] == values[j] for j in range(i)]
+        after = expression < values[i] if descending else expression > values[i]
+        clauses.append(and_(*ties, after))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[SortKey],
+    params: PageParams,
+    response: Response,
+) -> list:
+    """Run `query` for one page and set the X-Next-Cursor header when more rows follow.
+
+    The sort expressions are added to the SELECT so the cursor can be built
+    from the last row without the caller mapping entities back to keys.
+    Single-entity queries return entities; wider ones return row tuples.
+    """
+    width = len(query.column_descriptions)
+    query = query.order_by(*(expression.desc() if descending else expression.asc() for expression, descending in keys))
+    if params.cursor:
+        query = query.where(keyset_filter(keys, decode_cursor(params.cursor, keys)))
+    elif params.skip:
+        query = query.offset(params.skip)
+
+    query = query.add_columns(*(expression for expression, _ in keys)).limit(params.limit + 1)
+    rows = (await db.execute(query)).all()
+
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][width:])
+    if width == 1:
+        return [row[0] for row in rows]
+    return [tuple(row[:width]) for row in rows]
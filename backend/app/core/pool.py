@@ -0,0 +1,120 @@
+"""
+Connection pool statistics.
+
+Tracks how long request handlers wait to check a connection out of the pool
+and exposes a snapshot of pool occupancy, so the pool can be sized against
+the database's max_connections across all worker processes.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Type
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PoolMetricsHook = Callable[[Dict], None]
+
+
+class PoolMetrics:
+    """Checkout wait-time counters for one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._hooks: List[PoolMetricsHook] = []
+        self.checkouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+
+    def add_hook(self, hook: PoolMetricsHook) -> None:
+        """Register a callback that receives a stats snapshot after every checkout."""
+        self._hooks.append(hook)
+
+    def record_checkout(self, pool: Pool, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            if wait_ms >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+                self.slow_checkouts += 1
+
+        if wait_ms >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+            logger.warning(
+                f"Slow connection checkout on '{self.name}' pool: waited {wait_ms:.1f}ms "
+                f"({pool.status()})"
+            )
+
+        if self._hooks:
+            snapshot = self.snapshot(pool)
+            for hook in self._hooks:
+                try:
+                    hook(snapshot)
+                except Exception as e:
+                    logger.error(f"Pool metrics hook failed: {e}")
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict:
+        """Current pool occupancy plus accumulated wait statistics."""
+        stats = {
+            "pool": self.name,
+            "pool_class": type(pool).__name__,
+            "pid": os.getpid(),
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_connections": pool.size() + max(pool._max_overflow, 0),
+            })
+        with self._lock:
+            stats.update({
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 2) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 2),
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+            })
+        return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.slow_checkouts = 0
+            self.timeouts = 0
+
+
+def timed_pool_class(metrics: PoolMetrics, base: Type[QueuePool] = AsyncAdaptedQueuePool) -> Type[QueuePool]:
+    """Queue pool subclass that reports checkout wait times to `metrics`.
+
+    Checkouts are timed inside the pool, so sessions still connect lazily.
+    The class survives pool.recreate(), which builds a new instance of it.
+    """
+
+    class TimedQueuePool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except PoolTimeoutError:
+                metrics.record_timeout()
+                raise
+            metrics.record_checkout(self, (time.perf_counter() - started) * 1000)
+            return conn
+
+    return TimedQueuePool
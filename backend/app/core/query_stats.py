@@ -0,0 +1,135 @@
+"""
+Per-request SQL statement counting.
+
+Engine events count every statement and its time against the request that
+issued it. The middleware logs requests over QUERY_BUDGET_PER_REQUEST and
+statements repeated often enough to look like an N+1 loop, and in DEBUG
+mode adds X-DB-Query-Count / X-DB-Time-Ms headers to the response.
+`assert_max_queries` lets tests fail a route that goes over its budget.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """Statements executed at least `threshold` times, most frequent first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+# Holds a mutable QueryStats, so sessions running in copied contexts
+# (greenlets, threadpool dependencies) still count against the request
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Stats of finished requests, collected while assert_max_queries is active
+_captured: Optional[List[QueryStats]] = None
+_captured_lock = threading.Lock()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - started) * 1000)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def _route_path(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", request.url.path)
+
+
+async def query_stats_middleware(request: Request, call_next):
+    stats = QueryStats(request.method, request.url.path)
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    stats.path = _route_path(request)
+    if stats.count > settings.QUERY_BUDGET_PER_REQUEST:
+        logger.warning(
+            f"{stats.method} {stats.path} ran {stats.count} queries "
+            f"(budget {settings.QUERY_BUDGET_PER_REQUEST}) in {stats.total_ms:.1f}ms"
+        )
+    for statement, n in stats.repeated(settings.QUERY_REPEAT_THRESHOLD):
+        logger.warning(
+            f"Possible N+1 in {stats.method} {stats.path}: statement ran {n} times: "
+            f"{' '.join(statement.split())[:200]}"
+        )
+
+    if settings.DEBUG:
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.1f}"
+
+    with _captured_lock:
+        if _captured is not None:
+            _captured.append(stats)
+    return response
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[List[QueryStats]]:
+    """Fail if any request made inside the block runs more than `budget` queries.
+
+    Usage in a test:
+        with assert_max_queries(5):
+            client.get("/api/v1/admin/fees", headers=admin_headers)
+    """
+    global _captured
+    with _captured_lock:
+        _captured = []
+    try:
+        yield _captured
+        over = [s for s in _captured if s.count > budget]
+    finally:
+        with _captured_lock:
+            _captured = None
+
+    if over:
+        details = "; ".join(f"{s.method} {s.path}: {s.count} queries" for s in over)
+        raise AssertionError(f"Query budget of {budget} exceeded: {details}")
@@ -0,0 +1,126 @@
+"""
+Read-replica routing.
+
+Decides per request whether read-only endpoints may use the replica engine:
+- users who committed a write within DB_READ_YOUR_WRITES_SECONDS stay on
+  the primary so they see their own data. Responses to a committed write
+  carry a signed X-DB-Wrote-At marker that the client sends back on later
+  requests, so this holds whichever worker or host serves them;
+- when DB_REPLICA_MAX_LAG_SECONDS is set, replication lag is sampled every
+  DB_REPLICA_LAG_CHECK_SECONDS and reads fall back to the primary while the
+  replica is further behind than that (or unreachable).
+"""
+import hashlib
+import hmac
+import logging
+import time
+from typing import Optional
+
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WROTE_AT_HEADER = "X-DB-Wrote-At"
+
+REPLICA_LAG_SQL = {
+    "postgresql": text(
+        "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    ),
+}
+
+
+def request_user_key(request: Request) -> Optional[str]:
+    """Subject of the bearer token, used only to route the user's reads.
+
+    The token is not verified here; authentication still happens in
+    get_current_user, so a forged token can at most send reads to the primary.
+    """
+    auth = request.headers.get("authorization", "")
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return str(subject) if subject is not None else None
+
+
+def _marker_signature(user_key: str, until: int) -> str:
+    message = f"{user_key}:{until}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def write_marker(user_key: str) -> str:
+    """Signed marker pinning the user's reads to the primary for the read-your-writes window."""
+    until = int(time.time()) + settings.DB_READ_YOUR_WRITES_SECONDS
+    return f"{until}.{_marker_signature(user_key, until)}"
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the request carries a valid, unexpired write marker for its user."""
+    user_key = request_user_key(request)
+    until, _, signature = request.headers.get(WROTE_AT_HEADER, "").partition(".")
+    if user_key is None or not until.isdigit() or int(until) <= time.time():
+        return False
+    return hmac.compare_digest(signature, _marker_signature(user_key, int(until)))
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """Send the write marker set by a committed write back to the client."""
+    response = await call_next(request)
+    marker = getattr(request.state, "db_write_marker", None)
+    if marker is not None:
+        response.headers[WROTE_AT_HEADER] = marker
+    return response
+
+
+class ReplicaRouter:
+    """Tracks replica lag for one worker process."""
+
+    def __init__(self):
+        self._lag_seconds: Optional[float] = None
+        self._lag_checked_at = 0.0
+
+    async def replica_lag(self, read_engine: AsyncEngine) -> Optional[float]:
+        """Replication lag in seconds, sampled at most every DB_REPLICA_LAG_CHECK_SECONDS.
+
+        Returns None when the replica could not be reached.
+        """
+        now = time.monotonic()
+        if now - self._lag_checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            return self._lag_seconds
+
+        self._lag_checked_at = now
+        lag_sql = REPLICA_LAG_SQL.get(read_engine.dialect.name)
+        if lag_sql is None:
+            self._lag_seconds = 0.0
+            return self._lag_seconds
+
+        try:
+            async with read_engine.connect() as conn:
+                self._lag_seconds = float(await conn.scalar(lag_sql))
+        except Exception as e:
+            logger.warning(f"Replica lag check failed, reading from primary: {e}")
+            self._lag_seconds = None
+        return self._lag_seconds
+
+    async def use_replica(self, request: Request, read_engine: AsyncEngine) -> bool:
+        """Whether this request's reads can be served by the replica."""
+        if wrote_recently(request):
+            return False
+
+        max_lag = settings.DB_REPLICA_MAX_LAG_SECONDS
+        if max_lag is None:
+            return True
+
+        lag = await self.replica_lag(read_engine)
+        return lag is not None and lag <= max_lag
+
+
+replica_router = ReplicaRouter()
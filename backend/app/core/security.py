@@ -1,12 +1,13 @@
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -53,7 +54,7 @@ def decode_token(token: str) -> dict:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     from app.models.user import User
 
@@ -70,7 +71,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if user is None:
         raise credentials_exception
     return user
@@ -85,3 +86,19 @@ def require_role(allowed_roles: list):
             )
         return current_user
     return role_checker
+
+
+def require_scanner_key(x_scanner_key: Optional[str] = Header(None)) -> str:
+    """Authenticate gate scanners by the X-Scanner-Key header against SCANNER_API_KEYS."""
+    keys = [key.strip() for key in (settings.SCANNER_API_KEYS or "").split(",") if key.strip()]
+    if not keys:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scanner ingestion is not configured"
+        )
+    if not x_scanner_key or not any(hmac.compare_digest(x_scanner_key, key) for key in keys):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid scanner key"
+        )
+    return x_scanner_key
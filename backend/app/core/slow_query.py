@@ -0,0 +1,204 @@
+"""
+Slow-query log.
+
+Statements slower than SLOW_QUERY_MS are written to a rotating log file with
+their (redacted) bound parameters, the route that issued them and the query
+plan. Plans are captured by a background thread on a separate connection, so
+the request that ran the slow statement neither waits for the EXPLAIN nor
+shares its transaction. SLOW_QUERY_SAMPLE_RATE limits timing to a fraction
+of statements when the overhead matters.
+"""
+import datetime
+import decimal
+import enum
+import logging
+import queue
+import random
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.config import settings
+from app.core.query_stats import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+# Plan prefix per dialect; dialects not listed are logged without a plan
+EXPLAIN_PREFIX = {
+    "postgresql": "EXPLAIN (ANALYZE off) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper around a compiled SELECT."""
+
+    inherit_cache = False
+
+    def __init__(self, statement, prefix: str):
+        self.statement = statement
+        self.prefix = prefix
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return element.prefix + compiler.process(element.statement, **kw)
+
+
+def redact_value(value: Any) -> Any:
+    """Keep numbers, dates and enum names; hide strings and anything else."""
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (datetime.date, datetime.time, decimal.Decimal)):
+        return str(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [redact_value(v) for v in value]
+    if isinstance(value, (str, bytes)):
+        return f"<redacted {type(value).__name__} len={len(value)}>"
+    return f"<redacted {type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_value(value) for value in parameters]
+    return redact_value(parameters)
+
+
+def _build_file_logger() -> logging.Logger:
+    file_logger = logging.getLogger("app.slow_queries")
+    file_logger.propagate = False
+    if not file_logger.handlers:
+        path = Path(settings.SLOW_QUERY_LOG_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        file_logger.addHandler(handler)
+        file_logger.setLevel(logging.INFO)
+    return file_logger
+
+
+class SlowQueryLog:
+    """Engine listeners plus the background EXPLAIN worker."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+        self._explain_engine: Optional[Engine] = None
+        self._file_logger: Optional[logging.Logger] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.SLOW_QUERY_MS) and settings.SLOW_QUERY_SAMPLE_RATE > 0
+
+    def install(self, engine: Engine, explain_engine: Engine) -> None:
+        """Time statements on `engine`; plans are captured with `explain_engine`."""
+        if not self.enabled:
+            return
+        self._explain_engine = explain_engine
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is None or not context.execution_options.get("slow_query_log", True):
+            return
+        if settings.SLOW_QUERY_SAMPLE_RATE < 1 and random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+            return
+        context._slow_query_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < settings.SLOW_QUERY_MS:
+            return
+
+        stats = current_query_stats()
+        entry = {
+            "elapsed_ms": round(elapsed_ms, 1),
+            "route": f"{stats.method} {stats.path}" if stats else None,
+            "statement": " ".join(statement.split()),
+            "parameters": redact_parameters(parameters),
+            "explain": None,
+        }
+
+        compiled = context.compiled
+        explainable = (
+            settings.SLOW_QUERY_EXPLAIN
+            and not executemany
+            and compiled is not None
+            and not (context.isinsert or context.isupdate or context.isdelete)
+            and statement.lstrip()[:6].upper() in ("SELECT", "WITH")
+            and conn.dialect.name in EXPLAIN_PREFIX
+        )
+        if explainable:
+            entry["explain"] = (compiled.statement, dict(context.compiled_parameters[0]))
+
+        self._enqueue(entry)
+
+    def _enqueue(self, entry: Dict) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="slow-query-log", daemon=True)
+            self._worker.start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            logger.warning("Slow-query log queue full, dropping entry")
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            try:
+                self._write(entry)
+            except Exception as e:
+                logger.error(f"Failed to write slow-query log entry: {e}")
+
+    def _write(self, entry: Dict) -> None:
+        plan = None
+        if entry["explain"] is not None:
+            statement, params = entry["explain"]
+            plan = self._explain(statement, params)
+
+        lines = [
+            f"{entry['elapsed_ms']}ms route={entry['route'] or '-'}",
+            f"  statement: {entry['statement']}",
+            f"  parameters: {entry['parameters']}",
+        ]
+        if plan:
+            lines.append("  plan:")
+            lines.extend(f"    {line}" for line in plan)
+
+        if self._file_logger is None:
+            self._file_logger = _build_file_logger()
+        self._file_logger.info("\n".join(lines))
+
+    def _explain(self, statement, params: Dict) -> Optional[list]:
+        engine = self._explain_engine
+        prefix = EXPLAIN_PREFIX.get(engine.dialect.name)
+        if prefix is None:
+            return None
+        try:
+            with engine.connect().execution_options(slow_query_log=False) as conn:
+                rows = conn.execute(Explain(statement, prefix), params).all()
+        except Exception as e:
+            return [f"EXPLAIN failed: {e}"]
+        return [" | ".join(str(col) for col in row) for row in rows]
+
+
+slow_query_log = SlowQueryLog()
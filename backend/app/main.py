@@ -3,10 +3,16 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine
+from app.core.migrations import ensure_schema_revision
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_stats import query_stats_middleware
+from app.core.replica import WROTE_AT_HEADER, read_your_writes_middleware
 import app.models  # noqa: F401
-from app.api.v1 import auth, students, parents, teachers, admin, fees, admissions, ai, payments, notifications, bulk
+from app.api.v1 import auth, students, parents, teachers, admin, fees, admissions, ai, payments, notifications, bulk, scanners
 from app.seed_data import run_seed
+from app.services.attendance_partitions import ensure_attendance_partitions
+from app.services.scan_ingest import scan_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +23,17 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting SLNSVM API...")
 
-    # Ensure schema exists for local non-Docker runs.
-    Base.metadata.create_all(bind=engine)
+    # Schema is managed by Alembic; refuse to start on an outdated database
+    ensure_schema_revision()
+
+    # Attendance is partitioned per academic year on PostgreSQL; keep the
+    # current and upcoming partitions in place
+    try:
+        created = ensure_attendance_partitions(engine)
+        if created:
+            logger.info(f"Created attendance partitions: {', '.join(created)}")
+    except Exception as e:
+        logger.error(f"Attendance partition maintenance failed: {e}")
 
     # Run seed data if enabled
     if settings.SEED_DATA_ENABLED:
@@ -28,10 +43,14 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Seed data failed: {e}")
 
+    # Periodic writer for buffered gate scanner check-ins
+    scan_buffer.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down SLNSVM API...")
+    await scan_buffer.stop()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -62,8 +81,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, WROTE_AT_HEADER],
 )
 
+# Per-request SQL statement counting
+app.middleware("http")(query_stats_middleware)
+
+# Write markers that keep a user's next reads on the primary
+app.middleware("http")(read_your_writes_middleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(students.router, prefix="/api/v1")
@@ -76,6 +102,7 @@ app.include_router(ai.router, prefix="/api/v1")
 app.include_router(payments.router, prefix="/api/v1/payments", tags=["Payments"])
 app.include_router(notifications.router, prefix="/api/v1", tags=["Notifications"])
 app.include_router(bulk.router, prefix="/api/v1")
+app.include_router(scanners.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -5,11 +5,14 @@ from app.models.teacher import Teacher, teacher_subjects, teacher_classes
 from app.models.admin import Admin
 from app.models.academic import Class, Subject, Timetable, DayOfWeek
 from app.models.assignment import Assignment, AssignmentSubmission
-from app.models.attendance import Attendance, AttendanceStatus
+from app.models.attendance import Attendance, AttendanceStatus, StudentAttendanceSummary, AttendanceFlag, AttendanceSyncOp
 from app.models.fee import Fee, FeeType, FeeStatus
 from app.models.notice import Notice
 from app.models.admission import Admission, AdmissionStatus
-from app.models.exam import Exam, ExamSchedule, ExamResult
+from app.models.exam import (
+    Exam, ExamSchedule, ExamResult, ReportCard, ReportCardSubject, ExamPublication, PublishedResult,
+    ResultNotification, SeatingPlan, SeatAssignment
+)
 from app.models.message import Message, MessageParticipantType
 
 __all__ = [
@@ -20,10 +23,11 @@ __all__ = [
     "Admin",
     "Class", "Subject", "Timetable", "DayOfWeek",
     "Assignment", "AssignmentSubmission",
-    "Attendance", "AttendanceStatus",
+    "Attendance", "AttendanceStatus", "StudentAttendanceSummary", "AttendanceFlag", "AttendanceSyncOp",
     "Fee", "FeeType", "FeeStatus",
     "Notice",
     "Admission", "AdmissionStatus",
-    "Exam", "ExamSchedule", "ExamResult",
+    "Exam", "ExamSchedule", "ExamResult", "ReportCard", "ReportCardSubject",
+    "ExamPublication", "PublishedResult", "ResultNotification", "SeatingPlan", "SeatAssignment",
     "Message", "MessageParticipantType",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, Time
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, Time, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -50,6 +50,9 @@ class Subject(Base):
 
 class Timetable(Base):
     __tablename__ = "timetable"
+    __table_args__ = (
+        UniqueConstraint("class_id", "day", "period", name="uq_timetable_class_day_period"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
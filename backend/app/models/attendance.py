@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Boolean, Numeric, Enum as SQLEnum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -13,7 +13,15 @@ class AttendanceStatus(str, enum.Enum):
 
 
 class Attendance(Base):
+    # On PostgreSQL this table is range-partitioned by academic year on `date`
+    # (migration 0003, app.services.attendance_partitions), with primary key
+    # (id, date). Filter on `date` so queries touch only the partitions needed.
     __tablename__ = "attendance"
+    __table_args__ = (
+        UniqueConstraint("student_id", "date", name="uq_attendance_student_date"),
+        # Sort key for keyset pagination of the admin attendance list
+        Index("ix_attendance_date_id", "date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -26,3 +34,64 @@ class Attendance(Base):
 
     student = relationship("Student", back_populates="attendance_records")
     marked_by_teacher = relationship("Teacher")
+
+
+class StudentAttendanceSummary(Base):
+    # Per-student, per-academic-year status counters, kept in step with
+    # attendance by app.services.attendance_summary in the marking transaction
+    __tablename__ = "attendance_summary"
+    __table_args__ = (
+        UniqueConstraint("student_id", "academic_year", name="uq_attendance_summary_student_year"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    academic_year = Column(String(20), nullable=False)  # e.g., "2024-25"
+    present = Column(Integer, nullable=False, default=0)
+    absent = Column(Integer, nullable=False, default=0)
+    late = Column(Integer, nullable=False, default=0)
+    excused = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class AttendanceFlag(Base):
+    # Students flagged by the absence job (app.services.absence_flags) for
+    # one day: a run of consecutive absences and/or a high absence rate over
+    # the rolling window ending that day
+    __tablename__ = "attendance_flags"
+    __table_args__ = (
+        UniqueConstraint("student_id", "as_of", name="uq_attendance_flags_student_as_of"),
+        Index("ix_attendance_flags_as_of_class", "as_of", "class_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id"))
+    as_of = Column(Date, nullable=False)
+    absence_streak = Column(Integer, nullable=False, default=0)  # consecutive marked absences up to as_of
+    window_days = Column(Integer, nullable=False)
+    window_marked = Column(Integer, nullable=False, default=0)
+    window_absent = Column(Integer, nullable=False, default=0)
+    absence_rate = Column(Numeric(5, 2), nullable=False, default=0)
+    streak_flagged = Column(Boolean, nullable=False, default=False)
+    rate_flagged = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    student = relationship("Student")
+
+
+class AttendanceSyncOp(Base):
+    # Idempotency keys of offline attendance changes handled by
+    # app.services.attendance_sync, with the outcome replayed on retries
+    __tablename__ = "attendance_sync_ops"
+    __table_args__ = (
+        UniqueConstraint("teacher_id", "idempotency_key", name="uq_attendance_sync_ops_teacher_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=False)
+    idempotency_key = Column(String(64), nullable=False)
+    student_id = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    outcome = Column(String(20), nullable=False)  # applied, conflict, superseded or rejected
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
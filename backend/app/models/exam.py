@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Numeric, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Numeric, Text, Boolean, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -41,6 +41,11 @@ class ExamSchedule(Base):
 
 class ExamResult(Base):
     __tablename__ = "exam_results"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "student_id", "subject_id", name="uq_exam_results_exam_student_subject"),
+        # Parent and student result views look results up by student
+        Index("ix_exam_results_student_exam", "student_id", "exam_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
@@ -56,3 +61,152 @@ class ExamResult(Base):
     exam = relationship("Exam", back_populates="results")
     student = relationship("Student")
     subject = relationship("Subject")
+
+
+class ReportCard(Base):
+    # Report-card snapshot of one student for one exam, written by
+    # app.services.report_cards; portals read these instead of recomputing.
+    # Class rank spans all sections of the class, section rank one class_id.
+    __tablename__ = "report_cards"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "student_id", name="uq_report_cards_exam_student"),
+        Index("ix_report_cards_exam_class", "exam_id", "class_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
+    subjects = Column(Integer, nullable=False)
+    obtained_marks = Column(Numeric(7, 2), nullable=False)
+    total_marks = Column(Numeric(7, 2), nullable=False)
+    percentage = Column(Numeric(5, 2), nullable=False)
+    grade = Column(String(5), nullable=False)
+    passed = Column(Boolean, nullable=False)
+    class_rank = Column(Integer, nullable=False)
+    class_size = Column(Integer, nullable=False)
+    section_rank = Column(Integer, nullable=False)
+    section_size = Column(Integer, nullable=False)
+    percentile = Column(Numeric(5, 2), nullable=False)  # share of the class scoring at most this percentage
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    exam = relationship("Exam")
+    student = relationship("Student")
+
+
+class ReportCardSubject(Base):
+    # Per-subject lines of a report card snapshot
+    __tablename__ = "report_card_subjects"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "student_id", "subject_id", name="uq_report_card_subjects_exam_student_subject"),
+        Index("ix_report_card_subjects_exam_class", "exam_id", "class_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
+    subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
+    marks_obtained = Column(Numeric(5, 2))
+    max_marks = Column(Integer, nullable=False)
+    passing_marks = Column(Integer, nullable=False)
+    percentage = Column(Numeric(5, 2), nullable=False)
+    grade = Column(String(5), nullable=False)
+    passed = Column(Boolean, nullable=False)
+    is_section_topper = Column(Boolean, nullable=False, default=False)
+    is_class_topper = Column(Boolean, nullable=False, default=False)
+
+
+class ExamPublication(Base):
+    # Publish state of an exam's results; parents and students only see
+    # published exams, through the published_results snapshot. Unpublishing
+    # keeps the row (withdrawn) so versions never repeat after a republish
+    __tablename__ = "exam_publications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False, unique=True)
+    version = Column(Integer, nullable=False, default=1)  # bumped on every republish
+    students = Column(Integer, nullable=False, default=0)
+    published_by = Column(Integer, ForeignKey("users.id"))
+    published_at = Column(DateTime(timezone=True), server_default=func.now())
+    withdrawn_at = Column(DateTime(timezone=True))  # set while unpublished
+
+    exam = relationship("Exam")
+
+
+class PublishedResult(Base):
+    # Frozen per-student result of a published exam, written by
+    # app.services.result_publication: the full report (subjects, totals,
+    # ranks) as JSON, plus the headline figures as columns
+    __tablename__ = "published_results"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "student_id", name="uq_published_results_exam_student"),
+        Index("ix_published_results_student_exam", "student_id", "exam_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id"))
+    version = Column(Integer, nullable=False)
+    obtained_marks = Column(Numeric(7, 2), nullable=False)
+    total_marks = Column(Numeric(7, 2), nullable=False)
+    percentage = Column(Numeric(5, 2), nullable=False)
+    grade = Column(String(5), nullable=False)
+    passed = Column(Boolean, nullable=False)
+    class_rank = Column(Integer, nullable=False)
+    report = Column(JSON, nullable=False)
+    published_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ResultNotification(Base):
+    # Outbox of "results published" messages to parents, queued in bulk on
+    # first publication and sent by app.services.result_publication
+    __tablename__ = "result_notifications"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "student_id", name="uq_result_notifications_exam_student"),
+        Index("ix_result_notifications_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    parent_id = Column(Integer, ForeignKey("parents.id"), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # pending, sent or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+
+
+class SeatingPlan(Base):
+    # Seat assignments for one exam sitting (date and start time), generated
+    # by app.services.seating_plans and reused while its inputs are unchanged
+    __tablename__ = "seating_plans"
+    __table_args__ = (
+        UniqueConstraint("exam_id", "exam_date", "start_time", name="uq_seating_plans_sitting"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    exam_id = Column(Integer, ForeignKey("exams.id"), nullable=False)
+    exam_date = Column(Date, nullable=False)
+    start_time = Column(String(10))
+    fingerprint = Column(String(40), nullable=False)  # hash of the students and rooms it was built from
+    rooms = Column(JSON, nullable=False)  # [{"name", "capacity", "columns"}]
+    students = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SeatAssignment(Base):
+    __tablename__ = "seat_assignments"
+    __table_args__ = (
+        UniqueConstraint("plan_id", "student_id", name="uq_seat_assignments_plan_student"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("seating_plans.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
+    class_id = Column(Integer, ForeignKey("classes.id"))
+    room = Column(String(50), nullable=False)
+    row = Column(Integer, nullable=False)  # 1-based, front to back
+    column = Column(Integer, nullable=False)  # 1-based, left to right
+    seat_no = Column(Integer, nullable=False)  # 1-based within the room
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Numeric, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Numeric, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -26,6 +26,12 @@ class FeeStatus(str, enum.Enum):
 
 class Fee(Base):
     __tablename__ = "fees"
+    __table_args__ = (
+        Index("ix_fees_student_status", "student_id", "status"),
+        # Filters and sort key of the paginated fee listings
+        Index("ix_fees_due_date_id", "due_date", "id"),
+        Index("ix_fees_academic_year_status", "academic_year", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
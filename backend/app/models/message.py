@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -15,6 +15,9 @@ class Message(Base):
     Model for parent-teacher communication messages.
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_receiver_unread", "receiver_id", "receiver_type", "is_read"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
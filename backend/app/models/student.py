@@ -11,14 +11,14 @@ class Student(Base):
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
     admission_no = Column(String(50), unique=True, index=True, nullable=False)
     name = Column(String(255), nullable=False)
-    class_id = Column(Integer, ForeignKey("classes.id"))
+    class_id = Column(Integer, ForeignKey("classes.id"), index=True)
     section = Column(String(10))
     roll_no = Column(Integer)
     dob = Column(Date)
     gender = Column(String(10))
     address = Column(String(500))
     phone = Column(String(20))
-    parent_id = Column(Integer, ForeignKey("parents.id"))
+    parent_id = Column(Integer, ForeignKey("parents.id"), index=True)
     blood_group = Column(String(10))
     profile_image = Column(String(500))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
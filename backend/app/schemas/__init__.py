@@ -16,16 +16,23 @@ from app.schemas.teacher import (
 from app.schemas.academic import (
     ClassBase, ClassCreate, ClassUpdate, ClassResponse,
     SubjectBase, SubjectCreate, SubjectUpdate, SubjectResponse,
-    TimetableEntry, TimetableCreate, TimetableResponse
+    TimetableEntry, TimetableCreate, TimetableResponse,
+    TimetableRequirement, TimetableRoom, TimetableGenerate, TimetableShortfall, TimetableGenerationResult
 )
 from app.schemas.assignment import (
     AssignmentBase, AssignmentCreate, AssignmentUpdate, AssignmentResponse,
     SubmissionCreate, SubmissionGrade, SubmissionResponse
 )
 from app.schemas.attendance import (
-    AttendanceBase, AttendanceCreate, AttendanceBulkCreate,
+    AttendanceBase, AttendanceCreate, AttendanceMark, AttendanceBulkCreate, AttendanceBulkResult,
     AttendanceUpdate, AttendanceResponse,
-    StudentAttendanceRecord, ClassAttendanceResponse, AttendanceSummary
+    StudentAttendanceRecord, ClassAttendanceResponse, AttendanceSummary,
+    AttendanceDayCount, StudentAttendanceRow, ClassAttendanceRegister, AttendanceCalendar,
+    ClassAttendanceRate, ClassDailyAttendance, AttendanceHeatmapRow, AttendanceHeatmap,
+    LowAttendanceStudent, AttendanceAnalytics, AttendanceFlagResponse, AbsenceCheckResult,
+    ScanEvent, ScanBatch, ScanBatchResult,
+    SyncConflictPolicy, AttendanceChange, AttendanceSyncRequest, AttendanceChangeResult,
+    AttendanceSyncRow, AttendanceSyncResponse
 )
 from app.schemas.fee import (
     FeeBase, FeeCreate, FeeBulkCreate, FeeUpdate, FeeResponse,
@@ -38,9 +45,12 @@ from app.schemas.admission import (
 )
 from app.schemas.exam import (
     ExamBase, ExamCreate, ExamUpdate, ExamResponse,
-    ExamScheduleBase, ExamScheduleCreate, ExamScheduleResponse,
+    ExamScheduleBase, ExamScheduleCreate, ExamScheduleResponse, ExamScheduleUpdate,
+    ScheduleConflict, ExamScheduleValidation,
     ExamResultBase, ExamResultCreate, ExamResultBulkCreate,
-    ExamResultResponse, StudentResultCard, TeacherMarksEntry, StudentMarkEntry
+    ExamResultResponse, StudentResultCard, TeacherMarksEntry, StudentMarkEntry, MarksEntryResult,
+    StudentExamTotal, ReportCardSubjectResponse, ReportCardResponse, ReportCardRun, ExamPublicationResponse,
+    SeatingRoom, SeatingPlanCreate, SeatAssignmentResponse, SeatingPlanResponse
 )
 from app.schemas.message import (
     MessageCreate, MessageResponse, ConversationTeacher, ConversationParent,
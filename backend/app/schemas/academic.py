@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, time
 from app.models.academic import DayOfWeek
@@ -84,3 +84,43 @@ class TimetableResponse(BaseModel):
     class_id: int
     class_name: str
     entries: List[TimetableEntry]
+
+
+class TimetableRequirement(BaseModel):
+    subject: str  # subject name, matched case-insensitively
+    class_id: Optional[int] = None  # None: every class taking the subject
+    periods: int = Field(..., ge=0)  # periods per week
+    room: Optional[str] = None  # shared room such as a lab; None: the class's own room
+
+
+class TimetableRoom(BaseModel):
+    name: str
+    capacity: int = Field(1, gt=0)  # lessons the room holds at once
+
+
+class TimetableGenerate(BaseModel):
+    class_ids: Optional[List[int]] = None  # None: every class
+    requirements: List[TimetableRequirement] = []
+    default_periods: Optional[int] = Field(None, ge=0)  # None: share the week's free periods evenly
+    rooms: List[TimetableRoom] = []
+    seed: int = 0
+    allow_partial: bool = False  # write the timetable even if some lessons found no slot
+    dry_run: bool = False
+
+
+class TimetableShortfall(BaseModel):
+    class_id: int
+    subject_id: int
+    subject_name: str
+    teacher_id: Optional[int]
+    missing: int
+
+
+class TimetableGenerationResult(BaseModel):
+    classes: int
+    lessons: int
+    placed: int
+    unplaced: List[TimetableShortfall]
+    unstaffed_subject_ids: List[int]  # subjects no teacher is assigned to, timetabled without one
+    written: int
+    seconds: float
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+import enum
+from typing import Dict, Optional, List
 from datetime import date, datetime
 from app.models.attendance import AttendanceStatus
 
@@ -15,10 +16,22 @@ class AttendanceCreate(AttendanceBase):
     pass
 
 
+class AttendanceMark(BaseModel):
+    student_id: int
+    status: AttendanceStatus
+    remarks: Optional[str] = Field(None, max_length=255)
+
+
 class AttendanceBulkCreate(BaseModel):
     date: date
     class_id: int
-    records: List[dict]  # [{student_id: int, status: str, remarks: str}]
+    records: List[AttendanceMark]
+
+
+class AttendanceBulkResult(BaseModel):
+    message: str
+    inserted: int
+    updated: int
 
 
 class AttendanceUpdate(BaseModel):
@@ -51,9 +64,35 @@ class ClassAttendanceResponse(BaseModel):
     present: int
     absent: int
     late: int
+    not_marked: int = 0
     records: List[StudentAttendanceRecord]
 
 
+class AttendanceDayCount(BaseModel):
+    date: date
+    present: int = 0
+    absent: int = 0
+    late: int = 0
+    excused: int = 0
+    not_marked: int = 0
+
+
+class StudentAttendanceRow(BaseModel):
+    student_id: int
+    student_name: str
+    roll_no: Optional[int]
+    statuses: Dict[date, AttendanceStatus] = {}  # marked days only
+
+
+class ClassAttendanceRegister(BaseModel):
+    class_id: int
+    class_name: str
+    start_date: date
+    end_date: date
+    days: List[AttendanceDayCount]
+    students: List[StudentAttendanceRow]
+
+
 class AttendanceSummary(BaseModel):
     total_days: int
     present: int
@@ -61,3 +100,148 @@ class AttendanceSummary(BaseModel):
     late: int
     excused: int
     percentage: float
+
+
+class AttendanceCalendar(BaseModel):
+    student_id: int
+    student_name: Optional[str] = None
+    class_name: Optional[str] = None
+    section: Optional[str] = None
+    academic_year: str
+    start_date: date
+    days: str  # one character per day from start_date: P, A, L, E or - (not marked)
+    summary: AttendanceSummary
+
+
+class ClassAttendanceRate(BaseModel):
+    class_id: int
+    class_name: str
+    marked: int
+    attendance_rate: float
+
+
+class ClassDailyAttendance(BaseModel):
+    class_id: int
+    date: date
+    present: int
+    absent: int
+    late: int
+    excused: int
+    attendance_rate: float
+
+
+class AttendanceHeatmapRow(BaseModel):
+    class_id: int
+    class_name: str
+    rates: List[Optional[float]]
+
+
+class AttendanceHeatmap(BaseModel):
+    columns: List[str]
+    rows: List[AttendanceHeatmapRow]
+
+
+class LowAttendanceStudent(BaseModel):
+    student_id: int
+    student_name: str
+    class_id: int
+    class_name: str
+    marked: int
+    attendance_rate: float
+
+
+class AttendanceAnalytics(BaseModel):
+    start_date: date
+    end_date: date
+    classes: List[ClassAttendanceRate]
+    daily: List[ClassDailyAttendance]
+    monthly: AttendanceHeatmap  # columns are months, e.g. "2024-07"
+    weekdays: AttendanceHeatmap  # columns are weekday names
+    lowest_students: List[LowAttendanceStudent]
+
+
+class AttendanceFlagResponse(BaseModel):
+    student_id: int
+    student_name: str
+    class_id: Optional[int] = None
+    class_name: Optional[str] = None
+    as_of: date
+    absence_streak: int  # consecutive marked absences up to as_of
+    window_days: int
+    window_marked: int
+    window_absent: int
+    absence_rate: float  # percent of marked days absent within the window
+    streak_flagged: bool
+    rate_flagged: bool
+
+
+class AbsenceCheckResult(BaseModel):
+    as_of: date
+    flagged: int
+    streaks: int
+    low_rates: int
+
+
+class ScanEvent(BaseModel):
+    # A gate check-in; the card or QR code carries either id
+    student_id: Optional[int] = None
+    admission_no: Optional[str] = Field(None, max_length=50)
+    scanned_at: datetime
+    scanner_id: Optional[str] = Field(None, max_length=50)
+
+    @model_validator(mode="after")
+    def check_student(self):
+        if self.student_id is None and not self.admission_no:
+            raise ValueError("student_id or admission_no is required")
+        return self
+
+
+class ScanBatch(BaseModel):
+    events: List[ScanEvent] = Field(..., max_length=5000)
+
+
+class ScanBatchResult(BaseModel):
+    accepted: int
+    duplicates: int  # collapsed into an earlier check-in of the same student and day
+    rejected: int  # scanned too long ago or ahead of the server clock; not buffered
+    pending: int  # check-ins buffered for the next write
+
+
+class SyncConflictPolicy(str, enum.Enum):
+    LAST_WRITER_WINS = "last_writer_wins"  # the later of the client change and the server's last write wins
+    SERVER_WINS = "server_wins"  # server writes made since the client's last sync win
+
+
+class AttendanceChange(BaseModel):
+    idempotency_key: str = Field(..., min_length=8, max_length=64)
+    student_id: int
+    date: date
+    status: AttendanceStatus
+    remarks: Optional[str] = Field(None, max_length=255)
+    changed_at: datetime  # when the teacher made the change, by the client clock
+
+
+class AttendanceSyncRequest(BaseModel):
+    sync_token: Optional[str] = None  # from the previous sync; omit for a full download
+    conflict_policy: SyncConflictPolicy = SyncConflictPolicy.LAST_WRITER_WINS
+    changes: List[AttendanceChange] = Field(default_factory=list, max_length=2000)
+
+
+class AttendanceChangeResult(BaseModel):
+    idempotency_key: str
+    outcome: str  # applied, conflict, superseded or rejected
+    replayed: bool = False  # key seen in an earlier sync; outcome is the original one
+
+
+class AttendanceSyncRow(BaseModel):
+    student_id: int
+    date: date
+    status: AttendanceStatus
+    remarks: Optional[str] = None
+    changed_at: Optional[datetime] = None
+
+
+class AttendanceSyncResponse(BaseModel):
+    sync_token: str
+    results: List[AttendanceChangeResult]
+    changes: List[AttendanceSyncRow]  # server state changed since the request's sync_token
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import date, datetime
 from decimal import Decimal
@@ -58,6 +58,45 @@ class ExamScheduleResponse(ExamScheduleBase):
         from_attributes = True
 
 
+class ExamScheduleUpdate(BaseModel):
+    class_id: Optional[int] = None
+    subject_id: Optional[int] = None
+    exam_date: Optional[date] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    max_marks: Optional[int] = None
+    passing_marks: Optional[int] = None
+    room: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_required(self):
+        # Fields may be left out, but those the schedule requires cannot be cleared
+        cleared = [
+            field for field in ("class_id", "subject_id", "exam_date", "max_marks")
+            if field in self.model_fields_set and getattr(self, field) is None
+        ]
+        if cleared:
+            raise ValueError(f"{', '.join(cleared)} cannot be null")
+        return self
+
+
+class ScheduleConflict(BaseModel):
+    kind: str  # "class" or "room"
+    exam_date: date
+    class_id: Optional[int] = None
+    room: Optional[str] = None
+    schedule_id: Optional[int] = None  # None for a schedule not saved yet
+    other_schedule_id: Optional[int] = None
+    overlap_start: str
+    overlap_end: str
+
+
+class ExamScheduleValidation(BaseModel):
+    exam_id: int
+    schedules: int
+    conflicts: List[ScheduleConflict]
+
+
 class ExamResultBase(BaseModel):
     exam_id: int
     student_id: int
@@ -90,6 +129,12 @@ class TeacherMarksEntry(BaseModel):
     results: List[StudentMarkEntry]
 
 
+class MarksEntryResult(BaseModel):
+    message: str
+    inserted: int
+    updated: int
+
+
 class ExamResultResponse(ExamResultBase):
     id: int
     student_name: Optional[str] = None
@@ -110,3 +155,108 @@ class StudentResultCard(BaseModel):
     total_obtained: Decimal
     percentage: float
     overall_grade: str
+
+
+class StudentExamTotal(BaseModel):
+    student_id: int
+    student_name: str
+    roll_no: Optional[int] = None
+    class_id: Optional[int] = None
+    class_name: Optional[str] = None
+    subjects: int
+    obtained_marks: float
+    total_marks: float  # subjects without a schedule count as out of 100
+    percentage: float
+
+
+class ReportCardSubjectResponse(BaseModel):
+    subject_id: int
+    subject_name: Optional[str] = None
+    marks_obtained: Optional[float] = None
+    max_marks: int
+    passing_marks: int
+    percentage: float
+    grade: str
+    passed: bool
+    is_section_topper: bool
+    is_class_topper: bool
+    absent: bool = False  # no marks for a scheduled paper: counted as 0 and failed
+    remarks: Optional[str] = None
+
+
+class ReportCardResponse(BaseModel):
+    exam_id: int
+    exam_name: str
+    academic_year: Optional[str] = None
+    student_id: int
+    student_name: str
+    roll_no: Optional[int] = None
+    class_id: int
+    class_name: Optional[str] = None
+    subjects: List[ReportCardSubjectResponse]
+    obtained_marks: float
+    total_marks: float
+    percentage: float
+    grade: str
+    passed: bool
+    class_rank: int  # across all sections of the class
+    class_size: int
+    section_rank: int
+    section_size: int
+    percentile: float
+    generated_at: Optional[datetime] = None
+    published_at: Optional[datetime] = None  # set on published snapshots
+
+
+class ReportCardRun(BaseModel):
+    exam_id: int
+    class_ids: List[int]  # every section of the class
+    students: int
+    passed: int
+    absent: int  # scheduled papers without marks, counted as 0 and failed
+
+
+class ExamPublicationResponse(BaseModel):
+    exam_id: int
+    version: int
+    students: int
+    notifications_queued: int
+    published_at: Optional[datetime] = None
+
+
+class SeatingRoom(BaseModel):
+    name: str = Field(..., min_length=1, max_length=50)
+    capacity: int = Field(..., gt=0)
+    columns: Optional[int] = Field(None, gt=0)  # desks per row (default: SEATING_DEFAULT_COLUMNS)
+
+
+class SeatingPlanCreate(BaseModel):
+    exam_date: date
+    start_time: Optional[str] = None
+    rooms: List[SeatingRoom] = Field(..., min_length=1)
+    class_ids: Optional[List[int]] = None  # default: classes scheduled in the sitting
+
+
+class SeatAssignmentResponse(BaseModel):
+    student_id: int
+    student_name: str
+    admission_no: str
+    roll_no: Optional[int] = None
+    class_id: Optional[int] = None
+    class_name: Optional[str] = None
+    room: str
+    row: int
+    column: int
+    seat_no: int
+
+
+class SeatingPlanResponse(BaseModel):
+    id: int
+    exam_id: int
+    exam_date: date
+    start_time: Optional[str] = None
+    rooms: List[SeatingRoom]
+    students: int
+    cached: bool = False  # True when an unchanged earlier plan was returned
+    created_at: Optional[datetime] = None
+    seats: List[SeatAssignmentResponse]
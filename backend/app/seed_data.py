@@ -29,16 +29,22 @@ from app.core.database import SessionLocal
 from app.core.config import settings
 from app.models.user import User, UserRole
 from app.models.student import Student
-from app.models.teacher import Teacher
+from app.models.teacher import Teacher, teacher_subjects
 from app.models.parent import Parent
 from app.models.admin import Admin
-from app.models.academic import Class, Subject, Timetable, DayOfWeek
+from app.models.academic import Class, Subject, Timetable
 from app.models.assignment import Assignment, AssignmentSubmission
-from app.models.attendance import Attendance, AttendanceStatus
+from app.models.attendance import Attendance, AttendanceFlag, AttendanceStatus, AttendanceSyncOp, StudentAttendanceSummary
 from app.models.fee import Fee, FeeType, FeeStatus
 from app.models.notice import Notice
 from app.models.admission import Admission, AdmissionStatus
-from app.models.exam import Exam, ExamSchedule, ExamResult
+from app.models.exam import (
+    Exam, ExamSchedule, ExamResult, ReportCard, ReportCardSubject, ExamPublication, PublishedResult,
+    ResultNotification, SeatingPlan, SeatAssignment
+)
+from app.schemas import TimetableGenerate, TimetableGenerationResult
+from app.services import attendance_summary
+from app.services.timetable_generator import generate_timetable
 
 logger = logging.getLogger(__name__)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -420,50 +426,32 @@ def create_parents_and_students(db: Session, classes: list[Class]) -> tuple[list
     return parents, students
 
 
-def create_timetable(db: Session, classes: list[Class], subjects: list[Subject], teachers: list) -> list[Timetable]:
-    """Create timetable for classes"""
-    import random
-
-    timetables = []
-    periods = [
-        ("08:00", "08:45"),
-        ("08:45", "09:30"),
-        ("09:30", "10:15"),
-        ("10:30", "11:15"),  # After break
-        ("11:15", "12:00"),
-        ("12:00", "12:45"),
-        ("13:30", "14:15"),  # After lunch
-        ("14:15", "15:00"),
-    ]
-
-    days = [DayOfWeek.MONDAY, DayOfWeek.TUESDAY, DayOfWeek.WEDNESDAY,
-            DayOfWeek.THURSDAY, DayOfWeek.FRIDAY, DayOfWeek.SATURDAY]
-
-    for class_obj in classes:
-        class_subjects = [s for s in subjects if s.class_id == class_obj.id]
-        if not class_subjects:
-            continue
-
-        for day in days:
-            for period_num, (start_time, end_time) in enumerate(periods, 1):
-                subject = random.choice(class_subjects)
-                teacher = random.choice(teachers)[1] if teachers else None
-
-                timetable = Timetable(
-                    class_id=class_obj.id,
-                    day=day,
-                    period=period_num,
-                    start_time=start_time,
-                    end_time=end_time,
-                    subject_id=subject.id,
-                    teacher_id=teacher.id if teacher else None,
-                    room=class_obj.room_number
-                )
-                db.add(timetable)
-                timetables.append(timetable)
+def create_timetable(db: Session, classes: list[Class], subjects: list[Subject], teachers: list) -> TimetableGenerationResult:
+    """Assign teachers to subjects and generate a clash-free timetable"""
+    # Subjects each teacher can take, by a keyword of their qualification
+    specialisms = {
+        "Hindi": ["Hindi"],
+        "Mathematics": ["Mathematics", "Biology/Mathematics"],
+        "Physics": ["Physics", "Science"],
+        "Chemistry": ["Chemistry", "Science"],
+        "English": ["English"],
+        "Biology": ["Biology/Mathematics", "Science", "EVS"],
+        "Social Science": ["Social Science", "History", "Political Science", "Geography", "Economics"],
+        "MCA": ["Computer", "Computer Science"],
+        "Sanskrit": ["Sanskrit"],
+        "P.Ed": ["Physical Education"],
+        "Fine Arts": ["Drawing"],
+        "Music": ["Rhymes"],
+    }
 
+    for _, teacher in teachers:
+        names = {name for keyword, taught in specialisms.items() if keyword in (teacher.qualification or "") for name in taught}
+        teacher.subjects = [subject for subject in subjects if subject.name in names]
     db.flush()
-    return timetables
+
+    # One teacher per subject across 22 classes: two periods of each subject
+    # a week is what the staff can cover without clashes
+    return generate_timetable(db.connection(), TimetableGenerate(default_periods=2, allow_partial=True))
 
 
 def create_notices(db: Session, admin_user: User) -> list[Notice]:
@@ -820,16 +808,27 @@ def clear_all_data(db: Session):
     logger.warning("Clearing all existing data...")
 
     # Delete in order to respect foreign keys
+    db.query(SeatAssignment).delete()
+    db.query(SeatingPlan).delete()
+    db.query(ResultNotification).delete()
+    db.query(PublishedResult).delete()
+    db.query(ExamPublication).delete()
+    db.query(ReportCardSubject).delete()
+    db.query(ReportCard).delete()
     db.query(ExamResult).delete()
     db.query(ExamSchedule).delete()
     db.query(Exam).delete()
     db.query(AssignmentSubmission).delete()
     db.query(Assignment).delete()
+    db.query(AttendanceSyncOp).delete()
+    db.query(AttendanceFlag).delete()
+    db.query(StudentAttendanceSummary).delete()
     db.query(Attendance).delete()
     db.query(Fee).delete()
     db.query(Notice).delete()
     db.query(Admission).delete()
     db.query(Timetable).delete()
+    db.execute(teacher_subjects.delete())
     db.query(Subject).delete()
     db.query(Student).delete()
     db.query(Parent).delete()
@@ -888,7 +887,8 @@ def run_seed():
 
         # Create timetable
         logger.info("Creating timetable...")
-        timetables = create_timetable(db, classes, subjects, teachers)
+        timetable = create_timetable(db, classes, subjects, teachers)
+        logger.info(f"Timetable: {timetable.written} entries, {timetable.placed} of {timetable.lessons} lessons placed")
 
         # Create notices
         logger.info("Creating notices...")
@@ -905,6 +905,8 @@ def run_seed():
         # Create attendance
         logger.info("Creating attendance records...")
         attendance = create_attendance(db, students, teachers)
+        db.flush()
+        attendance_summary.backfill(db.connection())
 
         # Create assignments
         logger.info("Creating assignments...")
@@ -0,0 +1,160 @@
+"""
+Chronic-absence and absence-streak detection.
+
+A daily batch job flags students, for the whole school at once:
+
+- streak: at least ABSENCE_STREAK_DAYS consecutive marked absences up to
+  the run date. Present or late ends a streak; excused days and days
+  without a mark (holidays) neither count nor break it.
+- rate: an absence rate at or above ABSENCE_RATE_THRESHOLD percent over the
+  ABSENCE_WINDOW_DAYS ending on the run date, once the student has at
+  least ABSENCE_MIN_MARKED_DAYS marked days in that window.
+
+Both measures come from one GROUP BY over the window's attendance, written
+straight into attendance_flags with INSERT ... SELECT, so a run is two
+statements however large the school is. Re-running a date replaces its flags.
+
+Usage (schedule daily, after attendance is marked):
+    cd backend
+    python -m app.services.absence_flags run
+    python -m app.services.absence_flags run --date 2024-11-15
+"""
+import argparse
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Numeric, and_, case, cast, delete, func, insert, literal, literal_column, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Attendance, AttendanceFlag, AttendanceStatus, Class, Student
+from app.schemas import AttendanceFlagResponse
+
+logger = logging.getLogger(__name__)
+
+
+def flag_query(as_of: date):
+    """Per-student streak and window absence rate, limited to students over a threshold."""
+    window_start = as_of - timedelta(days=settings.ABSENCE_WINDOW_DAYS - 1)
+    in_window = [Attendance.date >= window_start, Attendance.date <= as_of]
+
+    last_attended = (
+        select(Attendance.student_id, func.max(Attendance.date).label("last_date"))
+        .where(*in_window, Attendance.status.in_([AttendanceStatus.PRESENT, AttendanceStatus.LATE]))
+        .group_by(Attendance.student_id)
+        .subquery()
+    )
+
+    is_absent = Attendance.status == AttendanceStatus.ABSENT
+    marked = func.count()
+    absent = func.count(case((is_absent, 1)))
+    streak = func.count(case((and_(
+        is_absent,
+        or_(last_attended.c.last_date.is_(None), Attendance.date > last_attended.c.last_date)
+    ), 1)))
+    streak_flagged = streak >= settings.ABSENCE_STREAK_DAYS
+    rate_flagged = and_(
+        marked >= settings.ABSENCE_MIN_MARKED_DAYS,
+        absent * 100 >= literal(settings.ABSENCE_RATE_THRESHOLD) * marked
+    )
+
+    return (
+        select(
+            Attendance.student_id,
+            Student.class_id,
+            literal(as_of).label("as_of"),
+            streak.label("absence_streak"),
+            literal(settings.ABSENCE_WINDOW_DAYS).label("window_days"),
+            marked.label("window_marked"),
+            absent.label("window_absent"),
+            cast(absent * literal_column("100.0") / marked, Numeric(5, 2)).label("absence_rate"),
+            streak_flagged.label("streak_flagged"),
+            rate_flagged.label("rate_flagged"),
+        )
+        .join(Student, Student.id == Attendance.student_id)
+        .outerjoin(last_attended, last_attended.c.student_id == Attendance.student_id)
+        .where(*in_window)
+        .group_by(Attendance.student_id, Student.class_id, last_attended.c.last_date)
+        .having(or_(streak_flagged, rate_flagged))
+    )
+
+
+def run_absence_check(conn: Connection, as_of: Optional[date] = None) -> Dict:
+    """Replace the flags for `as_of` (default: today). The caller commits."""
+    as_of = as_of or date.today()
+    query = flag_query(as_of)
+
+    conn.execute(delete(AttendanceFlag).where(AttendanceFlag.as_of == as_of))
+    conn.execute(insert(AttendanceFlag).from_select([column.name for column in query.selected_columns], query))
+
+    streaks, low_rates, flagged = conn.execute(select(
+        func.count(case((AttendanceFlag.streak_flagged, 1))),
+        func.count(case((AttendanceFlag.rate_flagged, 1))),
+        func.count()
+    ).where(AttendanceFlag.as_of == as_of)).one()
+
+    logger.info(f"Absence check for {as_of}: {flagged} students flagged ({streaks} streaks, {low_rates} low rates)")
+    return {"as_of": as_of, "flagged": flagged, "streaks": streaks, "low_rates": low_rates}
+
+
+async def list_flags(
+    db: AsyncSession,
+    as_of: Optional[date] = None,
+    class_ids: Optional[List[int]] = None
+) -> List[AttendanceFlagResponse]:
+    """Flags of one run (default: the latest), longest streak first."""
+    if as_of is None:
+        as_of = await db.scalar(select(func.max(AttendanceFlag.as_of)))
+        if as_of is None:
+            return []
+
+    query = (
+        select(AttendanceFlag, Student.name, Class.name, Class.section)
+        .join(Student, Student.id == AttendanceFlag.student_id)
+        .outerjoin(Class, Class.id == AttendanceFlag.class_id)
+        .where(AttendanceFlag.as_of == as_of)
+        .order_by(AttendanceFlag.absence_streak.desc(), AttendanceFlag.absence_rate.desc())
+    )
+    if class_ids is not None:
+        query = query.where(AttendanceFlag.class_id.in_(class_ids))
+
+    return [
+        AttendanceFlagResponse(
+            student_id=flag.student_id,
+            student_name=student_name,
+            class_id=flag.class_id,
+            class_name=f"{class_name} {section or ''}".strip() if class_name else None,
+            as_of=flag.as_of,
+            absence_streak=flag.absence_streak,
+            window_days=flag.window_days,
+            window_marked=flag.window_marked,
+            window_absent=flag.window_absent,
+            absence_rate=flag.absence_rate,
+            streak_flagged=flag.streak_flagged,
+            rate_flagged=flag.rate_flagged
+        )
+        for flag, student_name, class_name, section in (await db.execute(query)).all()
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Absence streak and rate detection")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Flag students for one day")
+    run.add_argument("--date", type=date.fromisoformat, help="Day to check (default: today), e.g. 2024-11-15")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        with engine.begin() as conn:
+            summary = run_absence_check(conn, args.date)
+        print(f"{summary['as_of']}: {summary['flagged']} flagged "
+              f"({summary['streaks']} streaks, {summary['low_rates']} low rates)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
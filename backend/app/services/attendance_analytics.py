@@ -0,0 +1,151 @@
+"""
+Class-level attendance analytics.
+
+Two aggregate queries do the counting in SQL: status counts per class and
+day, and per student over the whole range. Everything else - daily rates,
+the class x month heatmap, the class x weekday pattern and the ranking of
+the lowest-attendance students - is derived from those frames with
+vectorized pandas operations, never by looping over students.
+
+The attendance rate counts late arrivals as attended: (present + late) /
+marked days, as a percentage.
+"""
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Attendance, AttendanceStatus, Class, DayOfWeek, Student
+
+STATUS_COLUMNS = {
+    "present": AttendanceStatus.PRESENT,
+    "absent": AttendanceStatus.ABSENT,
+    "late": AttendanceStatus.LATE,
+    "excused": AttendanceStatus.EXCUSED,
+}
+
+# Indexed by pandas dayofweek (Monday=0), using the timetable's day names
+WEEKDAY_NAMES = np.array([day.value for day in DayOfWeek] + ["sunday"])
+
+# Longest range one request may analyse
+MAX_RANGE_DAYS = 366
+
+# Students with fewer marked days are left out of the lowest-attendance ranking
+MIN_MARKED_DAYS = 3
+
+
+def _status_counts():
+    return [func.count(case((Attendance.status == status, 1))).label(name) for name, status in STATUS_COLUMNS.items()]
+
+
+async def _fetch_frame(db: AsyncSession, query) -> pd.DataFrame:
+    result = await db.execute(query)
+    return pd.DataFrame.from_records(result.all(), columns=list(result.keys()))
+
+
+def _with_rate(frame: pd.DataFrame) -> pd.DataFrame:
+    frame["marked"] = frame[list(STATUS_COLUMNS)].sum(axis=1)
+    attended = frame["present"] + frame["late"]
+    frame["attendance_rate"] = np.where(frame["marked"] > 0, attended / frame["marked"].clip(lower=1) * 100, np.nan).round(2)
+    return frame
+
+
+def _heatmap(frame: pd.DataFrame, column: str, columns: list, names: pd.Series) -> dict:
+    """Class x `column` matrix of attendance rates; cells without marks are null."""
+    totals = frame.groupby(["class_id", column])[list(STATUS_COLUMNS)].sum()
+    rates = _with_rate(totals)["attendance_rate"].unstack(column).reindex(columns=columns)
+    return {
+        "columns": [str(c) for c in columns],
+        "rows": [
+            {
+                "class_id": int(class_id),
+                "class_name": names[class_id],
+                "rates": [None if np.isnan(v) else float(v) for v in row],
+            }
+            for class_id, row in zip(rates.index, rates.to_numpy())
+        ],
+    }
+
+
+async def class_attendance_analytics(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    class_id: Optional[int] = None,
+    lowest: int = 10
+) -> dict:
+    """Attendance trends for [start, end], for one class or the whole school.
+
+    Raises ValueError for an empty or overlong range.
+    """
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f"Date range may span at most {MAX_RANGE_DAYS} days")
+
+    class_name = func.trim(Class.name + " " + func.coalesce(Class.section, ""))
+    in_range = [Attendance.date >= start, Attendance.date <= end]
+    if class_id:
+        in_range.append(Student.class_id == class_id)
+
+    daily = await _fetch_frame(db, (
+        select(Student.class_id, class_name.label("class_name"), Attendance.date, *_status_counts())
+        .join(Student, Student.id == Attendance.student_id)
+        .join(Class, Class.id == Student.class_id)
+        .where(*in_range)
+        .group_by(Student.class_id, Class.name, Class.section, Attendance.date)
+    ))
+    students = await _fetch_frame(db, (
+        select(
+            Student.id.label("student_id"), Student.name.label("student_name"),
+            Student.class_id, class_name.label("class_name"), *_status_counts()
+        )
+        .join(Student, Student.id == Attendance.student_id)
+        .join(Class, Class.id == Student.class_id)
+        .where(*in_range)
+        .group_by(Student.id, Student.name, Student.class_id, Class.name, Class.section)
+    ))
+
+    result = {
+        "start_date": start,
+        "end_date": end,
+        "classes": [],
+        "daily": [],
+        "monthly": {"columns": [], "rows": []},
+        "weekdays": {"columns": [], "rows": []},
+        "lowest_students": [],
+    }
+    if daily.empty:
+        return result
+
+    daily["date"] = pd.to_datetime(daily["date"])
+    daily = _with_rate(daily).sort_values(["class_id", "date"])
+    names = daily.drop_duplicates("class_id").set_index("class_id")["class_name"]
+
+    per_class = _with_rate(daily.groupby("class_id")[list(STATUS_COLUMNS)].sum())
+    result["classes"] = [
+        {"class_id": int(cid), "class_name": names[cid], "marked": int(row.marked), "attendance_rate": float(row.attendance_rate)}
+        for cid, row in per_class.sort_values("attendance_rate").iterrows()
+    ]
+
+    daily_out = daily[["class_id", "date", *STATUS_COLUMNS, "attendance_rate"]].copy()
+    daily_out["date"] = daily_out["date"].dt.date
+    result["daily"] = daily_out.to_dict("records")
+
+    daily["month"] = daily["date"].dt.to_period("M").astype(str)
+    months = pd.period_range(start, end, freq="M").astype(str).tolist()
+    result["monthly"] = _heatmap(daily, "month", months, names)
+
+    daily["weekday"] = WEEKDAY_NAMES[daily["date"].dt.dayofweek.to_numpy()]
+    weekdays = [day for day in WEEKDAY_NAMES.tolist() if day in set(daily["weekday"])]
+    result["weekdays"] = _heatmap(daily, "weekday", weekdays, names)
+
+    students = _with_rate(students)
+    ranked = students[students["marked"] >= MIN_MARKED_DAYS].nsmallest(lowest, ["attendance_rate", "marked"])
+    result["lowest_students"] = ranked[
+        ["student_id", "student_name", "class_id", "class_name", "marked", "attendance_rate"]
+    ].to_dict("records")
+    return result
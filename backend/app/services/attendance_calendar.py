@@ -0,0 +1,81 @@
+"""
+Compact attendance calendars.
+
+A student's academic year is packed into a string with one character per
+calendar day, starting on the first day of the year:
+
+    P present   A absent   L late   E excused   - not marked
+
+A full year is at most 366 bytes against tens of kilobytes for one JSON
+object per day, and a client reads day i as `days[i]`. Calendars are built
+from attendance with a single query for any number of students and packed
+with NumPy rather than per-day Python objects.
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.academic_year import academic_year_bounds
+from app.models import Attendance, AttendanceStatus
+from app.schemas import AttendanceSummary
+
+STATUS_CODES = {
+    AttendanceStatus.PRESENT: "P",
+    AttendanceStatus.ABSENT: "A",
+    AttendanceStatus.LATE: "L",
+    AttendanceStatus.EXCUSED: "E",
+}
+NOT_MARKED = "-"
+
+
+def calendar_span(start_year: int, through: Optional[date] = None) -> Tuple[date, int]:
+    """First day of the academic year and the number of days packed: the whole
+    year, cut short at `through` (default: today) for the year in progress."""
+    start, end = academic_year_bounds(start_year)
+    stop = min(end, (through or date.today()) + timedelta(days=1))
+    return start, max((stop - start).days, 0)
+
+
+async def attendance_calendars(
+    db: AsyncSession,
+    student_ids: List[int],
+    start_year: int,
+    through: Optional[date] = None
+) -> Dict[int, str]:
+    """Packed calendar string per student for one academic year."""
+    start, length = calendar_span(start_year, through)
+    grid = np.full((len(student_ids), length), ord(NOT_MARKED), dtype=np.uint8)
+
+    if student_ids and length:
+        rows = (await db.execute(select(Attendance.student_id, Attendance.date, Attendance.status).where(
+            Attendance.student_id.in_(student_ids),
+            Attendance.date >= start,
+            Attendance.date < start + timedelta(days=length)
+        ))).all()
+        if rows:
+            student_col, date_col, status_col = zip(*rows)
+            row_of = {student_id: i for i, student_id in enumerate(student_ids)}
+            offsets = (np.array(date_col, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+            grid[[row_of[s] for s in student_col], offsets] = [ord(STATUS_CODES[s]) for s in status_col]
+
+    return {student_id: grid[i].tobytes().decode("ascii") for i, student_id in enumerate(student_ids)}
+
+
+def calendar_summary(days: str) -> AttendanceSummary:
+    """Counts and percentage (present over marked days) read off a packed calendar."""
+    present = days.count(STATUS_CODES[AttendanceStatus.PRESENT])
+    absent = days.count(STATUS_CODES[AttendanceStatus.ABSENT])
+    late = days.count(STATUS_CODES[AttendanceStatus.LATE])
+    excused = days.count(STATUS_CODES[AttendanceStatus.EXCUSED])
+    total = present + absent + late + excused
+    return AttendanceSummary(
+        total_days=total,
+        present=present,
+        absent=absent,
+        late=late,
+        excused=excused,
+        percentage=round(present / total * 100, 2) if total > 0 else 0.0
+    )
@@ -0,0 +1,62 @@
+"""
+Bulk attendance marking.
+
+A whole submission is written with one INSERT ... ON CONFLICT (student_id,
+date) DO UPDATE statement against uq_attendance_student_date, instead of a
+SELECT followed by an INSERT or UPDATE per student. The conflict branch
+stamps updated_at, so RETURNING updated_at tells inserted rows (NULL) from
+updated ones on PostgreSQL and SQLite alike. The marked students'
+attendance_summary counters are refreshed in the same transaction.
+"""
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.academic_year import academic_year_of
+from app.core.database import upsert_insert
+from app.models import Attendance
+from app.schemas import AttendanceMark
+from app.services.attendance_summary import refresh_student_summaries
+
+
+async def upsert_attendance(
+    db: AsyncSession,
+    day: date,
+    records: Iterable[AttendanceMark],
+    marked_by: Optional[int] = None
+) -> Tuple[int, int]:
+    """Insert or update one day's attendance for many students; returns (inserted, updated).
+
+    A student listed more than once keeps the last record. `marked_by` is set
+    on inserted rows only, as before. The caller commits.
+    """
+    latest: Dict[int, AttendanceMark] = {record.student_id: record for record in records}
+    if not latest:
+        return 0, 0
+
+    insert = upsert_insert(db.bind.dialect.name, Attendance).values([
+        {
+            "student_id": record.student_id,
+            "date": day,
+            "status": record.status,
+            "remarks": record.remarks,
+            "marked_by": marked_by,
+        }
+        for record in latest.values()
+    ])
+    statement = insert.on_conflict_do_update(
+        index_elements=[Attendance.student_id, Attendance.date],
+        set_={
+            "status": insert.excluded.status,
+            "remarks": insert.excluded.remarks,
+            "updated_at": func.now(),
+        }
+    ).returning(Attendance.updated_at)
+
+    stamps = (await db.execute(statement)).scalars().all()
+    await refresh_student_summaries(db, latest.keys(), academic_year_of(day))
+
+    inserted = sum(1 for updated_at in stamps if updated_at is None)
+    return inserted, len(stamps) - inserted
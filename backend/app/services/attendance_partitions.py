@@ -0,0 +1,197 @@
+"""
+Attendance partition maintenance.
+
+On PostgreSQL the attendance table is range-partitioned on `date`, one
+partition per academic year (attendance_y2024 holds 2024-25), plus a
+default partition that catches rows outside every defined range.
+
+Usage:
+    cd backend
+    python -m app.services.attendance_partitions list
+    python -m app.services.attendance_partitions ensure
+    python -m app.services.attendance_partitions archive --before 2022-23 --output-dir archives [--drop]
+
+`ensure` runs on every startup too. `archive` exports each partition older
+than the given academic year to a gzipped CSV, then detaches it (and drops
+it with --drop).
+"""
+import argparse
+import gzip
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.academic_year import (
+    academic_year_bounds, academic_year_label, current_academic_year, parse_academic_year
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "attendance"
+PARTITION_PREFIX = "attendance_y"
+DEFAULT_PARTITION = "attendance_default"
+
+
+def partition_name(start_year: int) -> str:
+    return f"{PARTITION_PREFIX}{start_year}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table)"
+    ), {"table": PARENT_TABLE}))
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    """Names of the partitions currently attached to the attendance table."""
+    return list(conn.scalars(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :table ORDER BY child.relname"
+    ), {"table": PARENT_TABLE}))
+
+
+def partition_years(conn: Connection) -> List[int]:
+    suffixes = [name[len(PARTITION_PREFIX):] for name in list_partitions(conn) if name.startswith(PARTITION_PREFIX)]
+    return sorted(int(suffix) for suffix in suffixes if suffix.isdigit())
+
+
+def create_default_partition(conn: Connection) -> None:
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"
+    ))
+
+
+def create_partition(conn: Connection, start_year: int) -> bool:
+    """Create the partition for one academic year; returns False if it already exists.
+
+    Rows for that year already sitting in the default partition are moved
+    into the new partition before it is attached.
+    """
+    name = partition_name(start_year)
+    if name in list_partitions(conn):
+        return False
+
+    start, end = academic_year_bounds(start_year)
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    range_filter = {"start": start, "end": end}
+
+    stranded = 0
+    if DEFAULT_PARTITION in list_partitions(conn):
+        stranded = conn.scalar(text(
+            f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"
+        ), range_filter)
+
+    if stranded:
+        conn.execute(text(
+            f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        conn.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), range_filter)
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} {bounds}"))
+        logger.info(f"Created attendance partition {name}, moved {stranded} rows from {DEFAULT_PARTITION}")
+    else:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} {bounds}"))
+        logger.info(f"Created attendance partition {name}")
+    return True
+
+
+def ensure_partitions(conn: Connection, from_year: Optional[int] = None) -> List[str]:
+    """Make sure partitions exist from `from_year` (default: current) through
+    ATTENDANCE_PARTITIONS_AHEAD academic years ahead. Returns the ones created."""
+    if not is_partitioned(conn):
+        return []
+    current = current_academic_year()
+    first = current if from_year is None else min(from_year, current)
+    created = []
+    for year in range(first, current + settings.ATTENDANCE_PARTITIONS_AHEAD + 1):
+        if create_partition(conn, year):
+            created.append(partition_name(year))
+    return created
+
+
+def ensure_attendance_partitions(engine: Engine) -> List[str]:
+    """Startup hook: create the current and upcoming academic-year partitions."""
+    with engine.begin() as conn:
+        return ensure_partitions(conn)
+
+
+def archive_partition(conn: Connection, start_year: int, output_dir: Path, drop: bool = False) -> Path:
+    """Export one academic year's partition to CSV, then detach (and optionally drop) it."""
+    name = partition_name(start_year)
+    if name not in list_partitions(conn):
+        raise ValueError(f"No attached partition {name}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"attendance_{academic_year_label(start_year)}.csv.gz"
+
+    cursor = conn.connection.cursor()
+    try:
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as fh:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH CSV HEADER", fh)
+    finally:
+        cursor.close()
+
+    conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    if drop:
+        conn.execute(text(f"DROP TABLE {name}"))
+    logger.info(f"Archived {name} to {path}{' and dropped it' if drop else ' (table kept, detached)'}")
+    return path
+
+
+def archive_before(engine: Engine, before_year: int, output_dir: Path, drop: bool = False) -> List[Path]:
+    """Archive every academic-year partition older than `before_year`."""
+    archived = []
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            raise RuntimeError("attendance is not a partitioned table (PostgreSQL with migration 0003 required)")
+        years = [year for year in partition_years(conn) if year < before_year]
+
+    for year in years:
+        # One transaction per partition, so a failure leaves earlier archives intact
+        with engine.begin() as conn:
+            archived.append(archive_partition(conn, year, output_dir, drop=drop))
+    return archived
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Attendance partition maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List attached partitions")
+    commands.add_parser("ensure", help="Create current and upcoming academic-year partitions")
+    archive = commands.add_parser("archive", help="Export and detach old academic-year partitions")
+    archive.add_argument("--before", required=True, help="Archive academic years before this one, e.g. 2022-23")
+    archive.add_argument("--output-dir", default="archives", help="Directory for the CSV exports")
+    archive.add_argument("--drop", action="store_true", help="Drop partitions after exporting them")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        with engine.connect() as conn:
+            for name in list_partitions(conn):
+                print(name)
+    elif args.command == "ensure":
+        created = ensure_attendance_partitions(engine)
+        print(f"Created: {', '.join(created) if created else 'nothing, partitions up to date'}")
+    elif args.command == "archive":
+        paths = archive_before(engine, parse_academic_year(args.before), Path(args.output_dir), drop=args.drop)
+        for path in paths:
+            print(f"Archived {path}")
+        if not paths:
+            print("No partitions to archive")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
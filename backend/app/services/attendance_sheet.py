@@ -0,0 +1,148 @@
+"""
+Class attendance sheets.
+
+The roster of a class is LEFT JOINed against its attendance rows for a date
+or a date range in a single query. Per-date status counts come from window
+aggregates in the same statement, so a sheet costs one query however large
+the class is or however many days the range spans.
+"""
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Attendance, AttendanceStatus, Student
+from app.schemas import (
+    AttendanceDayCount, ClassAttendanceRegister, ClassAttendanceResponse,
+    StudentAttendanceRecord, StudentAttendanceRow
+)
+
+# Longest range a register may cover
+MAX_REGISTER_DAYS = 62
+
+COUNTED_STATUSES = [
+    AttendanceStatus.PRESENT, AttendanceStatus.ABSENT, AttendanceStatus.LATE, AttendanceStatus.EXCUSED
+]
+
+
+def _status_count(status: AttendanceStatus):
+    return func.count(case((Attendance.status == status, 1))).over(partition_by=Attendance.date)
+
+
+async def _roster_attendance(db: AsyncSession, class_id: int, start: date, end: date) -> list:
+    """One row per student and marked date in [start, end]; students with no
+    marks in the range get a single row with a NULL date."""
+    query = (
+        select(
+            Student.id, Student.name, Student.roll_no,
+            Attendance.date, Attendance.status, Attendance.remarks,
+            *(_status_count(status).label(status.value) for status in COUNTED_STATUSES)
+        )
+        .outerjoin(Attendance, and_(
+            Attendance.student_id == Student.id,
+            Attendance.date >= start,
+            Attendance.date <= end
+        ))
+        .where(Student.class_id == class_id)
+        .order_by(Student.roll_no, Student.id, Attendance.date)
+    )
+    return (await db.execute(query)).all()
+
+
+def _day_counts(rows: list, total_students: int) -> Dict[date, AttendanceDayCount]:
+    counts = {}
+    for row in rows:
+        if row.date is None or row.date in counts:
+            continue
+        marked = {status: getattr(row, status.value) for status in COUNTED_STATUSES}
+        counts[row.date] = AttendanceDayCount(
+            date=row.date,
+            present=marked[AttendanceStatus.PRESENT],
+            absent=marked[AttendanceStatus.ABSENT],
+            late=marked[AttendanceStatus.LATE],
+            excused=marked[AttendanceStatus.EXCUSED],
+            not_marked=total_students - sum(marked.values())
+        )
+    return counts
+
+
+async def class_attendance_for_date(
+    db: AsyncSession,
+    class_id: int,
+    class_name: str,
+    day: date,
+    count_unmarked_as_absent: bool = False
+) -> ClassAttendanceResponse:
+    """Attendance sheet of a class for one day; unmarked students are listed as absent."""
+    rows = await _roster_attendance(db, class_id, day, day)
+    day_count = _day_counts(rows, len(rows)).get(day) or AttendanceDayCount(date=day, not_marked=len(rows))
+
+    records = [
+        StudentAttendanceRecord(
+            student_id=row.id,
+            student_name=row.name,
+            roll_no=row.roll_no,
+            status=row.status or AttendanceStatus.ABSENT,
+            remarks=row.remarks
+        )
+        for row in rows
+    ]
+
+    absent = day_count.absent + (day_count.not_marked if count_unmarked_as_absent else 0)
+    return ClassAttendanceResponse(
+        date=day,
+        class_id=class_id,
+        class_name=class_name,
+        total_students=len(rows),
+        present=day_count.present,
+        absent=absent,
+        late=day_count.late,
+        not_marked=day_count.not_marked,
+        records=records
+    )
+
+
+async def class_attendance_register(
+    db: AsyncSession,
+    class_id: int,
+    class_name: str,
+    start: date,
+    end: date
+) -> ClassAttendanceRegister:
+    """Attendance grid of a class over [start, end], e.g. the weekly register.
+
+    Raises ValueError for an empty or overlong range.
+    """
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    if (end - start).days + 1 > MAX_REGISTER_DAYS:
+        raise ValueError(f"Date range may span at most {MAX_REGISTER_DAYS} days")
+
+    rows = await _roster_attendance(db, class_id, start, end)
+
+    students: Dict[int, StudentAttendanceRow] = {}
+    for row in rows:
+        student = students.get(row.id)
+        if student is None:
+            student = students[row.id] = StudentAttendanceRow(
+                student_id=row.id, student_name=row.name, roll_no=row.roll_no
+            )
+        if row.date is not None:
+            student.statuses[row.date] = row.status
+
+    counts = _day_counts(rows, len(students))
+    days: List[AttendanceDayCount] = []
+    day = start
+    while day <= end:
+        days.append(counts.get(day) or AttendanceDayCount(date=day, not_marked=len(students)))
+        day += timedelta(days=1)
+
+    return ClassAttendanceRegister(
+        class_id=class_id,
+        class_name=class_name,
+        start_date=start,
+        end_date=end,
+        days=days,
+        students=list(students.values())
+    )
@@ -0,0 +1,132 @@
+"""
+Per-student attendance counters.
+
+attendance_summary holds present/absent/late/excused counts per student and
+academic year, so dashboards read one row instead of counting a student's
+whole attendance history. Counters are recomputed from attendance for the
+students touched by a marking, inside the marking transaction, with one
+INSERT ... SELECT ... GROUP BY ... ON CONFLICT DO UPDATE statement.
+
+Usage:
+    cd backend
+    python -m app.services.attendance_summary backfill
+    python -m app.services.attendance_summary backfill --academic-year 2024-25
+
+`backfill` rebuilds the counters from scratch, for every academic year that
+has attendance or just the one given.
+"""
+import argparse
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete, func, literal, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.academic_year import (
+    academic_year_bounds, academic_year_label, academic_year_of, current_academic_year, parse_academic_year
+)
+from app.core.database import upsert_insert
+from app.models import Attendance, AttendanceStatus, StudentAttendanceSummary
+
+logger = logging.getLogger(__name__)
+
+COUNTER_COLUMNS = {
+    "present": AttendanceStatus.PRESENT,
+    "absent": AttendanceStatus.ABSENT,
+    "late": AttendanceStatus.LATE,
+    "excused": AttendanceStatus.EXCUSED,
+}
+
+
+def refresh_statement(dialect_name: str, start_year: int, student_ids: Optional[Iterable[int]] = None):
+    """Recount one academic year's attendance into attendance_summary,
+    for the given students or for everyone."""
+    start, end = academic_year_bounds(start_year)
+    counts = (
+        select(
+            Attendance.student_id,
+            literal(academic_year_label(start_year)),
+            *(func.count(case((Attendance.status == status, 1))) for status in COUNTER_COLUMNS.values())
+        )
+        .where(Attendance.date >= start, Attendance.date < end)
+        .group_by(Attendance.student_id)
+    )
+    if student_ids is not None:
+        counts = counts.where(Attendance.student_id.in_(list(student_ids)))
+
+    insert = upsert_insert(dialect_name, StudentAttendanceSummary).from_select(
+        ["student_id", "academic_year", *COUNTER_COLUMNS], counts
+    )
+    return insert.on_conflict_do_update(
+        index_elements=[StudentAttendanceSummary.student_id, StudentAttendanceSummary.academic_year],
+        set_={
+            **{column: insert.excluded[column] for column in COUNTER_COLUMNS},
+            "updated_at": func.now(),
+        }
+    )
+
+
+async def refresh_student_summaries(db: AsyncSession, student_ids: Iterable[int], start_year: int) -> None:
+    """Bring the counters of `student_ids` for one academic year up to date; the caller commits."""
+    await db.execute(refresh_statement(db.bind.dialect.name, start_year, student_ids))
+
+
+def attendance_percentage(present: int, absent: int, late: int, excused: int) -> float:
+    """Present days as a percentage of marked days."""
+    total = present + absent + late + excused
+    return (present / total * 100) if total > 0 else 0.0
+
+
+async def attendance_percentages(db: AsyncSession, student_ids: List[int], start_year: Optional[int] = None) -> Dict[int, float]:
+    """Present days as a percentage of marked days, per student, for one
+    academic year (default: current). Students without attendance get 0."""
+    if start_year is None:
+        start_year = current_academic_year()
+    summaries = (await db.scalars(select(StudentAttendanceSummary).where(
+        StudentAttendanceSummary.student_id.in_(student_ids),
+        StudentAttendanceSummary.academic_year == academic_year_label(start_year)
+    ))).all()
+
+    percentages = {student_id: 0.0 for student_id in student_ids}
+    for s in summaries:
+        percentages[s.student_id] = attendance_percentage(s.present, s.absent, s.late, s.excused)
+    return percentages
+
+
+def backfill(conn: Connection, start_year: Optional[int] = None) -> List[str]:
+    """Rebuild the counters for one academic year, or for every year with
+    attendance. Returns the academic years rebuilt."""
+    if start_year is not None:
+        years = [start_year]
+    else:
+        first, last = conn.execute(select(func.min(Attendance.date), func.max(Attendance.date))).one()
+        years = list(range(academic_year_of(first), academic_year_of(last) + 1)) if first else []
+
+    for year in years:
+        label = academic_year_label(year)
+        conn.execute(delete(StudentAttendanceSummary).where(StudentAttendanceSummary.academic_year == label))
+        conn.execute(refresh_statement(conn.dialect.name, year))
+        logger.info(f"Rebuilt attendance summary for {label}")
+    return [academic_year_label(year) for year in years]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Attendance summary maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser("backfill", help="Rebuild attendance counters from attendance records")
+    rebuild.add_argument("--academic-year", help="Only this academic year, e.g. 2024-25")
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        start_year = parse_academic_year(args.academic_year) if args.academic_year else None
+        with engine.begin() as conn:
+            years = backfill(conn, start_year)
+        print(f"Rebuilt: {', '.join(years) if years else 'nothing, no attendance recorded'}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,263 @@
+"""
+Offline-first attendance sync for teachers.
+
+A teacher's device queues attendance changes while offline and sends them
+in one request, each with an idempotency key and the client time of the
+change. One sync:
+
+1. replays the stored outcome of keys already handled, so a retried
+   request never applies a change twice;
+2. drops changes for students outside the teacher's classes, and keeps only
+   the latest change per student and day within the batch;
+3. locks the affected attendance rows and resolves conflicts against them:
+   - last_writer_wins: a change applies unless the row was last written
+     after the client change was made (client times in the future count
+     as now);
+   - server_wins: a change applies unless the row was written on the
+     server since the client's last sync, e.g. corrected by an admin;
+4. writes the accepted changes with one upsert per day, records the keys,
+   and returns every row of the teacher's classes from the last
+   ATTENDANCE_SYNC_DAYS that changed since the client's sync token, with a
+   new token - all in one transaction.
+
+Sync tokens carry the database time at which the sync read the server
+state. Deltas reach back ATTENDANCE_SYNC_OVERLAP_SECONDS further so rows
+committed by transactions still in flight at that moment are not missed;
+the client may see such rows twice.
+
+Usage (schedule daily):
+    cd backend
+    python -m app.services.attendance_sync purge
+"""
+import argparse
+import base64
+import binascii
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import delete, func, or_, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import upsert_insert
+from app.models import Attendance, AttendanceSyncOp, Class, Student, teacher_classes
+from app.schemas import (
+    AttendanceChange, AttendanceChangeResult, AttendanceMark, AttendanceSyncResponse,
+    AttendanceSyncRow, SyncConflictPolicy
+)
+from app.services.attendance_marking import upsert_attendance
+
+logger = logging.getLogger(__name__)
+
+APPLIED = "applied"
+CONFLICT = "conflict"  # the server's version was kept
+SUPERSEDED = "superseded"  # a later change in the same batch replaced it
+REJECTED = "rejected"  # student unknown or not in the teacher's classes
+
+
+def _utc(moment: datetime) -> datetime:
+    """Aware UTC datetime; naive values (SQLite timestamps) are UTC already."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def encode_sync_token(moment: datetime) -> str:
+    payload = json.dumps({"t": _utc(moment).isoformat()})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> datetime:
+    """Raises ValueError for a malformed token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        return _utc(datetime.fromisoformat(json.loads(raw)["t"]))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid sync token")
+
+
+async def teacher_class_ids(db: AsyncSession, teacher_id: int) -> Set[int]:
+    """Classes the teacher teaches in or is class teacher of."""
+    taught = select(teacher_classes.c.class_id).where(teacher_classes.c.teacher_id == teacher_id)
+    return set((await db.scalars(
+        select(Class.id).where(or_(Class.class_teacher_id == teacher_id, Class.id.in_(taught)))
+    )).all())
+
+
+async def _last_written(db: AsyncSession, cells: List[tuple]) -> Dict[tuple, datetime]:
+    """Last write time of the existing attendance rows among (student_id, date)
+    cells, locked until the sync commits."""
+    days = [day for _, day in cells]
+    rows = (await db.execute(
+        select(Attendance.student_id, Attendance.date, func.coalesce(Attendance.updated_at, Attendance.created_at))
+        .where(
+            tuple_(Attendance.student_id, Attendance.date).in_(cells),
+            Attendance.date >= min(days),
+            Attendance.date <= max(days)
+        )
+        .with_for_update()
+    )).all()
+    return {(student_id, day): _utc(written) for student_id, day, written in rows}
+
+
+async def _apply_changes(
+    db: AsyncSession,
+    teacher_id: int,
+    class_ids: Set[int],
+    changes: List[AttendanceChange],
+    policy: SyncConflictPolicy,
+    since: Optional[datetime],
+    server_now: datetime
+) -> Dict[str, str]:
+    """Resolve and write new changes; returns the outcome per idempotency key."""
+    outcomes: Dict[str, str] = {}
+    allowed = set((await db.scalars(select(Student.id).where(
+        Student.id.in_({change.student_id for change in changes}),
+        Student.class_id.in_(class_ids)
+    ))).all()) if class_ids else set()
+
+    latest: Dict[tuple, AttendanceChange] = {}
+    for change in sorted(changes, key=lambda c: _utc(c.changed_at)):
+        if change.student_id not in allowed:
+            outcomes[change.idempotency_key] = REJECTED
+            continue
+        cell = (change.student_id, change.date)
+        if cell in latest:
+            outcomes[latest[cell].idempotency_key] = SUPERSEDED
+        latest[cell] = change
+
+    if latest:
+        last_written = await _last_written(db, list(latest))
+        accepted = defaultdict(list)
+        for cell, change in latest.items():
+            written = last_written.get(cell)
+            if written is None:
+                wins = True
+            elif policy == SyncConflictPolicy.SERVER_WINS:
+                wins = since is not None and written <= since
+            else:
+                wins = min(_utc(change.changed_at), server_now) >= written
+            outcomes[change.idempotency_key] = APPLIED if wins else CONFLICT
+            if wins:
+                accepted[change.date].append(
+                    AttendanceMark(student_id=change.student_id, status=change.status, remarks=change.remarks)
+                )
+
+        for day, marks in accepted.items():
+            await upsert_attendance(db, day, marks, marked_by=teacher_id)
+
+    by_key = {change.idempotency_key: change for change in changes}
+    await db.execute(
+        upsert_insert(db.bind.dialect.name, AttendanceSyncOp).values([
+            {
+                "teacher_id": teacher_id,
+                "idempotency_key": key,
+                "student_id": by_key[key].student_id,
+                "date": by_key[key].date,
+                "outcome": outcome,
+            }
+            for key, outcome in outcomes.items()
+        ]).on_conflict_do_nothing(index_elements=[AttendanceSyncOp.teacher_id, AttendanceSyncOp.idempotency_key])
+    )
+    return outcomes
+
+
+async def _delta(db: AsyncSession, class_ids: Set[int], since: Optional[datetime]) -> List[AttendanceSyncRow]:
+    if not class_ids:
+        return []
+    written = func.coalesce(Attendance.updated_at, Attendance.created_at)
+    query = (
+        select(Attendance.student_id, Attendance.date, Attendance.status, Attendance.remarks, written)
+        .join(Student, Student.id == Attendance.student_id)
+        .where(
+            Student.class_id.in_(class_ids),
+            Attendance.date >= date.today() - timedelta(days=settings.ATTENDANCE_SYNC_DAYS)
+        )
+        .order_by(Attendance.date, Attendance.student_id)
+    )
+    if since is not None:
+        query = query.where(written > since - timedelta(seconds=settings.ATTENDANCE_SYNC_OVERLAP_SECONDS))
+
+    return [
+        AttendanceSyncRow(student_id=student_id, date=day, status=status, remarks=remarks,
+                          changed_at=_utc(changed_at) if changed_at else None)
+        for student_id, day, status, remarks, changed_at in (await db.execute(query)).all()
+    ]
+
+
+async def sync_attendance(
+    db: AsyncSession,
+    teacher_id: int,
+    changes: List[AttendanceChange],
+    sync_token: Optional[str] = None,
+    policy: SyncConflictPolicy = SyncConflictPolicy.LAST_WRITER_WINS
+) -> AttendanceSyncResponse:
+    """Apply a teacher's queued changes and return the server delta; the caller commits.
+
+    Raises ValueError for a malformed sync token.
+    """
+    since = decode_sync_token(sync_token) if sync_token else None
+    server_now = _utc(await db.scalar(select(func.now())))
+    class_ids = await teacher_class_ids(db, teacher_id)
+
+    # The first occurrence of a key counts; retries get the stored outcome
+    unique: Dict[str, AttendanceChange] = {}
+    for change in changes:
+        unique.setdefault(change.idempotency_key, change)
+    replayed = dict((await db.execute(
+        select(AttendanceSyncOp.idempotency_key, AttendanceSyncOp.outcome).where(
+            AttendanceSyncOp.teacher_id == teacher_id,
+            AttendanceSyncOp.idempotency_key.in_(list(unique))
+        )
+    )).all()) if unique else {}
+
+    fresh = [change for key, change in unique.items() if key not in replayed]
+    outcomes = await _apply_changes(db, teacher_id, class_ids, fresh, policy, since, server_now) if fresh else {}
+
+    results = [
+        AttendanceChangeResult(idempotency_key=key, outcome=replayed[key], replayed=True) if key in replayed
+        else AttendanceChangeResult(idempotency_key=key, outcome=outcomes[key])
+        for key in unique
+    ]
+    applied = sum(1 for outcome in outcomes.values() if outcome == APPLIED)
+    if fresh:
+        logger.info(f"Attendance sync for teacher {teacher_id}: {applied} of {len(fresh)} changes applied")
+
+    return AttendanceSyncResponse(
+        sync_token=encode_sync_token(server_now),
+        results=results,
+        changes=await _delta(db, class_ids, since)
+    )
+
+
+def purge_sync_keys(conn: Connection, older_than_days: Optional[int] = None) -> int:
+    """Delete idempotency keys past their retention; returns the number deleted."""
+    days = settings.ATTENDANCE_SYNC_KEY_RETENTION_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    result = conn.execute(delete(AttendanceSyncOp).where(AttendanceSyncOp.created_at < cutoff))
+    logger.info(f"Purged {result.rowcount} attendance sync keys older than {days} days")
+    return result.rowcount
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Offline attendance sync maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    purge = commands.add_parser("purge", help="Delete old idempotency keys")
+    purge.add_argument("--days", type=int, help="Retention in days (default: ATTENDANCE_SYNC_KEY_RETENTION_DAYS)")
+    args = parser.parse_args(argv)
+
+    if args.command == "purge":
+        with engine.begin() as conn:
+            deleted = purge_sync_keys(conn, args.days)
+        print(f"Purged {deleted} sync keys")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
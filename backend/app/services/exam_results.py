@@ -0,0 +1,125 @@
+"""
+Exam results with names, max marks and totals.
+
+Result rows are joined in one query to the student and subject, and
+to the exam schedule of the student's class for that subject, which holds
+the max marks. Totals and percentages per student come from a GROUP BY,
+so no view issues a query per row or subject. Parents and students read
+published results instead (app.services.result_publication).
+
+A subject without a schedule for the student's class counts as out of
+DEFAULT_MAX_MARKS in totals, and a missing mark as 0.
+"""
+from typing import List, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Class, ExamResult, ExamSchedule, Student, Subject
+from app.schemas import ExamResultResponse, StudentExamTotal
+
+DEFAULT_MAX_MARKS = 100
+
+
+def schedule_marks():
+    """Max and passing marks per exam, class and subject (one row even if a
+    subject was scheduled twice)."""
+    return (
+        select(
+            ExamSchedule.exam_id, ExamSchedule.class_id, ExamSchedule.subject_id,
+            func.max(ExamSchedule.max_marks).label("max_marks"),
+            func.max(ExamSchedule.passing_marks).label("passing_marks")
+        )
+        .group_by(ExamSchedule.exam_id, ExamSchedule.class_id, ExamSchedule.subject_id)
+        .subquery()
+    )
+
+
+def _schedule_of_result(schedules):
+    return and_(
+        schedules.c.exam_id == ExamResult.exam_id,
+        schedules.c.subject_id == ExamResult.subject_id,
+        schedules.c.class_id == Student.class_id
+    )
+
+
+def percentage(obtained: float, total: float) -> float:
+    return round(obtained / total * 100, 2) if total > 0 else 0.0
+
+
+async def exam_results(
+    db: AsyncSession,
+    exam_id: int,
+    class_id: Optional[int] = None,
+    subject_id: Optional[int] = None
+) -> List[ExamResultResponse]:
+    """Every result of one exam with student and subject names and max marks."""
+    schedules = schedule_marks()
+    query = (
+        select(ExamResult, Student.name, Subject.name, schedules.c.max_marks)
+        .join(Student, Student.id == ExamResult.student_id)
+        .outerjoin(Subject, Subject.id == ExamResult.subject_id)
+        .outerjoin(schedules, _schedule_of_result(schedules))
+        .where(ExamResult.exam_id == exam_id)
+        .order_by(ExamResult.id)
+    )
+    if class_id:
+        query = query.where(Student.class_id == class_id)
+    if subject_id:
+        query = query.where(ExamResult.subject_id == subject_id)
+
+    return [
+        ExamResultResponse(
+            id=r.id,
+            exam_id=r.exam_id,
+            student_id=r.student_id,
+            subject_id=r.subject_id,
+            marks_obtained=r.marks_obtained,
+            grade=r.grade,
+            remarks=r.remarks,
+            student_name=student_name,
+            subject_name=subject_name,
+            max_marks=max_marks,
+            created_at=r.created_at
+        )
+        for r, student_name, subject_name, max_marks in (await db.execute(query)).all()
+    ]
+
+
+async def exam_totals(db: AsyncSession, exam_id: int, class_id: Optional[int] = None) -> List[StudentExamTotal]:
+    """Marks obtained, marks possible and percentage per student for one exam."""
+    schedules = schedule_marks()
+    obtained = func.sum(func.coalesce(ExamResult.marks_obtained, 0))
+    total = func.sum(func.coalesce(schedules.c.max_marks, DEFAULT_MAX_MARKS))
+    query = (
+        select(
+            Student.id, Student.name, Student.roll_no, Student.class_id,
+            Class.name.label("class_name"), Class.section,
+            func.count().label("subjects"), obtained.label("obtained"), total.label("total")
+        )
+        .select_from(ExamResult)
+        .join(Student, Student.id == ExamResult.student_id)
+        .outerjoin(Class, Class.id == Student.class_id)
+        .outerjoin(schedules, _schedule_of_result(schedules))
+        .where(ExamResult.exam_id == exam_id)
+        .group_by(Student.id, Student.name, Student.roll_no, Student.class_id, Class.name, Class.section)
+        .order_by(Student.class_id, Student.roll_no, Student.id)
+    )
+    if class_id:
+        query = query.where(Student.class_id == class_id)
+
+    return [
+        StudentExamTotal(
+            student_id=row.id,
+            student_name=row.name,
+            roll_no=row.roll_no,
+            class_id=row.class_id,
+            class_name=f"{row.class_name} {row.section or ''}".strip() if row.class_name else None,
+            subjects=row.subjects,
+            obtained_marks=float(row.obtained),
+            total_marks=float(row.total),
+            percentage=percentage(float(row.obtained), float(row.total))
+        )
+        for row in (await db.execute(query)).all()
+    ]
+
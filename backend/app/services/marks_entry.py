@@ -0,0 +1,117 @@
+"""
+Set-based marks entry.
+
+A marks submission for one exam and subject is handled as a whole:
+
+1. one query reads every listed student's class with the max marks of that
+   class's schedule for the subject;
+2. the batch is validated in one vectorized pass - unknown students,
+   negative marks and marks above the schedule's max marks (unchecked when
+   the class has no schedule) - and rejected as a whole before anything is
+   written;
+3. grades the submission leaves empty are derived from the percentage with
+   the REPORT_CARD_GRADES boundaries (out of DEFAULT_MAX_MARKS when
+   unscheduled);
+4. all rows are written with one INSERT ... ON CONFLICT (exam_id,
+   student_id, subject_id) DO UPDATE against
+   uq_exam_results_exam_student_subject.
+
+A student listed more than once keeps the last entry.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import upsert_insert
+from app.models import ExamResult, Student
+from app.schemas import StudentMarkEntry
+from app.services.exam_results import DEFAULT_MAX_MARKS, schedule_marks
+from app.services.report_cards import assign_grades, grade_scale
+
+
+class MarksEntryError(ValueError):
+    """A marks submission failed validation; `errors` lists every problem."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+async def upsert_marks(
+    db: AsyncSession,
+    exam_id: int,
+    subject_id: int,
+    entries: Iterable[StudentMarkEntry],
+    entered_by: Optional[int] = None
+) -> Tuple[int, int]:
+    """Validate and write one subject's marks for many students; returns (inserted, updated).
+
+    `entered_by` is set on inserted rows only. The caller commits.
+
+    Raises MarksEntryError, with nothing written, if any entry is invalid.
+    """
+    latest: Dict[int, StudentMarkEntry] = {entry.student_id: entry for entry in entries}
+    if not latest:
+        return 0, 0
+
+    schedules = schedule_marks()
+    known = {
+        student_id: max_marks
+        for student_id, max_marks in (await db.execute(
+            select(Student.id, schedules.c.max_marks)
+            .outerjoin(schedules, and_(
+                schedules.c.exam_id == exam_id,
+                schedules.c.subject_id == subject_id,
+                schedules.c.class_id == Student.class_id
+            ))
+            .where(Student.id.in_(list(latest)))
+        )).all()
+    }
+
+    student_ids = np.array(list(latest))
+    marks = np.array([float(entry.marks_obtained) for entry in latest.values()])
+    max_marks = np.array([known.get(student_id) for student_id in latest], dtype=float)  # NaN: unscheduled
+    unknown = ~np.isin(student_ids, list(known))
+    negative = marks < 0
+    too_high = marks > max_marks
+
+    errors = [f"Student {student_id} not found" for student_id in student_ids[unknown]]
+    errors += [f"Marks cannot be negative for student {student_id}" for student_id in student_ids[negative]]
+    errors += [
+        f"Marks ({marks[i]:g}) cannot exceed max marks ({max_marks[i]:g}) for student {student_ids[i]}"
+        for i in np.flatnonzero(too_high)
+    ]
+    if errors:
+        raise MarksEntryError(errors)
+
+    out_of = np.where(np.isnan(max_marks), DEFAULT_MAX_MARKS, max_marks)
+    percentages = np.divide(marks * 100, out_of, out=np.zeros_like(marks), where=out_of > 0)
+    grades = assign_grades(percentages, grade_scale())
+
+    insert = upsert_insert(db.bind.dialect.name, ExamResult).values([
+        {
+            "exam_id": exam_id,
+            "student_id": entry.student_id,
+            "subject_id": subject_id,
+            "marks_obtained": entry.marks_obtained,
+            "grade": entry.grade or grade,
+            "remarks": entry.remarks,
+            "entered_by": entered_by,
+        }
+        for entry, grade in zip(latest.values(), grades)
+    ])
+    statement = insert.on_conflict_do_update(
+        index_elements=[ExamResult.exam_id, ExamResult.student_id, ExamResult.subject_id],
+        set_={
+            "marks_obtained": insert.excluded.marks_obtained,
+            "grade": insert.excluded.grade,
+            "remarks": insert.excluded.remarks,
+            "updated_at": func.now(),
+        }
+    ).returning(ExamResult.updated_at)
+
+    stamps = (await db.execute(statement)).scalars().all()
+    inserted = sum(1 for updated_at in stamps if updated_at is None)
+    return inserted, len(stamps) - inserted
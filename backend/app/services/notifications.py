@@ -204,6 +204,11 @@ class SMSNotificationService:
         message = f"SLNSVM: {student_name} was marked {status} today. -Sri Laxmi Narayan Saraswati Vidya Mandir"
         return await self.send_sms(phone, message)
 
+    async def send_result_sms(self, phone: str, student_name: str, exam_name: str) -> bool:
+        """Send result publication SMS."""
+        message = f"SLNSVM: {exam_name} results of {student_name} are published. View them on the parent portal. -Sri Laxmi Narayan Saraswati Vidya Mandir"
+        return await self.send_sms(phone, message)
+
     async def send_otp_sms(self, phone: str, otp: str) -> bool:
         """Send OTP SMS."""
         message = f"SLNSVM: Your OTP is {otp}. Valid for 10 minutes. Do not share. -Sri Laxmi Narayan Saraswati Vidya Mandir"
@@ -263,6 +268,28 @@ class NotificationService:
 
         return results
 
+    async def send_result_notification(
+        self,
+        email: Optional[str],
+        phone: Optional[str],
+        student_name: str,
+        exam_name: str
+    ) -> dict:
+        """Send result publication notice via email and SMS."""
+        results = {"email": False, "sms": False}
+
+        if email:
+            results["email"] = await self.email_service.send_result_notification(
+                email, student_name, exam_name
+            )
+
+        if phone:
+            results["sms"] = await self.sms_service.send_result_sms(
+                phone, student_name, exam_name
+            )
+
+        return results
+
     async def send_bulk_notification(
         self,
         recipients: List[dict],
@@ -0,0 +1,376 @@
+"""
+Report-card engine.
+
+For one exam and one class - all sections sharing the class name in the
+same academic year - every paper scheduled for each student's section is
+read once with the section's max and passing marks and the student's
+result, and the report cards are computed in pandas/NumPy:
+
+- per subject: percentage, grade, pass/fail against the schedule's passing
+  marks (REPORT_CARD_PASS_PERCENT of max marks when it sets none), and the
+  section's and class's toppers. A scheduled paper without a result counts
+  as absent: 0 marks, not passed, its marks left empty on the card;
+- per student: totals, percentage, grade, overall pass (every subject
+  passed), class rank across sections, section rank (tied percentages share
+  a rank) and percentile, the share of the class scoring at most the
+  student's percentage.
+
+Grades come from REPORT_CARD_GRADES, "grade:minimum percentage" pairs.
+The cards replace the exam's earlier snapshot for those sections in
+report_cards / report_card_subjects. All classes of an exam can be done at
+once, with the same single read, e.g. when publishing its results. Request
+handlers use the _async variants, which run the pandas work in a worker
+thread.
+
+Usage:
+    cd backend
+    python -m app.services.report_cards generate --exam 3 --class 12
+"""
+import argparse
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, insert, select, tuple_, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Class, Exam, ExamResult, ReportCard, ReportCardSubject, Student, Subject
+from app.schemas import ReportCardResponse, ReportCardSubjectResponse
+from app.services.exam_results import DEFAULT_MAX_MARKS, schedule_marks
+
+logger = logging.getLogger(__name__)
+
+CARD_COLUMNS = [
+    "exam_id", "student_id", "class_id", "subjects", "obtained_marks", "total_marks", "percentage", "grade",
+    "passed", "class_rank", "class_size", "section_rank", "section_size", "percentile",
+]
+SUBJECT_COLUMNS = [
+    "exam_id", "student_id", "class_id", "subject_id", "marks_obtained", "max_marks", "passing_marks",
+    "percentage", "grade", "passed", "is_section_topper", "is_class_topper",
+]
+
+
+def grade_scale(spec: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Minimum percentages (ascending) and their grades, parsed from a
+    "A1:91,A2:81,...,E:0" spec (default: REPORT_CARD_GRADES).
+
+    Raises ValueError for a malformed spec or one that does not start at 0.
+    """
+    pairs = []
+    for item in (spec or settings.REPORT_CARD_GRADES).split(","):
+        grade, _, minimum = item.strip().partition(":")
+        if not grade.strip() or not minimum.strip():
+            raise ValueError(f"Invalid grade boundary {item.strip()!r}, expected grade:minimum")
+        pairs.append((float(minimum), grade.strip()))
+    pairs.sort()
+    if pairs[0][0] > 0:
+        raise ValueError("The lowest grade boundary must be 0")
+    return np.array([minimum for minimum, _ in pairs]), np.array([grade for _, grade in pairs], dtype=object)
+
+
+def assign_grades(percentages, scale: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    minimums, grades = scale
+    return grades[np.searchsorted(minimums, np.asarray(percentages, dtype=float), side="right") - 1]
+
+
+def _records(frame: pd.DataFrame, columns: List[str]) -> List[dict]:
+    """Rows as dicts of plain Python values, NaN as None."""
+    frame = frame[columns].astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
+
+
+def compute_report_cards(results: pd.DataFrame, scale: Tuple[np.ndarray, np.ndarray]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Report cards and subject lines of one class from one row per student and
+    subject with student_id, class_id (the section), subject_id,
+    marks_obtained, max_marks, passing_marks."""
+    subjects = results.copy()
+    subjects["max_marks"] = subjects["max_marks"].fillna(DEFAULT_MAX_MARKS).astype(int)
+    default_pass = np.ceil(subjects["max_marks"] * settings.REPORT_CARD_PASS_PERCENT / 100)
+    subjects["passing_marks"] = subjects["passing_marks"].fillna(default_pass).astype(int)
+    subjects["marks_obtained"] = subjects["marks_obtained"].astype(float)
+    marks = subjects["marks_obtained"].fillna(0)
+    subjects["percentage"] = (marks / subjects["max_marks"] * 100).round(2)
+    subjects["grade"] = assign_grades(subjects["percentage"], scale)
+    subjects["passed"] = subjects["marks_obtained"].notna() & (marks >= subjects["passing_marks"])
+    subjects["is_section_topper"] = (marks > 0) & (
+        subjects["percentage"] == subjects.groupby(["class_id", "subject_id"])["percentage"].transform("max")
+    )
+    subjects["is_class_topper"] = (marks > 0) & (
+        subjects["percentage"] == subjects.groupby("subject_id")["percentage"].transform("max")
+    )
+
+    cards = (
+        subjects.assign(obtained=marks)
+        .groupby(["student_id", "class_id"], as_index=False)
+        .agg(
+            subjects=("subject_id", "size"),
+            obtained_marks=("obtained", "sum"),
+            total_marks=("max_marks", "sum"),
+            passed=("passed", "all"),
+        )
+    )
+    cards["percentage"] = np.where(
+        cards["total_marks"] > 0, cards["obtained_marks"] / cards["total_marks"].clip(lower=1) * 100, 0
+    ).round(2)
+    cards["grade"] = assign_grades(cards["percentage"], scale)
+    cards["class_rank"] = cards["percentage"].rank(method="min", ascending=False).astype(int)
+    cards["class_size"] = len(cards)
+    by_section = cards.groupby("class_id")["percentage"]
+    cards["section_rank"] = by_section.rank(method="min", ascending=False).astype(int)
+    cards["section_size"] = by_section.transform("size")
+    cards["percentile"] = (cards["percentage"].rank(method="max", pct=True) * 100).round(2)
+    return cards, subjects
+
+
+def _results_query(exam_id: int, *criteria):
+    """One row per student and paper of the exam matching `criteria`, with the
+    student's section, its class name and year, the section's max and passing
+    marks, and the marks - None where the student has no result for a paper
+    their section sits. Results for papers the section has no schedule for
+    are kept too. Only sections with at least one result take part, so a
+    section whose marks entry has not begun gets no cards."""
+    scheduled, unscheduled = schedule_marks(), schedule_marks()
+    sections = (
+        select(Student.class_id)
+        .join(ExamResult, ExamResult.student_id == Student.id)
+        .where(ExamResult.exam_id == exam_id)
+    )
+    return union_all(
+        select(
+            Student.id.label("student_id"), Student.class_id, Class.name.label("class_name"), Class.academic_year,
+            scheduled.c.subject_id, ExamResult.marks_obtained, scheduled.c.max_marks, scheduled.c.passing_marks
+        )
+        .select_from(scheduled)
+        .join(Student, Student.class_id == scheduled.c.class_id)
+        .join(Class, Class.id == Student.class_id)
+        .outerjoin(ExamResult, and_(
+            ExamResult.exam_id == scheduled.c.exam_id,
+            ExamResult.student_id == Student.id,
+            ExamResult.subject_id == scheduled.c.subject_id
+        ))
+        .where(scheduled.c.exam_id == exam_id, Student.class_id.in_(sections), *criteria),
+        select(
+            ExamResult.student_id, Student.class_id, Class.name.label("class_name"), Class.academic_year,
+            ExamResult.subject_id, ExamResult.marks_obtained, unscheduled.c.max_marks, unscheduled.c.passing_marks
+        )
+        .join(Student, Student.id == ExamResult.student_id)
+        .join(Class, Class.id == Student.class_id)
+        .outerjoin(unscheduled, and_(
+            unscheduled.c.exam_id == ExamResult.exam_id,
+            unscheduled.c.subject_id == ExamResult.subject_id,
+            unscheduled.c.class_id == Student.class_id
+        ))
+        .where(ExamResult.exam_id == exam_id, unscheduled.c.subject_id.is_(None), *criteria)
+    )
+
+
+def _frame(rows, columns) -> pd.DataFrame:
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def build_report_cards(exam_id: int, results: pd.DataFrame, scale: Tuple[np.ndarray, np.ndarray]) -> Tuple[List[dict], List[dict]]:
+    """Card and subject-line rows of every class in `results`, ranked within
+    the class. Pure computation, safe to run in a worker thread."""
+    if results.empty:
+        return [], []
+    computed = [
+        compute_report_cards(class_results, scale)
+        for _, class_results in results.groupby(["class_name", "academic_year"], sort=False)
+    ]
+    cards = pd.concat([cards for cards, _ in computed], ignore_index=True)
+    subjects = pd.concat([subjects for _, subjects in computed], ignore_index=True)
+    cards["exam_id"] = subjects["exam_id"] = exam_id
+    return _records(cards, CARD_COLUMNS), _records(subjects, SUBJECT_COLUMNS)
+
+
+def _replacement(exam_id: int, cards: List[dict], subjects: List[dict], section_ids: Optional[List[int]] = None) -> list:
+    """(statement, parameters) pairs replacing the stored cards of the exam,
+    or of its given sections."""
+    subject_criteria = [ReportCardSubject.exam_id == exam_id]
+    card_criteria = [ReportCard.exam_id == exam_id]
+    if section_ids is not None:
+        subject_criteria.append(ReportCardSubject.class_id.in_(section_ids))
+        card_criteria.append(ReportCard.class_id.in_(section_ids))
+    statements = [(delete(ReportCardSubject).where(*subject_criteria), None), (delete(ReportCard).where(*card_criteria), None)]
+    if cards:
+        statements += [(insert(ReportCard), cards), (insert(ReportCardSubject), subjects)]
+    return statements
+
+
+def _summary(exam_id: int, cards: List[dict], subjects: List[dict], scope: str) -> Dict:
+    passed = sum(card["passed"] for card in cards)
+    absent = sum(line["marks_obtained"] is None for line in subjects)
+    logger.info(f"Report cards for exam {exam_id}{scope}: {len(cards)} students, {passed} passed, {absent} papers absent")
+    return {"exam_id": exam_id, "students": len(cards), "passed": passed, "absent": absent}
+
+
+def _sections_query(class_name: str, academic_year: str):
+    return select(Class.id).where(Class.name == class_name, Class.academic_year == academic_year).order_by(Class.id)
+
+
+def generate_report_cards(conn: Connection, exam_id: int, class_id: int, grades: Optional[str] = None) -> Dict:
+    """Compute and store the report cards of every section of a class for an
+    exam, replacing earlier ones. The caller commits.
+
+    Raises ValueError for an unknown exam or class, or bad grade boundaries.
+    """
+    scale = grade_scale(grades)
+    if conn.execute(select(Exam.id).where(Exam.id == exam_id)).first() is None:
+        raise ValueError("Exam not found")
+    class_info = conn.execute(select(Class.name, Class.academic_year).where(Class.id == class_id)).first()
+    if class_info is None:
+        raise ValueError("Class not found")
+    section_ids = conn.execute(_sections_query(*class_info)).scalars().all()
+
+    result = conn.execute(_results_query(exam_id, Student.class_id.in_(section_ids)))
+    cards, subjects = build_report_cards(exam_id, _frame(result.all(), list(result.keys())), scale)
+    for statement, parameters in _replacement(exam_id, cards, subjects, section_ids):
+        conn.execute(statement, parameters)
+    return {**_summary(exam_id, cards, subjects, f", {class_info.name}"), "class_ids": section_ids}
+
+
+async def generate_report_cards_async(db: AsyncSession, exam_id: int, class_id: int, grades: Optional[str] = None) -> Dict:
+    """generate_report_cards for request handlers: queries run on the session
+    and the pandas work in a worker thread. The caller commits."""
+    scale = grade_scale(grades)
+    if await db.scalar(select(Exam.id).where(Exam.id == exam_id)) is None:
+        raise ValueError("Exam not found")
+    class_info = (await db.execute(select(Class.name, Class.academic_year).where(Class.id == class_id))).first()
+    if class_info is None:
+        raise ValueError("Class not found")
+    section_ids = (await db.scalars(_sections_query(*class_info))).all()
+
+    result = await db.execute(_results_query(exam_id, Student.class_id.in_(section_ids)))
+    rows, columns = result.all(), list(result.keys())
+    cards, subjects = await run_in_threadpool(lambda: build_report_cards(exam_id, _frame(rows, columns), scale))
+    for statement, parameters in _replacement(exam_id, cards, subjects, section_ids):
+        await db.execute(statement, parameters)
+    return {**_summary(exam_id, cards, subjects, f", {class_info.name}"), "class_ids": section_ids}
+
+
+def generate_exam_report_cards(conn: Connection, exam_id: int, grades: Optional[str] = None) -> Dict:
+    """Compute and store the report cards of every class with results for an
+    exam, replacing all earlier ones of the exam. The caller commits.
+
+    Raises ValueError for bad grade boundaries.
+    """
+    scale = grade_scale(grades)
+    result = conn.execute(_results_query(exam_id))
+    cards, subjects = build_report_cards(exam_id, _frame(result.all(), list(result.keys())), scale)
+    for statement, parameters in _replacement(exam_id, cards, subjects):
+        conn.execute(statement, parameters)
+    return _summary(exam_id, cards, subjects, "")
+
+
+async def generate_exam_report_cards_async(db: AsyncSession, exam_id: int, grades: Optional[str] = None) -> Dict:
+    """generate_exam_report_cards for request handlers, computing in a worker
+    thread. The caller commits."""
+    scale = grade_scale(grades)
+    result = await db.execute(_results_query(exam_id))
+    rows, columns = result.all(), list(result.keys())
+    cards, subjects = await run_in_threadpool(lambda: build_report_cards(exam_id, _frame(rows, columns), scale))
+    for statement, parameters in _replacement(exam_id, cards, subjects):
+        await db.execute(statement, parameters)
+    return _summary(exam_id, cards, subjects, "")
+
+
+async def report_cards(
+    db: AsyncSession,
+    exam_id: Optional[int] = None,
+    class_ids: Optional[List[int]] = None,
+    student_ids: Optional[List[int]] = None
+) -> List[ReportCardResponse]:
+    """Stored report cards, best first within each exam; two queries in all."""
+    query = (
+        select(ReportCard, Exam.name, Student.name, Student.roll_no, Class.name, Class.section)
+        .join(Exam, Exam.id == ReportCard.exam_id)
+        .join(Student, Student.id == ReportCard.student_id)
+        .outerjoin(Class, Class.id == ReportCard.class_id)
+        .order_by(ReportCard.exam_id, ReportCard.class_rank, Student.roll_no, ReportCard.student_id)
+    )
+    if exam_id is not None:
+        query = query.where(ReportCard.exam_id == exam_id)
+    if class_ids is not None:
+        query = query.where(ReportCard.class_id.in_(class_ids))
+    if student_ids is not None:
+        query = query.where(ReportCard.student_id.in_(student_ids))
+    cards = (await db.execute(query)).all()
+    if not cards:
+        return []
+
+    keys = [(card.exam_id, card.student_id) for card, *_ in cards]
+    lines: Dict[tuple, List[ReportCardSubjectResponse]] = {key: [] for key in keys}
+    subject_rows = (await db.execute(
+        select(ReportCardSubject, Subject.name)
+        .outerjoin(Subject, Subject.id == ReportCardSubject.subject_id)
+        .where(tuple_(ReportCardSubject.exam_id, ReportCardSubject.student_id).in_(keys))
+        .order_by(ReportCardSubject.subject_id)
+    )).all()
+    for line, subject_name in subject_rows:
+        lines[(line.exam_id, line.student_id)].append(ReportCardSubjectResponse(
+            subject_id=line.subject_id,
+            subject_name=subject_name,
+            marks_obtained=line.marks_obtained,
+            max_marks=line.max_marks,
+            passing_marks=line.passing_marks,
+            percentage=line.percentage,
+            grade=line.grade,
+            passed=line.passed,
+            is_section_topper=line.is_section_topper,
+            is_class_topper=line.is_class_topper,
+            absent=line.marks_obtained is None
+        ))
+
+    return [
+        ReportCardResponse(
+            exam_id=card.exam_id,
+            exam_name=exam_name,
+            student_id=card.student_id,
+            student_name=student_name,
+            roll_no=roll_no,
+            class_id=card.class_id,
+            class_name=f"{class_name} {section or ''}".strip() if class_name else None,
+            subjects=lines[(card.exam_id, card.student_id)],
+            obtained_marks=card.obtained_marks,
+            total_marks=card.total_marks,
+            percentage=card.percentage,
+            grade=card.grade,
+            passed=card.passed,
+            class_rank=card.class_rank,
+            class_size=card.class_size,
+            section_rank=card.section_rank,
+            section_size=card.section_size,
+            percentile=card.percentile,
+            generated_at=card.generated_at
+        )
+        for card, exam_name, student_name, roll_no, class_name, section in cards
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Report-card generation")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="Compute report cards for a class or a whole exam")
+    generate.add_argument("--exam", type=int, required=True, help="Exam id")
+    generate.add_argument("--class", dest="class_id", type=int, help="Id of any section of the class (default: every class)")
+    generate.add_argument("--grades", help="Grade boundaries, e.g. A:75,B:60,C:45,D:33,E:0 (default: REPORT_CARD_GRADES)")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        with engine.begin() as conn:
+            if args.class_id is None:
+                summary = generate_exam_report_cards(conn, args.exam, args.grades)
+            else:
+                summary = generate_report_cards(conn, args.exam, args.class_id, args.grades)
+        print(f"Exam {summary['exam_id']}: {summary['students']} report cards, {summary['passed']} passed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,439 @@
+"""
+Result publication.
+
+Exam results stay internal while teachers enter and correct marks. Publishing
+an exam:
+
+1. regenerates the report cards of every class with results for the exam
+   (app.services.report_cards) from one read of its results;
+2. freezes one denormalized report per student - subjects with marks,
+   grades and remarks, totals, ranks and percentile - into
+   published_results, replacing the previous publication, and bumps the
+   exam's publication version;
+3. queues a "results published" notification for each student's parent
+   with one INSERT ... SELECT into result_notifications (only on the first
+   publication of a student's result; corrections do not notify again).
+
+Parents and students only see published exams, read straight from the
+snapshot with an ETag built from the publication versions, so results day
+costs one indexed read per request and repeat visits are answered with 304
+Not Modified. Unpublishing drops the snapshot but keeps the publication
+row, marked withdrawn, so a corrected republish gets a new version and
+ETag. Queued notifications are sent after publishing and by the `notify`
+command, which retries failed sends.
+
+Portals read published results only, so exams whose results predate
+publishing (revision 0011) are hidden until published. `publish-all`, run
+once after that upgrade, publishes every exam with results that was never
+published, without notifying parents unless --notify is given.
+
+Usage:
+    cd backend
+    python -m app.services.result_publication publish --exam 3
+    python -m app.services.result_publication publish-all
+    python -m app.services.result_publication notify
+"""
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, case, delete, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import upsert_insert
+from app.core.http_cache import etag_of
+from app.models import (
+    Class, Exam, ExamPublication, ExamResult, Parent, PublishedResult, ReportCard, ReportCardSubject,
+    ResultNotification, Student, Subject
+)
+from app.schemas import ReportCardResponse, ReportCardSubjectResponse
+from app.services.notifications import notification_service
+from app.services.report_cards import generate_exam_report_cards, generate_exam_report_cards_async
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+# Report card fields copied as they are into the published report
+REPORT_FIELDS = [
+    "exam_id", "exam_name", "academic_year", "student_id", "student_name", "roll_no", "class_id",
+    "obtained_marks", "total_marks", "percentage", "grade", "passed", "class_rank", "class_size",
+    "section_rank", "section_size", "percentile", "generated_at",
+]
+
+
+def _report_queries(exam_id: int) -> tuple:
+    """The exam's report-card subject lines with their results, and its report cards."""
+    return (
+        select(
+            ExamResult.id, ReportCardSubject.student_id, ReportCardSubject.subject_id,
+            Subject.name.label("subject_name"), ReportCardSubject.marks_obtained,
+            ExamResult.grade.label("entered_grade"), ExamResult.remarks,
+            ReportCardSubject.max_marks, ReportCardSubject.passing_marks, ReportCardSubject.percentage,
+            ReportCardSubject.grade, ReportCardSubject.passed, ReportCardSubject.is_section_topper,
+            ReportCardSubject.is_class_topper
+        )
+        .outerjoin(ExamResult, and_(
+            ExamResult.exam_id == ReportCardSubject.exam_id,
+            ExamResult.student_id == ReportCardSubject.student_id,
+            ExamResult.subject_id == ReportCardSubject.subject_id
+        ))
+        .outerjoin(Subject, Subject.id == ReportCardSubject.subject_id)
+        .where(ReportCardSubject.exam_id == exam_id)
+        .order_by(ReportCardSubject.student_id, ReportCardSubject.subject_id),
+        select(
+            ReportCard.__table__, Exam.name.label("exam_name"), Exam.academic_year,
+            Student.name.label("student_name"), Student.roll_no, Class.name.label("class_name"), Class.section
+        )
+        .join(Exam, Exam.id == ReportCard.exam_id)
+        .join(Student, Student.id == ReportCard.student_id)
+        .outerjoin(Class, Class.id == ReportCard.class_id)
+        .where(ReportCard.exam_id == exam_id)
+    )
+
+
+def build_reports(line_rows, card_rows, published_at: datetime) -> List[dict]:
+    """The exam's report cards with every subject line, as JSON-ready dicts,
+    from the rows of _report_queries. Pure computation, safe to run in a
+    worker thread."""
+    lines = defaultdict(list)
+    for row in line_rows:
+        line = ReportCardSubjectResponse(
+            subject_id=row["subject_id"],
+            subject_name=row["subject_name"] or "Unknown",
+            marks_obtained=row["marks_obtained"],
+            max_marks=row["max_marks"],
+            passing_marks=row["passing_marks"],
+            percentage=row["percentage"],
+            grade=row["entered_grade"] or row["grade"],
+            passed=row["passed"],
+            is_section_topper=row["is_section_topper"],
+            is_class_topper=row["is_class_topper"],
+            absent=row["marks_obtained"] is None,
+            remarks=row["remarks"]
+        ).model_dump(mode="json")
+        lines[row["student_id"]].append({"id": row["id"], **line})
+    return [
+        {
+            **ReportCardResponse(
+                **{field: getattr(card, field) for field in REPORT_FIELDS},
+                class_name=f"{card.class_name} {card.section or ''}".strip() if card.class_name else None,
+                subjects=[],
+                published_at=published_at
+            ).model_dump(mode="json"),
+            "subjects": lines[card.student_id]
+        }
+        for card in card_rows
+    ]
+
+
+def _publish_statements(dialect_name: str, exam_id: int, reports: List[dict], previous: Optional[int],
+                        published_by: Optional[int], published_at: datetime) -> Tuple[int, list, object]:
+    """The new version, the (statement, parameters) pairs writing the
+    publication and its snapshot, and the statement queueing notifications."""
+    version = (previous or 0) + 1
+    publication = {"version": version, "students": len(reports), "published_by": published_by,
+                   "published_at": published_at, "withdrawn_at": None}
+    statements = [
+        (insert(ExamPublication).values(exam_id=exam_id, **publication) if previous is None
+         else update(ExamPublication).where(ExamPublication.exam_id == exam_id).values(**publication), None),
+        (delete(PublishedResult).where(PublishedResult.exam_id == exam_id), None),
+        (insert(PublishedResult), [
+            {
+                "exam_id": exam_id,
+                "student_id": report["student_id"],
+                "class_id": report["class_id"],
+                "version": version,
+                "obtained_marks": report["obtained_marks"],
+                "total_marks": report["total_marks"],
+                "percentage": report["percentage"],
+                "grade": report["grade"],
+                "passed": report["passed"],
+                "class_rank": report["class_rank"],
+                "report": report,
+                "published_at": published_at,
+            }
+            for report in reports
+        ]),
+    ]
+    queue = upsert_insert(dialect_name, ResultNotification).from_select(
+        ["exam_id", "student_id", "parent_id"],
+        select(PublishedResult.exam_id, PublishedResult.student_id, Student.parent_id)
+        .join(Student, Student.id == PublishedResult.student_id)
+        .where(PublishedResult.exam_id == exam_id, Student.parent_id.isnot(None))
+    ).on_conflict_do_nothing(index_elements=[ResultNotification.exam_id, ResultNotification.student_id])
+    return version, statements, queue
+
+
+def _published(exam_id: int, version: int, reports: List[dict], queued: int, published_at: datetime) -> Dict:
+    logger.info(f"Published exam {exam_id} v{version}: {len(reports)} students, {queued} notifications queued")
+    return {
+        "exam_id": exam_id,
+        "version": version,
+        "students": len(reports),
+        "notifications_queued": queued,
+        "published_at": published_at,
+    }
+
+
+def publish_results(conn: Connection, exam_id: int, published_by: Optional[int] = None, notify: bool = True) -> Dict:
+    """Freeze the exam's results into the published snapshot and, if
+    `notify`, queue parent notifications. The caller commits.
+
+    Raises ValueError for an unknown exam or one without results.
+    """
+    if conn.execute(select(Exam.id).where(Exam.id == exam_id)).first() is None:
+        raise ValueError("Exam not found")
+
+    if not generate_exam_report_cards(conn, exam_id)["students"]:
+        raise ValueError("Exam has no results to publish")
+
+    published_at = datetime.now(timezone.utc)
+    lines_query, cards_query = _report_queries(exam_id)
+    reports = build_reports(conn.execute(lines_query).mappings().all(), conn.execute(cards_query).all(), published_at)
+    previous = conn.execute(select(ExamPublication.version).where(ExamPublication.exam_id == exam_id)).scalar()
+
+    version, statements, queue = _publish_statements(
+        conn.dialect.name, exam_id, reports, previous, published_by, published_at
+    )
+    for statement, parameters in statements:
+        conn.execute(statement, parameters)
+    queued = conn.execute(queue).rowcount if notify else 0
+    return _published(exam_id, version, reports, queued, published_at)
+
+
+def unpublished_exam_ids(conn: Connection) -> List[int]:
+    """Exams with results that have never been published; withdrawn exams
+    stay withdrawn."""
+    return conn.execute(
+        select(ExamResult.exam_id).distinct()
+        .where(ExamResult.exam_id.notin_(select(ExamPublication.exam_id)))
+        .order_by(ExamResult.exam_id)
+    ).scalars().all()
+
+
+async def publish_results_async(db: AsyncSession, exam_id: int, published_by: Optional[int] = None) -> Dict:
+    """publish_results for request handlers: queries run on the session, and
+    the report cards and snapshots are built in a worker thread. The caller
+    commits."""
+    if await db.scalar(select(Exam.id).where(Exam.id == exam_id)) is None:
+        raise ValueError("Exam not found")
+
+    if not (await generate_exam_report_cards_async(db, exam_id))["students"]:
+        raise ValueError("Exam has no results to publish")
+
+    published_at = datetime.now(timezone.utc)
+    lines_query, cards_query = _report_queries(exam_id)
+    line_rows = (await db.execute(lines_query)).mappings().all()
+    card_rows = (await db.execute(cards_query)).all()
+    reports = await run_in_threadpool(build_reports, line_rows, card_rows, published_at)
+    previous = await db.scalar(select(ExamPublication.version).where(ExamPublication.exam_id == exam_id))
+
+    version, statements, queue = _publish_statements(
+        db.bind.dialect.name, exam_id, reports, previous, published_by, published_at
+    )
+    for statement, parameters in statements:
+        await db.execute(statement, parameters)
+    return _published(exam_id, version, reports, (await db.execute(queue)).rowcount, published_at)
+
+
+def unpublish_results(conn: Connection, exam_id: int) -> bool:
+    """Withdraw an exam's published results and its unsent notifications;
+    returns False if it was not published. The caller commits.
+
+    The publication row stays, marked withdrawn, so a republish continues
+    its version and cached ETags from before the withdrawal stop matching.
+    """
+    conn.execute(delete(PublishedResult).where(PublishedResult.exam_id == exam_id))
+    conn.execute(delete(ResultNotification).where(
+        ResultNotification.exam_id == exam_id, ResultNotification.status == PENDING
+    ))
+    withdrawn = conn.execute(
+        update(ExamPublication)
+        .where(ExamPublication.exam_id == exam_id, ExamPublication.withdrawn_at.is_(None))
+        .values(withdrawn_at=datetime.now(timezone.utc))
+    ).rowcount
+    if withdrawn:
+        logger.info(f"Unpublished exam {exam_id}")
+    return bool(withdrawn)
+
+
+async def children_published_results(db: AsyncSession, parent_id: int) -> Tuple[List[dict], str]:
+    """Each child of a parent with their published exam reports, and the ETag
+    of the response; children without published results have no exams."""
+    rows = (await db.execute(
+        select(
+            Student.id, Student.name, Student.section, Student.roll_no, Class.name,
+            PublishedResult.exam_id, PublishedResult.version, PublishedResult.report
+        )
+        .outerjoin(Class, Class.id == Student.class_id)
+        .outerjoin(PublishedResult, PublishedResult.student_id == Student.id)
+        .where(Student.parent_id == parent_id)
+        .order_by(Student.id, PublishedResult.exam_id)
+    )).all()
+
+    children = {}
+    for student_id, student_name, section, roll_no, class_name, exam_id, _, report in rows:
+        child = children.setdefault(student_id, {
+            "student_id": student_id,
+            "student_name": student_name,
+            "class_name": class_name,
+            "section": section,
+            "roll_no": roll_no,
+            "exams": []
+        })
+        if report is not None:
+            child["exams"].append(report)
+
+    return list(children.values()), etag_of("parent", parent_id, [tuple(row[:-1]) for row in rows])
+
+
+async def student_published_results(db: AsyncSession, student_id: int) -> Tuple[List[dict], str]:
+    """A student's published results, one row per exam and subject, and the
+    ETag of the response."""
+    rows = (await db.execute(
+        select(PublishedResult.exam_id, PublishedResult.version, PublishedResult.report)
+        .where(PublishedResult.student_id == student_id)
+        .order_by(PublishedResult.exam_id)
+    )).all()
+
+    results = [
+        {
+            "id": subject["id"],
+            "exam_id": report["exam_id"],
+            "exam_name": report["exam_name"],
+            "subject_name": subject["subject_name"],
+            "marks_obtained": subject["marks_obtained"],
+            "grade": subject["grade"],
+            "absent": subject.get("absent", False),
+            "remarks": subject["remarks"]
+        }
+        for _, _, report in rows
+        for subject in report["subjects"]
+    ]
+    return results, etag_of("student", student_id, [(exam_id, version) for exam_id, version, _ in rows])
+
+
+async def published_report_cards(
+    db: AsyncSession,
+    student_ids: List[int],
+    exam_id: Optional[int] = None
+) -> List[ReportCardResponse]:
+    """Published report cards of the given students."""
+    query = (
+        select(PublishedResult.report)
+        .where(PublishedResult.student_id.in_(student_ids))
+        .order_by(PublishedResult.exam_id, PublishedResult.student_id)
+    )
+    if exam_id is not None:
+        query = query.where(PublishedResult.exam_id == exam_id)
+    return [ReportCardResponse.model_validate(report) for report in (await db.scalars(query)).all()]
+
+
+async def dispatch_result_notifications(db: AsyncSession, limit: Optional[int] = None) -> Dict[str, int]:
+    """Send up to `limit` queued notifications (default:
+    RESULT_NOTIFICATION_BATCH_SIZE); failed sends stay queued until
+    RESULT_NOTIFICATION_MAX_ATTEMPTS. The caller commits."""
+    queued = (await db.execute(
+        select(ResultNotification.id, Parent.email, Parent.phone, Student.name, Exam.name)
+        .join(Parent, Parent.id == ResultNotification.parent_id)
+        .join(Student, Student.id == ResultNotification.student_id)
+        .join(Exam, Exam.id == ResultNotification.exam_id)
+        .where(ResultNotification.status == PENDING)
+        .order_by(ResultNotification.attempts, ResultNotification.id)  # retries after fresh ones
+        .limit(limit or settings.RESULT_NOTIFICATION_BATCH_SIZE)
+        .with_for_update(skip_locked=True, of=ResultNotification)
+    )).all()
+
+    sent, failed = [], []
+    for notification_id, email, phone, student_name, exam_name in queued:
+        delivered = await notification_service.send_result_notification(email, phone, student_name, exam_name)
+        (sent if any(delivered.values()) else failed).append(notification_id)
+
+    if sent:
+        await db.execute(
+            update(ResultNotification)
+            .where(ResultNotification.id.in_(sent))
+            .values(status=SENT, attempts=ResultNotification.attempts + 1, sent_at=datetime.now(timezone.utc))
+        )
+    if failed:
+        await db.execute(
+            update(ResultNotification)
+            .where(ResultNotification.id.in_(failed))
+            .values(
+                status=case(
+                    (ResultNotification.attempts + 1 >= settings.RESULT_NOTIFICATION_MAX_ATTEMPTS, FAILED),
+                    else_=PENDING
+                ),
+                attempts=ResultNotification.attempts + 1
+            )
+        )
+
+    if queued:
+        logger.info(f"Result notifications: {len(sent)} sent, {len(failed)} failed")
+    return {"sent": len(sent), "failed": len(failed)}
+
+
+async def dispatch_queued_notifications() -> None:
+    """Send all queued notifications in batches, each in its own transaction."""
+    from app.core.database import AsyncSessionLocal
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            outcome = await dispatch_result_notifications(db)
+            await db.commit()
+        # Stop after a short batch, or one with failures: those wait for the next run
+        if outcome["failed"] or outcome["sent"] < settings.RESULT_NOTIFICATION_BATCH_SIZE:
+            break
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.core.database import engine
+
+    parser = argparse.ArgumentParser(description="Exam result publication")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish", help="Publish an exam's results and queue parent notifications")
+    publish.add_argument("--exam", type=int, required=True, help="Exam id")
+    publish_all = commands.add_parser("publish-all", help="Publish every exam with results that was never published")
+    publish_all.add_argument("--notify", action="store_true", help="Queue parent notifications too")
+    unpublish = commands.add_parser("unpublish", help="Withdraw an exam's published results")
+    unpublish.add_argument("--exam", type=int, required=True, help="Exam id")
+    commands.add_parser("notify", help="Send queued result notifications")
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        with engine.begin() as conn:
+            summary = publish_results(conn, args.exam)
+        print(f"Exam {args.exam} published (v{summary['version']}): {summary['students']} students, "
+              f"{summary['notifications_queued']} notifications queued")
+    elif args.command == "publish-all":
+        with engine.connect() as conn:
+            exam_ids = unpublished_exam_ids(conn)
+        for exam_id in exam_ids:
+            try:
+                with engine.begin() as conn:
+                    summary = publish_results(conn, exam_id, notify=args.notify)
+            except ValueError as e:
+                print(f"Exam {exam_id} skipped: {e}")
+                continue
+            print(f"Exam {exam_id} published: {summary['students']} students, "
+                  f"{summary['notifications_queued']} notifications queued")
+    elif args.command == "unpublish":
+        with engine.begin() as conn:
+            withdrawn = unpublish_results(conn, args.exam)
+        print(f"Exam {args.exam} {'unpublished' if withdrawn else 'was not published'}")
+    elif args.command == "notify":
+        asyncio.run(dispatch_queued_notifications())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,309 @@
+"""
+Gate scanner check-ins.
+
+Scanners post batches of check-in events. The API only validates them and
+merges them into an in-process buffer keyed by student and day that keeps
+each student's earliest scan, so a morning burst costs no database work per
+request. A background task writes the buffer every
+SCAN_FLUSH_INTERVAL_SECONDS, or as soon as SCAN_FLUSH_BATCH_SIZE check-ins
+are waiting: one student lookup and one INSERT ... ON CONFLICT per chunk of
+check-ins, then the attendance_summary refresh, in a single transaction.
+
+Check-ins more than SCAN_MAX_AGE_HOURS old or SCAN_MAX_FUTURE_SECONDS ahead
+of the server clock are rejected rather than buffered, so a scanner with a
+wrong clock cannot mark attendance on other days.
+
+A check-in after SCAN_LATE_AFTER (school-local time) is marked late,
+otherwise present. Existing marks are only ever upgraded: absent becomes the
+scanned status and late becomes present when an earlier scan turns up.
+Excused days and days already marked present are left alone.
+
+Each worker process keeps its own buffer. A failed write puts its check-ins
+back for the next attempt; lost connections are retried indefinitely, while
+other errors count against each check-in. After SCAN_FLUSH_MAX_ATTEMPTS such
+failures a check-in is written in a transaction of its own, so one bad row
+cannot hold back the rest, and dropped with an error log if that fails too.
+The buffer is written out on shutdown; check-ins buffered in a worker that
+is killed outright are lost.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.academic_year import academic_year_of
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, upsert_insert
+from app.models import Attendance, AttendanceStatus, Student
+from app.schemas import ScanEvent
+from app.services.attendance_summary import refresh_student_summaries
+
+logger = logging.getLogger(__name__)
+
+# Check-ins per lookup and upsert statement, well below driver parameter limits
+WRITE_CHUNK = 1000
+
+# ("student_id", 12) or ("admission_no", "ADM2024001"), as sent by the scanner
+StudentRef = Tuple[str, Union[int, str]]
+
+
+@dataclass
+class CheckIn:
+    scanned_at: datetime  # school-local, naive
+    scanner_id: Optional[str] = None
+
+
+def school_time(moment: datetime) -> datetime:
+    """Scan time as naive school-local time; naive times are taken as school-local already."""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(ZoneInfo(settings.SCHOOL_TIMEZONE)).replace(tzinfo=None)
+
+
+def school_now() -> datetime:
+    return datetime.now(ZoneInfo(settings.SCHOOL_TIMEZONE)).replace(tzinfo=None)
+
+
+def in_scan_window(scanned_at: datetime, now: datetime) -> bool:
+    """Whether a school-local scan time is recent enough, and not too far ahead, to be believed."""
+    return (now - timedelta(hours=settings.SCAN_MAX_AGE_HOURS)
+            <= scanned_at
+            <= now + timedelta(seconds=settings.SCAN_MAX_FUTURE_SECONDS))
+
+
+def check_in_status(scanned_at: datetime) -> AttendanceStatus:
+    return AttendanceStatus.LATE if scanned_at.time() > settings.SCAN_LATE_AFTER else AttendanceStatus.PRESENT
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _write_chunk(db: AsyncSession, pending: List[Tuple[Tuple[StudentRef, date], CheckIn]]) -> Tuple[int, int]:
+    refs = [ref for (ref, _), _ in pending]
+    ids = {value for kind, value in refs if kind == "student_id"}
+    numbers = {value for kind, value in refs if kind == "admission_no"}
+    students = (await db.execute(select(Student.id, Student.admission_no).where(or_(
+        Student.id.in_(ids), Student.admission_no.in_(numbers)
+    )))).all()
+    known_ids = {s.id for s in students}
+    id_by_number = {s.admission_no: s.id for s in students}
+
+    # The same student may have been scanned by id and by admission number
+    earliest: Dict[Tuple[int, date], CheckIn] = {}
+    unknown = 0
+    for ((kind, value), day), check_in in pending:
+        student_id = (value if value in known_ids else None) if kind == "student_id" else id_by_number.get(value)
+        if student_id is None:
+            unknown += 1
+            continue
+        current = earliest.get((student_id, day))
+        if current is None or check_in.scanned_at < current.scanned_at:
+            earliest[(student_id, day)] = check_in
+
+    if not earliest:
+        return 0, unknown
+
+    insert = upsert_insert(db.bind.dialect.name, Attendance).values([
+        {
+            "student_id": student_id,
+            "date": day,
+            "status": check_in_status(check_in.scanned_at),
+            "remarks": f"Scanned in at {check_in.scanned_at:%H:%M}"
+                       + (f" ({check_in.scanner_id})" if check_in.scanner_id else ""),
+        }
+        for (student_id, day), check_in in earliest.items()
+    ])
+    statement = insert.on_conflict_do_update(
+        index_elements=[Attendance.student_id, Attendance.date],
+        set_={
+            "status": insert.excluded.status,
+            "remarks": insert.excluded.remarks,
+            "updated_at": func.now(),
+        },
+        where=or_(
+            Attendance.status == AttendanceStatus.ABSENT,
+            and_(Attendance.status == AttendanceStatus.LATE, insert.excluded.status == AttendanceStatus.PRESENT)
+        )
+    ).returning(Attendance.student_id, Attendance.date)
+    written = (await db.execute(statement)).all()
+
+    by_year = defaultdict(set)
+    for student_id, day in written:
+        by_year[academic_year_of(day)].add(student_id)
+    for start_year, student_ids in by_year.items():
+        await refresh_student_summaries(db, student_ids, start_year)
+    return len(written), unknown
+
+
+async def write_check_ins(db: AsyncSession, pending: Dict[Tuple[StudentRef, date], CheckIn]) -> Tuple[int, int]:
+    """Upsert buffered check-ins into attendance; returns (rows written, check-ins
+    dropped for unknown students). The caller commits."""
+    written = unknown = 0
+    for chunk in _chunks(list(pending.items()), WRITE_CHUNK):
+        chunk_written, chunk_unknown = await _write_chunk(db, chunk)
+        written += chunk_written
+        unknown += chunk_unknown
+    return written, unknown
+
+
+class ScanBuffer:
+    """Check-ins waiting to be written, for one worker process."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[StudentRef, date], CheckIn] = {}
+        self._attempts: Dict[Tuple[StudentRef, date], int] = {}  # failed writes per buffered check-in
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._counters = {"accepted": 0, "duplicates": 0, "written": 0, "unknown": 0,
+                          "rejected": 0, "failed_flushes": 0, "dropped": 0}
+        self._last_flush_at: Optional[datetime] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def full(self) -> bool:
+        return len(self._pending) >= settings.SCAN_BUFFER_MAX_EVENTS
+
+    def _merge(self, key: Tuple[StudentRef, date], check_in: CheckIn) -> bool:
+        """Keep the earlier of two check-ins for the same student and day; True if the key is new."""
+        current = self._pending.get(key)
+        if current is None or check_in.scanned_at < current.scanned_at:
+            self._pending[key] = check_in
+        return current is None
+
+    def add(self, events: Iterable[ScanEvent]) -> Tuple[int, int, int]:
+        """Buffer scan events; returns (accepted, duplicates, rejected as outside the scan window)."""
+        accepted = duplicates = rejected = 0
+        now = school_now()
+        for event in events:
+            scanned_at = school_time(event.scanned_at)
+            if not in_scan_window(scanned_at, now):
+                rejected += 1
+                continue
+            ref = ("student_id", event.student_id) if event.student_id is not None else ("admission_no", event.admission_no)
+            if self._merge((ref, scanned_at.date()), CheckIn(scanned_at, event.scanner_id)):
+                accepted += 1
+            else:
+                duplicates += 1
+
+        self._counters["accepted"] += accepted
+        self._counters["duplicates"] += duplicates
+        self._counters["rejected"] += rejected
+        if rejected:
+            logger.warning(f"Rejected {rejected} scanned check-ins outside the scan window")
+        if len(self._pending) >= settings.SCAN_FLUSH_BATCH_SIZE:
+            self._wake.set()
+        return accepted, duplicates, rejected
+
+    def _retry(self, pending: Dict[Tuple[StudentRef, date], CheckIn], counted: bool) -> None:
+        """Put check-ins from a failed write back, counting the failure against each unless it was transient."""
+        for key, check_in in pending.items():
+            if counted:
+                self._attempts[key] = self._attempts.get(key, 0) + 1
+            self._merge(key, check_in)
+
+    async def _write(self, pending: Dict[Tuple[StudentRef, date], CheckIn]) -> int:
+        async with AsyncSessionLocal() as db:
+            written, unknown = await write_check_ins(db, pending)
+            await db.commit()
+        for key in pending:
+            self._attempts.pop(key, None)
+        self._counters["written"] += written
+        self._counters["unknown"] += unknown
+        if unknown:
+            logger.warning(f"Dropped {unknown} scanned check-ins for unknown students")
+        return written
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the attendance rows written."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        # Check-ins that failed too often go one per transaction, to isolate a bad row
+        batch, suspects = {}, []
+        for key, check_in in pending.items():
+            if self._attempts.get(key, 0) >= settings.SCAN_FLUSH_MAX_ATTEMPTS:
+                suspects.append((key, check_in))
+            else:
+                batch[key] = check_in
+
+        written = 0
+        for number, part in enumerate([batch] + [dict([suspect]) for suspect in suspects]):
+            if not part:
+                continue
+            try:
+                written += await self._write(part)
+            except asyncio.CancelledError:
+                self._retry(part, counted=False)
+                self._retry(dict(suspects[number:]), counted=False)
+                raise
+            except (OperationalError, InterfaceError, OSError) as e:
+                # The database is unreachable: keep everything for later without counting it
+                self._retry(part, counted=False)
+                self._retry(dict(suspects[number:]), counted=False)
+                self._counters["failed_flushes"] += 1
+                logger.error(f"Writing {len(pending)} scanned check-ins failed, will retry: {e}")
+                return written
+            except Exception as e:
+                self._counters["failed_flushes"] += 1
+                if number == 0:
+                    self._retry(part, counted=True)
+                    logger.error(f"Writing {len(part)} scanned check-ins failed, will retry: {e}")
+                    continue
+                [((kind, value), day)] = part
+                self._attempts.pop(((kind, value), day), None)
+                self._counters["dropped"] += 1
+                logger.error(f"Dropped scanned check-in for {kind} {value} on {day} "
+                             f"after {settings.SCAN_FLUSH_MAX_ATTEMPTS} failed writes: {e}")
+
+        self._last_flush_at = datetime.now()
+        logger.info(f"Wrote {written} attendance rows from {len(pending)} scanned check-ins")
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.SCAN_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic writer on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic writer and write out what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            **self._counters,
+            "last_flush_at": self._last_flush_at,
+            "running": self._task is not None,
+        }
+
+
+scan_buffer = ScanBuffer()
@@ -0,0 +1,278 @@
+"""
+Exam seating plans.
+
+A sitting is one exam's papers on a date at a start time. Its students -
+those of the classes scheduled in the sitting, or of the classes given -
+are seated across the given rooms so that no two students of the same
+class sit side by side or one behind the other. Sections of a class count
+as one class, since they write the same paper.
+
+Each room is a grid of `columns` desks per row holding `capacity` seats,
+filled row by row from the front. Every seat greedily takes the class with
+the most students still unseated among those not already seated to its
+left or in front of it; a seat no class may take stays empty. With two or
+more classes this interleaves them like a chessboard, and it takes a few
+milliseconds for thousands of students.
+
+The plan is stored per sitting with a fingerprint of the students and rooms
+it was built from; asking again with unchanged inputs returns the stored
+plan. Plans export as CSV, or as XLSX with a seat list and a desk grid per
+room.
+"""
+import hashlib
+import heapq
+import io
+import math
+import re
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Class, ExamSchedule, SeatAssignment, SeatingPlan, Student
+from app.schemas import SeatAssignmentResponse, SeatingPlanCreate, SeatingPlanResponse, SeatingRoom
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+@dataclass(frozen=True)
+class Seat:
+    student_id: int
+    room: str
+    row: int
+    column: int
+    seat_no: int
+
+
+def _room_columns(room: SeatingRoom) -> int:
+    return room.columns or settings.SEATING_DEFAULT_COLUMNS
+
+
+def assign_seats(students: Sequence[Tuple[int, str]], rooms: Sequence[SeatingRoom]) -> Tuple[List[Seat], List[int]]:
+    """Seat (student_id, class) pairs, taken in order within each class, in
+    the rooms in order; returns the seats and the students left unseated."""
+    queues: Dict[str, deque] = {}
+    for student_id, group in students:
+        queues.setdefault(group, deque()).append(student_id)
+    # Max-heap on unseated students; ties go to the class listed first
+    heap = [(-len(queue), order, group) for order, (group, queue) in enumerate(queues.items())]
+    heapq.heapify(heap)
+
+    seats: List[Seat] = []
+    for room in rooms:
+        columns = _room_columns(room)
+        grid: List[List[Optional[str]]] = [[None] * columns for _ in range(math.ceil(room.capacity / columns))]
+        for index in range(room.capacity):
+            if not heap:
+                break
+            row, column = divmod(index, columns)
+            neighbours = {grid[row][column - 1] if column else None, grid[row - 1][column] if row else None}
+
+            skipped = []
+            while heap and heap[0][2] in neighbours:
+                skipped.append(heapq.heappop(heap))
+            if heap:
+                remaining, order, group = heapq.heappop(heap)
+                grid[row][column] = group
+                seats.append(Seat(queues[group].popleft(), room.name, row + 1, column + 1, index + 1))
+                if remaining < -1:
+                    heapq.heappush(heap, (remaining + 1, order, group))
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+
+    unseated = [student_id for queue in queues.values() for student_id in queue]
+    return seats, unseated
+
+
+def _normalize_time(start_time: Optional[str]) -> Optional[str]:
+    return (start_time or "").strip() or None
+
+
+def _sitting(model, exam_id: int, exam_date: date, start_time: Optional[str]) -> list:
+    return [
+        model.exam_id == exam_id,
+        model.exam_date == exam_date,
+        model.start_time.is_(None) if start_time is None else model.start_time == start_time,
+    ]
+
+
+def _fingerprint(students: Sequence[Tuple[int, str]], rooms: Sequence[SeatingRoom]) -> str:
+    rooms_key = [(room.name, room.capacity, _room_columns(room)) for room in rooms]
+    return hashlib.sha1(repr((list(students), rooms_key)).encode()).hexdigest()
+
+
+async def generate_seating_plan(db: AsyncSession, exam_id: int, data: SeatingPlanCreate) -> Tuple[int, bool]:
+    """Build and store the seating plan of a sitting, or keep the stored one if
+    its students and rooms are unchanged; returns (plan id, reused). The
+    caller commits.
+
+    Raises ValueError for duplicate room names, a sitting without students,
+    or rooms that cannot seat everyone under the interleaving rule.
+    """
+    start_time = _normalize_time(data.start_time)
+    names = [room.name.strip().casefold() for room in data.rooms]
+    if len(set(names)) != len(names):
+        raise ValueError("Room names must be unique")
+
+    class_ids = data.class_ids
+    if class_ids is None:
+        class_ids = select(ExamSchedule.class_id).where(*_sitting(ExamSchedule, exam_id, data.exam_date, start_time))
+    rows = (await db.execute(
+        select(Student.id, Student.class_id, Class.name, Class.academic_year)
+        .join(Class, Class.id == Student.class_id)
+        .where(Student.class_id.in_(class_ids))
+        .order_by(Class.name, Class.section, Student.roll_no, Student.id)
+    )).all()
+    students = [(student_id, f"{class_name}|{academic_year}") for student_id, _, class_name, academic_year in rows]
+    class_of = {student_id: class_id for student_id, class_id, _, _ in rows}
+    if not students:
+        raise ValueError("No students sit this exam at that time")
+
+    fingerprint = _fingerprint(students, data.rooms)
+    plan = await db.scalar(select(SeatingPlan).where(*_sitting(SeatingPlan, exam_id, data.exam_date, start_time)))
+    if plan is not None and plan.fingerprint == fingerprint:
+        return plan.id, True
+
+    seats, unseated = assign_seats(students, data.rooms)
+    if unseated:
+        raise ValueError(
+            f"The rooms seat {len(seats)} of {len(students)} students without classmates side by side; "
+            f"add {len(unseated)} or more seats"
+        )
+
+    rooms = [room.model_dump() for room in data.rooms]
+    if plan is None:
+        plan = SeatingPlan(exam_id=exam_id, exam_date=data.exam_date, start_time=start_time)
+        db.add(plan)
+    else:
+        await db.execute(delete(SeatAssignment).where(SeatAssignment.plan_id == plan.id))
+    plan.fingerprint, plan.rooms, plan.students = fingerprint, rooms, len(students)
+    await db.flush()
+    await db.execute(insert(SeatAssignment), [
+        {
+            "plan_id": plan.id,
+            "student_id": seat.student_id,
+            "class_id": class_of[seat.student_id],
+            "room": seat.room,
+            "row": seat.row,
+            "column": seat.column,
+            "seat_no": seat.seat_no,
+        }
+        for seat in seats
+    ])
+    return plan.id, False
+
+
+async def seating_plan(
+    db: AsyncSession,
+    exam_id: int,
+    exam_date: Optional[date] = None,
+    start_time: Optional[str] = None,
+    plan_id: Optional[int] = None,
+    cached: bool = False
+) -> Optional[SeatingPlanResponse]:
+    """A stored plan, by id or by sitting, with its seats in room order."""
+    if plan_id is not None:
+        criteria = [SeatingPlan.id == plan_id, SeatingPlan.exam_id == exam_id]
+    else:
+        criteria = _sitting(SeatingPlan, exam_id, exam_date, _normalize_time(start_time))
+    plan = await db.scalar(select(SeatingPlan).where(*criteria))
+    if plan is None:
+        return None
+
+    room_order = {room["name"]: order for order, room in enumerate(plan.rooms)}
+    rows = (await db.execute(
+        select(SeatAssignment, Student.name, Student.admission_no, Student.roll_no, Class.name, Class.section)
+        .join(Student, Student.id == SeatAssignment.student_id)
+        .outerjoin(Class, Class.id == SeatAssignment.class_id)
+        .where(SeatAssignment.plan_id == plan.id)
+    )).all()
+    rows.sort(key=lambda row: (room_order.get(row[0].room, len(room_order)), row[0].seat_no))
+
+    return SeatingPlanResponse(
+        id=plan.id,
+        exam_id=plan.exam_id,
+        exam_date=plan.exam_date,
+        start_time=plan.start_time,
+        rooms=plan.rooms,
+        students=plan.students,
+        cached=cached,
+        created_at=plan.created_at,
+        seats=[
+            SeatAssignmentResponse(
+                student_id=seat.student_id,
+                student_name=student_name,
+                admission_no=admission_no,
+                roll_no=roll_no,
+                class_id=seat.class_id,
+                class_name=f"{class_name} {section or ''}".strip() if class_name else None,
+                room=seat.room,
+                row=seat.row,
+                column=seat.column,
+                seat_no=seat.seat_no
+            )
+            for seat, student_name, admission_no, roll_no, class_name, section in rows
+        ]
+    )
+
+
+def _sheet_name(name: str, taken: set) -> str:
+    base = re.sub(r"[\[\]:*?/\\]", "-", name)[:28] or "Room"
+    sheet, n = base, 1
+    while sheet.casefold() in taken:
+        n += 1
+        sheet = f"{base[:25]} ({n})"
+    taken.add(sheet.casefold())
+    return sheet
+
+
+def seating_plan_file(plan: SeatingPlanResponse, file_format: str) -> Tuple[io.IOBase, str, str]:
+    """The plan as a CSV or XLSX file; returns (stream, media type, filename)."""
+    seats = pd.DataFrame(
+        [
+            {
+                "room": seat.room,
+                "seat_no": seat.seat_no,
+                "row": seat.row,
+                "column": seat.column,
+                "admission_no": seat.admission_no,
+                "roll_no": seat.roll_no,
+                "student_name": seat.student_name,
+                "class": seat.class_name,
+            }
+            for seat in plan.seats
+        ],
+        columns=["room", "seat_no", "row", "column", "admission_no", "roll_no", "student_name", "class"]
+    )
+    filename = f"seating_exam{plan.exam_id}_{plan.exam_date.isoformat()}"
+    if plan.start_time:
+        filename += "_" + plan.start_time.replace(":", "")
+
+    if file_format == "xlsx":
+        output = io.BytesIO()
+        taken = {"seats"}
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            seats.to_excel(writer, index=False, sheet_name='Seats')
+            for room in plan.rooms:
+                columns = _room_columns(room)
+                grid = pd.DataFrame(
+                    "",
+                    index=pd.RangeIndex(1, math.ceil(room.capacity / columns) + 1, name="row"),
+                    columns=pd.RangeIndex(1, columns + 1, name="column")
+                )
+                for seat in plan.seats:
+                    if seat.room == room.name:
+                        grid.loc[seat.row, seat.column] = f"{seat.admission_no} ({seat.class_name})"
+                grid.to_excel(writer, sheet_name=_sheet_name(room.name, taken))
+        output.seek(0)
+        return output, XLSX_MEDIA_TYPE, f"{filename}.xlsx"
+
+    output = io.StringIO()
+    seats.to_csv(output, index=False)
+    output.seek(0)
+    return output, "text/csv", f"{filename}.csv"
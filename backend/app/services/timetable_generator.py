@@ -0,0 +1,558 @@
+"""
+Timetable generation.
+
+Builds a clash-free weekly timetable for some or all classes: no class,
+teacher or room is in two places at once, and no room holds more lessons
+than its capacity (one, unless the request says otherwise).
+
+Every class takes each of its subjects for the periods per week its
+requirement gives - by subject name, for one class or for all - else
+`default_periods`, else an even share of the periods the requirements
+leave free. A class's subject is taught by one teacher, chosen among the
+teachers of the subject (teacher_subjects), preferring teachers of the
+class (teacher_classes), then the least loaded. Subjects nobody teaches
+are timetabled without a teacher and reported. A lesson sits in its
+requirement's room, else in the class's own room.
+
+Slots are TIMETABLE_DAYS x TIMETABLE_PERIODS. Placing lessons in slots is
+graph colouring - lessons sharing a class, a teacher or a full room may
+not share a slot - done greedily, hardest lessons first (those whose
+class, teacher and rooms have the least slack), then by conflict-directed
+local search: a lesson with no free slot takes the slot whose occupants
+are cheapest to move, they are ejected and queued again, and a short tabu
+keeps them from moving straight back. Among equally good slots, days the
+class already has the subject are avoided. A full school takes seconds;
+TIMETABLE_MAX_STEPS and TIMETABLE_TIME_LIMIT_SECONDS bound the search.
+
+Entries of classes not being generated stay, and their teachers and rooms
+count as busy. The new timetable replaces the classes' entries with one
+bulk insert - unless some lessons found no slot and `allow_partial` is not
+set. Request handlers use generate_timetable_async, which runs the search
+in a worker thread so the event loop is not held for its duration.
+
+Usage:
+    cd backend
+    python -m app.services.timetable_generator generate --default-periods 6
+    python -m app.services.timetable_generator synthetic --classes 60 --teachers 80
+"""
+import argparse
+import heapq
+import logging
+import math
+import random
+import time as clock
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Class, DayOfWeek, Subject, Timetable, teacher_classes, teacher_subjects
+from app.schemas import TimetableGenerate, TimetableGenerationResult, TimetableShortfall
+
+logger = logging.getLogger(__name__)
+
+TABU_TENURE = 8  # moves an ejected lesson stays out of the slot it lost, plus up to as many again at random
+STALL_MOVES = 10  # per lesson: moves without fewer unplaced lessons before the search gives up
+
+
+@dataclass(frozen=True)
+class Lesson:
+    class_id: int
+    subject_id: int
+    teacher_id: Optional[int]
+    room: Optional[str]
+
+
+def _resources(lesson: Lesson) -> List[tuple]:
+    keys = [("class", lesson.class_id)]
+    if lesson.teacher_id is not None:
+        keys.append(("teacher", lesson.teacher_id))
+    if lesson.room:
+        keys.append(("room", lesson.room.strip().casefold()))
+    return keys
+
+
+def week() -> Tuple[List[DayOfWeek], List[Tuple[time, time]]]:
+    """Teaching days and (start, end) period times from the settings;
+    raises ValueError if malformed."""
+    try:
+        days = [DayOfWeek(day.strip().lower()) for day in settings.TIMETABLE_DAYS.split(",") if day.strip()]
+        periods = []
+        for period in settings.TIMETABLE_PERIODS.split(","):
+            start, end = period.split("-")
+            periods.append((time.fromisoformat(start.strip()), time.fromisoformat(end.strip())))
+    except ValueError:
+        raise ValueError("Invalid TIMETABLE_DAYS or TIMETABLE_PERIODS")
+    if not days or not periods:
+        raise ValueError("TIMETABLE_DAYS and TIMETABLE_PERIODS must not be empty")
+    return days, periods
+
+
+def assign_teachers(
+    courses: Sequence[Tuple[int, int, int]],
+    candidates: Dict[int, List[int]],
+    class_teachers: Dict[int, set],
+    slots: int,
+    load: Optional[Counter] = None
+) -> Dict[Tuple[int, int], Optional[int]]:
+    """A teacher per (class_id, subject_id, periods) course, or None if the
+    subject has no teachers. Courses with the fewest candidates choose first;
+    each takes a teacher of its class if it can, else the least loaded teacher
+    with room for its periods. `load` holds periods already taught elsewhere."""
+    load = Counter(load or {})
+    chosen = {}
+    for class_id, subject_id, periods in sorted(courses, key=lambda c: (len(candidates.get(c[1], ())), -c[2])):
+        teachers = candidates.get(subject_id)
+        if not teachers:
+            chosen[(class_id, subject_id)] = None
+            continue
+        ours = class_teachers.get(class_id, set())
+        teacher = min(teachers, key=lambda t: (load[t] + periods > slots, t not in ours, load[t], t))
+        load[teacher] += periods
+        chosen[(class_id, subject_id)] = teacher
+    return chosen
+
+
+def solve(
+    lessons: Sequence[Lesson],
+    days: int,
+    periods: int,
+    room_capacity: Optional[Dict[str, int]] = None,
+    busy: Optional[Dict[tuple, List[int]]] = None,
+    seed: int = 0,
+    max_steps: Optional[int] = None,
+    time_limit: Optional[float] = None
+) -> List[Optional[int]]:
+    """The slot (day * periods + period, from 0) of every lesson, None where
+    none was found. `busy` counts, per ("teacher", id) or ("room", name)
+    resource, the fixed lessons it already has in each slot."""
+    slots = days * periods
+    max_steps = settings.TIMETABLE_MAX_STEPS if max_steps is None else max_steps
+    deadline = clock.monotonic() + (settings.TIMETABLE_TIME_LIMIT_SECONDS if time_limit is None else time_limit)
+    room_capacity = {name.strip().casefold(): capacity for name, capacity in (room_capacity or {}).items()}
+    busy = busy or {}
+    rng = random.Random(seed)
+
+    resources = [_resources(lesson) for lesson in lessons]
+    capacity: Dict[tuple, List[int]] = {}  # places left per slot, net of fixed lessons
+    for keys in resources:
+        for key in keys:
+            if key not in capacity:
+                places = room_capacity.get(key[1], 1) if key[0] == "room" else 1
+                fixed = busy.get(key)
+                capacity[key] = [places - (fixed[s] if fixed else 0) for s in range(slots)]
+    occupants = {key: [[] for _ in range(slots)] for key in capacity}
+
+    demand = Counter(key for keys in resources for key in keys)
+    slack = {key: max(1, sum(places for places in capacity[key] if places > 0)) for key in capacity}
+    priority = [sum(demand[key] / slack[key] for key in keys) for keys in resources]
+    # Lessons ejected less often go first, so churn over an overloaded
+    # teacher or room cannot starve the lessons not yet placed
+    queue = [(0, -priority[i], i) for i in range(len(lessons))]
+    heapq.heapify(queue)
+
+    slot_of: List[Optional[int]] = [None] * len(lessons)
+    day_load = Counter()  # (class, subject, day) -> lessons placed
+    ejections = [0] * len(lessons)
+    tabu: Dict[Tuple[int, int], int] = {}
+    stuck: List[int] = []
+    best, best_unplaced, best_step = list(slot_of), len(lessons), 0
+    stall = max(10000, STALL_MOVES * len(lessons))
+
+    def place(i: int, slot: Optional[int]) -> None:
+        lesson, old = lessons[i], slot_of[i]
+        if old is not None:
+            for key in resources[i]:
+                occupants[key][old].remove(i)
+            day_load[(lesson.class_id, lesson.subject_id, old // periods)] -= 1
+        if slot is not None:
+            for key in resources[i]:
+                occupants[key][slot].append(i)
+            day_load[(lesson.class_id, lesson.subject_id, slot // periods)] += 1
+        slot_of[i] = slot
+
+    step = 0
+    while queue and step < max_steps and step - best_step < stall:
+        if step % 256 == 0 and clock.monotonic() > deadline:
+            break
+        step += 1
+        *_, i = heapq.heappop(queue)
+        lesson = lessons[i]
+
+        choice, choice_cost, choice_victims = None, None, ()
+        for slot in range(slots):
+            if tabu.get((i, slot), 0) > step:
+                continue
+            victims = set()
+            for key in resources[i]:
+                placed = occupants[key][slot]
+                if len(placed) >= capacity[key][slot]:
+                    if not placed:
+                        break  # taken by fixed lessons
+                    victims.add(min(placed, key=ejections.__getitem__))
+            else:
+                cost = (
+                    sum(1 + ejections[v] for v in victims) * 1000
+                    + day_load[(lesson.class_id, lesson.subject_id, slot // periods)] * 10
+                    + rng.random()
+                )
+                if choice_cost is None or cost < choice_cost:
+                    choice, choice_cost, choice_victims = slot, cost, victims
+        if choice is None:
+            stuck.append(i)
+            continue
+
+        for v in choice_victims:
+            place(v, None)
+            ejections[v] += 1
+            tabu[(v, choice)] = step + TABU_TENURE + rng.randrange(TABU_TENURE + 1)
+            heapq.heappush(queue, (ejections[v], -priority[v], v))
+        place(i, choice)
+
+        unplaced = len(queue) + len(stuck)
+        if unplaced < best_unplaced:
+            best, best_unplaced, best_step = list(slot_of), unplaced, step
+
+    logger.info(f"Timetable search: {step} moves, {best_unplaced} of {len(lessons)} lessons unplaced")
+    return best
+
+
+def clashes(
+    lessons: Sequence[Lesson],
+    slot_of: Sequence[Optional[int]],
+    room_capacity: Optional[Dict[str, int]] = None
+) -> List[Tuple[tuple, int]]:
+    """(resource, slot) pairs holding more lessons than they may."""
+    room_capacity = {name.strip().casefold(): capacity for name, capacity in (room_capacity or {}).items()}
+    used = Counter(
+        (key, slot) for lesson, slot in zip(lessons, slot_of) if slot is not None for key in _resources(lesson)
+    )
+    return [
+        (key, slot) for (key, slot), count in used.items()
+        if count > (room_capacity.get(key[1], 1) if key[0] == "room" else 1)
+    ]
+
+
+@dataclass
+class TimetablePlan:
+    class_ids: List[int]
+    subject_names: Dict[int, str]
+    teachers: Dict[Tuple[int, int], Optional[int]]
+    lessons: List[Lesson]
+    slot_of: List[Optional[int]]
+
+
+def _class_query(data: TimetableGenerate):
+    query = select(Class.id, Class.room_number).order_by(Class.id)
+    if data.class_ids is not None:
+        query = query.where(Class.id.in_(data.class_ids))
+    return query
+
+
+def _class_rooms(data: TimetableGenerate, rows) -> Dict[int, Optional[str]]:
+    rooms = {class_id: room for class_id, room in rows}
+    unknown = sorted(set(data.class_ids or ()) - set(rooms))
+    if unknown:
+        raise ValueError(f"Classes not found: {', '.join(map(str, unknown))}")
+    return rooms
+
+
+def _school_queries(class_ids: List[int]) -> list:
+    """Subjects, subject teachers, class teachers and the other classes' entries."""
+    return [
+        select(Subject.id, Subject.name, Subject.class_id)
+        .where(Subject.class_id.in_(class_ids))
+        .order_by(Subject.class_id, Subject.id),
+        select(teacher_subjects.c.teacher_id, teacher_subjects.c.subject_id)
+        .join(Subject, Subject.id == teacher_subjects.c.subject_id)
+        .where(Subject.class_id.in_(class_ids)),
+        select(teacher_classes.c.teacher_id, teacher_classes.c.class_id),
+        select(Timetable.day, Timetable.period, Timetable.teacher_id, Timetable.room)
+        .where(Timetable.class_id.notin_(class_ids)),
+    ]
+
+
+def plan_timetable(
+    data: TimetableGenerate,
+    rooms: Dict[int, Optional[str]],
+    subjects: Sequence[tuple],
+    subject_teachers: Sequence[tuple],
+    class_teacher_rows: Sequence[tuple],
+    fixed: Sequence[tuple]
+) -> TimetablePlan:
+    """Choose teachers and slots for the classes in `rooms` from the rows of
+    `_school_queries`. Pure computation, safe to run in a worker thread.
+
+    Raises ValueError for unknown subjects, or a class needing more periods
+    than the week has.
+    """
+    days, period_times = week()
+    slots = len(days) * len(period_times)
+    class_ids = list(rooms)
+
+    subject_names = {subject_id: name for subject_id, name, _ in subjects}
+    candidates: Dict[int, List[int]] = defaultdict(list)
+    for teacher_id, subject_id in subject_teachers:
+        candidates[subject_id].append(teacher_id)
+    class_teachers: Dict[int, set] = defaultdict(set)
+    for teacher_id, class_id in class_teacher_rows:
+        class_teachers[class_id].add(teacher_id)
+
+    # Other classes' entries stay put: their teachers and rooms are busy then
+    day_index = {day: d for d, day in enumerate(days)}
+    busy: Dict[tuple, List[int]] = defaultdict(lambda: [0] * slots)
+    load = Counter()
+    for day, period, teacher_id, room in fixed:
+        if teacher_id is not None:
+            load[teacher_id] += 1
+        if day not in day_index or not 1 <= period <= len(period_times):
+            continue
+        slot = day_index[day] * len(period_times) + period - 1
+        if teacher_id is not None:
+            busy[("teacher", teacher_id)][slot] += 1
+        if room and room.strip():
+            busy[("room", room.strip().casefold())][slot] += 1
+
+    requirements = {
+        (requirement.class_id, requirement.subject.strip().casefold()): requirement
+        for requirement in data.requirements
+    }
+    names_taken = {(class_id, name.strip().casefold()) for _, name, class_id in subjects}
+    for (class_id, name), requirement in requirements.items():
+        if not any(taken == name and (class_id is None or class_id == taker) for taker, taken in names_taken):
+            raise ValueError(f"No class takes the subject {requirement.subject!r}" if class_id is None
+                             else f"Class {class_id} does not take the subject {requirement.subject!r}")
+
+    courses: List[Tuple[int, int, int]] = []
+    course_rooms: Dict[Tuple[int, int], Optional[str]] = {}
+    by_class: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+    for subject_id, name, class_id in subjects:
+        by_class[class_id].append((subject_id, name))
+    for class_id, class_subjects in by_class.items():
+        required, shared = {}, []
+        for subject_id, name in class_subjects:
+            key = name.strip().casefold()
+            requirement = requirements.get((class_id, key)) or requirements.get((None, key))
+            if requirement is not None:
+                required[subject_id] = requirement.periods
+                course_rooms[(class_id, subject_id)] = (requirement.room or "").strip() or rooms[class_id]
+            else:
+                shared.append(subject_id)
+                course_rooms[(class_id, subject_id)] = rooms[class_id]
+        if data.default_periods is not None:
+            required.update((subject_id, data.default_periods) for subject_id in shared)
+        elif shared:
+            free = max(0, slots - sum(required.values()))
+            for n, subject_id in enumerate(shared):
+                required[subject_id] = free // len(shared) + (n < free % len(shared))
+        total = sum(required.values())
+        if total > slots:
+            raise ValueError(f"Class {class_id} needs {total} periods a week but the week has {slots}")
+        courses.extend((class_id, subject_id, periods) for subject_id, periods in required.items() if periods)
+
+    teachers = assign_teachers(courses, candidates, class_teachers, slots, load)
+    lessons = [
+        Lesson(class_id, subject_id, teachers[(class_id, subject_id)], course_rooms[(class_id, subject_id)])
+        for class_id, subject_id, periods in courses
+        for _ in range(periods)
+    ]
+    room_capacity = {room.name: room.capacity for room in data.rooms}
+    slot_of = solve(lessons, len(days), len(period_times), room_capacity, busy, seed=data.seed)
+    return TimetablePlan(class_ids, subject_names, teachers, lessons, slot_of)
+
+
+def _entries(data: TimetableGenerate, plan: TimetablePlan) -> Optional[List[dict]]:
+    """Timetable rows to write, or None when nothing is to be written."""
+    if data.dry_run or (None in plan.slot_of and not data.allow_partial):
+        return None
+    days, period_times = week()
+    rows = []
+    for lesson, slot in zip(plan.lessons, plan.slot_of):
+        if slot is None:
+            continue
+        day, period = divmod(slot, len(period_times))
+        start_time, end_time = period_times[period]
+        rows.append({
+            "class_id": lesson.class_id,
+            "day": days[day],
+            "period": period + 1,
+            "start_time": start_time,
+            "end_time": end_time,
+            "subject_id": lesson.subject_id,
+            "teacher_id": lesson.teacher_id,
+            "room": lesson.room,
+        })
+    return rows
+
+
+def _result(plan: TimetablePlan, written: int, started: float) -> TimetableGenerationResult:
+    shortfall = Counter(lesson for lesson, slot in zip(plan.lessons, plan.slot_of) if slot is None)
+    placed = len(plan.lessons) - sum(shortfall.values())
+    seconds = clock.perf_counter() - started
+    logger.info(
+        f"Timetable for {len(plan.class_ids)} classes: {placed} of {len(plan.lessons)} lessons placed, "
+        f"{written} entries written in {seconds:.1f}s"
+    )
+    return TimetableGenerationResult(
+        classes=len(plan.class_ids),
+        lessons=len(plan.lessons),
+        placed=placed,
+        unplaced=[
+            TimetableShortfall(
+                class_id=lesson.class_id,
+                subject_id=lesson.subject_id,
+                subject_name=plan.subject_names[lesson.subject_id],
+                teacher_id=lesson.teacher_id,
+                missing=missing
+            )
+            for lesson, missing in sorted(shortfall.items(), key=lambda item: (item[0].class_id, item[0].subject_id))
+        ],
+        unstaffed_subject_ids=sorted(
+            subject_id for (_, subject_id), teacher in plan.teachers.items() if teacher is None
+        ),
+        written=written,
+        seconds=round(seconds, 3)
+    )
+
+
+def generate_timetable(conn: Connection, data: TimetableGenerate) -> TimetableGenerationResult:
+    """Generate the timetable of `data.class_ids` (default every class) and,
+    unless a dry run, replace their entries with it. The caller commits.
+
+    Raises ValueError for unknown classes or subjects, or a class needing
+    more periods than the week has.
+    """
+    started = clock.perf_counter()
+    rooms = _class_rooms(data, conn.execute(_class_query(data)).all())
+    plan = plan_timetable(data, rooms, *(conn.execute(query).all() for query in _school_queries(list(rooms))))
+
+    rows = _entries(data, plan)
+    if rows is not None:
+        conn.execute(delete(Timetable).where(Timetable.class_id.in_(plan.class_ids)))
+        if rows:
+            conn.execute(insert(Timetable), rows)
+    return _result(plan, len(rows or ()), started)
+
+
+async def generate_timetable_async(db: AsyncSession, data: TimetableGenerate) -> TimetableGenerationResult:
+    """generate_timetable for request handlers: queries run on the session
+    and the search in a worker thread, so the event loop keeps serving
+    other requests meanwhile. The caller commits."""
+    started = clock.perf_counter()
+    rooms = _class_rooms(data, (await db.execute(_class_query(data))).all())
+    school = [(await db.execute(query)).all() for query in _school_queries(list(rooms))]
+    plan = await run_in_threadpool(plan_timetable, data, rooms, *school)
+
+    rows = _entries(data, plan)
+    if rows is not None:
+        await db.execute(delete(Timetable).where(Timetable.class_id.in_(plan.class_ids)))
+        if rows:
+            await db.execute(insert(Timetable), rows)
+    return _result(plan, len(rows or ()), started)
+
+
+def synthetic_lessons(
+    classes: int,
+    teachers: int,
+    days: int,
+    periods: int,
+    fill: float = 0.85,
+    seed: int = 0
+) -> Tuple[List[Lesson], Dict[str, int]]:
+    """A made-up school for trying the solver: each class has eight subjects
+    filling `fill` of its week, one of them in a shared lab, and teachers are
+    split across subjects by demand. Returns the lessons and room capacities."""
+    rng = random.Random(seed)
+    slots = days * periods
+    names = ["Language", "Second Language", "Mathematics", "Science", "Social Science", "Arts", "Sport", "Computer"]
+    weights = [6, 4, 7, 6, 5, 2, 2, 2]
+    per_class = int(slots * fill)
+
+    courses, subject_names = [], {}
+    for class_id in range(1, classes + 1):
+        periods_left, weight_left = per_class, sum(weights)
+        for n, (name, weight) in enumerate(zip(names, weights)):
+            subject_id = class_id * 100 + n
+            subject_names[subject_id] = name
+            periods_of = round(periods_left * weight / weight_left)
+            periods_left, weight_left = periods_left - periods_of, weight_left - weight
+            courses.append((class_id, subject_id, periods_of))
+
+    demand = Counter()
+    for _, subject_id, periods_of in courses:
+        demand[subject_names[subject_id]] += periods_of
+    staff, next_id = {}, 1
+    for name in names:
+        count = max(1, round(teachers * demand[name] / sum(demand.values())))
+        staff[name] = list(range(next_id, next_id + count))
+        next_id += count
+    candidates = {subject_id: staff[name] for subject_id, name in subject_names.items()}
+    class_teachers = {class_id: set(rng.sample(range(1, next_id), min(6, next_id - 1))) for class_id in range(1, classes + 1)}
+    chosen = assign_teachers(courses, candidates, class_teachers, slots)
+
+    lab_capacity = math.ceil(demand["Computer"] / slots * 1.25)
+    lessons = [
+        Lesson(
+            class_id, subject_id, chosen[(class_id, subject_id)],
+            "Computer Lab" if subject_names[subject_id] == "Computer" else f"Room {class_id}"
+        )
+        for class_id, subject_id, periods_of in courses
+        for _ in range(periods_of)
+    ]
+    return lessons, {"Computer Lab": lab_capacity}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Timetable generation")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="Generate and store a clash-free timetable")
+    generate.add_argument("--class", dest="class_ids", type=int, action="append", help="Class id, repeatable (default: every class)")
+    generate.add_argument("--default-periods", type=int, help="Periods per week of every subject (default: an even share of the week)")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--allow-partial", action="store_true", help="Store the timetable even if some lessons found no slot")
+    generate.add_argument("--dry-run", action="store_true")
+    synthetic = commands.add_parser("synthetic", help="Solve a made-up school in memory and check it")
+    synthetic.add_argument("--classes", type=int, default=60)
+    synthetic.add_argument("--teachers", type=int, default=80)
+    synthetic.add_argument("--fill", type=float, default=0.85, help="Share of each class's week taught")
+    synthetic.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        from app.core.database import engine
+
+        data = TimetableGenerate(
+            class_ids=args.class_ids,
+            default_periods=args.default_periods,
+            seed=args.seed,
+            allow_partial=args.allow_partial,
+            dry_run=args.dry_run
+        )
+        with engine.begin() as conn:
+            result = generate_timetable(conn, data)
+        print(f"{result.placed} of {result.lessons} lessons placed for {result.classes} classes, "
+              f"{result.written} entries written in {result.seconds:.1f}s")
+        for shortfall in result.unplaced:
+            print(f"  class {shortfall.class_id} {shortfall.subject_name}: {shortfall.missing} periods unplaced")
+    elif args.command == "synthetic":
+        days, period_times = week()
+        lessons, room_capacity = synthetic_lessons(
+            args.classes, args.teachers, len(days), len(period_times), args.fill, args.seed
+        )
+        started = clock.perf_counter()
+        slot_of = solve(lessons, len(days), len(period_times), room_capacity, seed=args.seed)
+        seconds = clock.perf_counter() - started
+        placed = sum(slot is not None for slot in slot_of)
+        print(f"{placed} of {len(lessons)} lessons placed for {args.classes} classes in {seconds:.1f}s, "
+              f"{len(clashes(lessons, slot_of, room_capacity))} clashes")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -21,6 +21,11 @@ api.interceptors.request.use(
       if (token && config.headers) {
         config.headers.Authorization = `Bearer ${token}`;
       }
+      // Keeps reads on the primary database right after this user's writes
+      const wroteAt = localStorage.getItem('db_wrote_at');
+      if (wroteAt && config.headers) {
+        config.headers['X-DB-Wrote-At'] = wroteAt;
+      }
     }
     return config;
   },
@@ -29,7 +34,13 @@ api.interceptors.request.use(
 
 // Response interceptor to handle token refresh
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const wroteAt = response.headers['x-db-wrote-at'];
+    if (wroteAt && typeof window !== 'undefined') {
+      localStorage.setItem('db_wrote_at', wroteAt);
+    }
+    return response;
+  },
   async (error: AxiosError) => {
     const originalRequest = error.config as InternalAxiosRequestConfig & { _retry?: boolean };
 